@@ -6,6 +6,9 @@ from sqlalchemy import engine_from_config, pool
 from app.core.config import get_settings
 from app.core.database import Base
 from app.models import DocumentModel, GeneratedReport, ReportTemplate, SystemConfig, Upload, UsageEvent, Workspace
+from app.models.processing_checkpoint import ProcessingCheckpoint
+from app.models.processing_job import ProcessingJob
+from app.models.transcript_segment import TranscriptSegment
 
 config = context.config
 settings = get_settings()
@@ -15,7 +18,7 @@ if config.config_file_name is not None:
   fileConfig(config.config_file_name)
 
 target_metadata = Base.metadata
-_ = (DocumentModel, GeneratedReport, ReportTemplate, SystemConfig, Upload, UsageEvent, Workspace)
+_ = (DocumentModel, GeneratedReport, ReportTemplate, SystemConfig, Upload, UsageEvent, Workspace, ProcessingJob, ProcessingCheckpoint, TranscriptSegment)
 
 
 def run_migrations_offline() -> None:
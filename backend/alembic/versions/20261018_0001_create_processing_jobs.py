@@ -0,0 +1,50 @@
+"""create processing jobs table
+
+Revision ID: 20261018_0001
+Revises: 20260813_0001
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_0001"
+down_revision = "20260813_0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "processing_jobs",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("workspace_id", sa.String(length=80), nullable=False),
+        sa.Column("upload_id", sa.String(length=36), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("language", sa.String(length=20), nullable=True),
+        sa.Column("force_reprocess", sa.Boolean(), nullable=False),
+        sa.Column("use_api", sa.Boolean(), nullable=False),
+        sa.Column("whisper_model", sa.String(length=40), nullable=True),
+        sa.Column("transcription_provider", sa.String(length=20), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("worker_id", sa.String(length=120), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(), nullable=True),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["upload_id"], ["uploads.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_processing_jobs_workspace_id"), "processing_jobs", ["workspace_id"], unique=False)
+    op.create_index(op.f("ix_processing_jobs_upload_id"), "processing_jobs", ["upload_id"], unique=False)
+    op.create_index(op.f("ix_processing_jobs_status"), "processing_jobs", ["status"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_processing_jobs_status"), table_name="processing_jobs")
+    op.drop_index(op.f("ix_processing_jobs_upload_id"), table_name="processing_jobs")
+    op.drop_index(op.f("ix_processing_jobs_workspace_id"), table_name="processing_jobs")
+    op.drop_table("processing_jobs")
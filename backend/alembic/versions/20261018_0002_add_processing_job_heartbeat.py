@@ -0,0 +1,23 @@
+"""add processing job heartbeat
+
+Revision ID: 20261018_0002
+Revises: 20261018_0001
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_0002"
+down_revision = "20261018_0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("processing_jobs", sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("processing_jobs", "heartbeat_at")
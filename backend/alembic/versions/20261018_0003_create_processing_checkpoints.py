@@ -0,0 +1,38 @@
+"""create processing checkpoints table
+
+Revision ID: 20261018_0003
+Revises: 20261018_0002
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_0003"
+down_revision = "20261018_0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "processing_checkpoints",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("upload_id", sa.String(length=36), nullable=False),
+        sa.Column("stage", sa.String(length=20), nullable=False),
+        sa.Column("fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("artifact_path", sa.String(length=500), nullable=True),
+        sa.Column("payload_json", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["upload_id"], ["uploads.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("upload_id", "stage", name="uq_processing_checkpoints_upload_stage"),
+    )
+    op.create_index(op.f("ix_processing_checkpoints_upload_id"), "processing_checkpoints", ["upload_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_processing_checkpoints_upload_id"), table_name="processing_checkpoints")
+    op.drop_table("processing_checkpoints")
@@ -0,0 +1,25 @@
+"""add processing job scheduling fields
+
+Revision ID: 20261018_0004
+Revises: 20261018_0003
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_0004"
+down_revision = "20261018_0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("processing_jobs", sa.Column("priority", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("processing_jobs", sa.Column("estimated_seconds", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("processing_jobs", "estimated_seconds")
+    op.drop_column("processing_jobs", "priority")
@@ -0,0 +1,25 @@
+"""add processing job batch
+
+Revision ID: 20261018_0006
+Revises: 20261018_0005
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_0006"
+down_revision = "20261018_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("processing_jobs", sa.Column("batch_id", sa.String(length=36), nullable=True))
+    op.create_index("ix_processing_jobs_batch_id", "processing_jobs", ["batch_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_processing_jobs_batch_id", table_name="processing_jobs")
+    op.drop_column("processing_jobs", "batch_id")
@@ -0,0 +1,39 @@
+"""create transcript segments and processing job progress
+
+Revision ID: 20261018_0007
+Revises: 20261018_0006
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_0007"
+down_revision = "20261018_0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "transcript_segments",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("upload_id", sa.String(length=36), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("start_seconds", sa.Float(), nullable=False),
+        sa.Column("end_seconds", sa.Float(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["upload_id"], ["uploads.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("upload_id", "position", name="uq_transcript_segments_upload_position"),
+    )
+    op.create_index(op.f("ix_transcript_segments_upload_id"), "transcript_segments", ["upload_id"], unique=False)
+    op.add_column("processing_jobs", sa.Column("progress", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("processing_jobs", "progress")
+    op.drop_index(op.f("ix_transcript_segments_upload_id"), table_name="transcript_segments")
+    op.drop_table("transcript_segments")
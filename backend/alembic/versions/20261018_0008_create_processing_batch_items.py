@@ -0,0 +1,37 @@
+"""create processing batch items table
+
+Revision ID: 20261018_0008
+Revises: 20261018_0007
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_0008"
+down_revision = "20261018_0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "processing_batch_items",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("batch_id", sa.String(length=36), nullable=False),
+        sa.Column("job_id", sa.String(length=36), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["job_id"], ["processing_jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("batch_id", "job_id", name="uq_processing_batch_items_batch_job"),
+    )
+    op.create_index(op.f("ix_processing_batch_items_batch_id"), "processing_batch_items", ["batch_id"], unique=False)
+    op.create_index(op.f("ix_processing_batch_items_job_id"), "processing_batch_items", ["job_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_processing_batch_items_job_id"), table_name="processing_batch_items")
+    op.drop_index(op.f("ix_processing_batch_items_batch_id"), table_name="processing_batch_items")
+    op.drop_table("processing_batch_items")
@@ -3,7 +3,9 @@ from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.workspace import call_with_workspace, get_workspace_id
+from app.models.enums import ProcessingStatus
 from app.schemas.transcription import TranscriptionRead
+from app.services.transcript_stream import read_partial_transcript
 from app.services.upload_service import get_upload_or_404
 
 
@@ -17,6 +19,9 @@ def read_transcription(
     workspace_id: str = Depends(get_workspace_id),
 ) -> TranscriptionRead:
     upload = call_with_workspace(get_upload_or_404, db, upload_id, workspace_id=workspace_id)
+    partial_text, progress = None, 1.0 if upload.status == ProcessingStatus.COMPLETED else None
+    if upload.status == ProcessingStatus.TRANSCRIBING:
+        partial_text, progress = read_partial_transcript(db, upload.id)
     return TranscriptionRead(
         upload_id=upload.id,
         original_filename=upload.original_filename,
@@ -26,4 +31,6 @@ def read_transcription(
         language_detected=upload.language_detected,
         duration_seconds=upload.duration_seconds,
         updated_at=upload.updated_at,
+        partial_text=partial_text,
+        progress=progress,
     )
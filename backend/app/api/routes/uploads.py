@@ -1,9 +1,11 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, File, UploadFile
+from fastapi import APIRouter, Depends, File, UploadFile
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.workspace import call_with_workspace, get_workspace_id
+from app.schemas.processing import ProcessingBatchRead, ProcessingJobListResponse, ProcessingJobRead, ProcessingQueueStatus
 from app.schemas.upload import (
+    ProcessBatchRequest,
     ProcessRequest,
     ProcessingResponse,
     RemoteImportRequest,
@@ -12,6 +14,16 @@ from app.schemas.upload import (
     UploadListResponse,
     UploadStatsResponse,
 )
+from app.services.admission_service import ensure_capacity, read_queue_status
+from app.services.processing_queue_service import (
+    cancel_processing_job,
+    count_new_batch_jobs,
+    enqueue_processing_batch,
+    enqueue_processing_job,
+    list_active_processing_jobs,
+    read_processing_batch,
+    read_processing_job,
+)
 from app.services.upload_service import (
     create_upload,
     create_upload_from_remote_url,
@@ -21,7 +33,6 @@ from app.services.upload_service import (
     read_dashboard_stats,
 )
 from app.services.usage_service import consume_credits
-from app.workers.processing_worker import process_upload
 
 
 router = APIRouter(prefix="/api", tags=["uploads"])
@@ -50,6 +61,7 @@ def import_upload_endpoint(
     db: Session = Depends(get_db),
     workspace_id: str = Depends(get_workspace_id),
 ) -> UploadCreateResponse:
+    ensure_capacity(db, workspace_id)
     upload = call_with_workspace(create_upload_from_remote_url, db, payload.source, payload.url, workspace_id=workspace_id)
     return UploadCreateResponse(
         id=upload.id,
@@ -86,15 +98,35 @@ def delete_upload_endpoint(
     return {"success": True}
 
 
+@router.post("/process/batch", response_model=ProcessingBatchRead)
+def process_batch_endpoint(
+    payload: ProcessBatchRequest,
+    db: Session = Depends(get_db),
+    workspace_id: str = Depends(get_workspace_id),
+) -> ProcessingBatchRead:
+    ensure_capacity(db, workspace_id, incoming=count_new_batch_jobs(db, payload.upload_ids))
+    return call_with_workspace(enqueue_processing_batch, db, payload, workspace_id=workspace_id)
+
+
+@router.get("/process/batch/{batch_id}", response_model=ProcessingBatchRead)
+def read_processing_batch_endpoint(
+    batch_id: str,
+    db: Session = Depends(get_db),
+    workspace_id: str = Depends(get_workspace_id),
+) -> ProcessingBatchRead:
+    return call_with_workspace(read_processing_batch, db, batch_id, workspace_id=workspace_id)
+
+
 @router.post("/process/{upload_id}", response_model=ProcessingResponse)
 def process_upload_endpoint(
     upload_id: str,
     payload: ProcessRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     workspace_id: str = Depends(get_workspace_id),
 ) -> ProcessingResponse:
     upload = call_with_workspace(get_upload_or_404, db, upload_id, workspace_id=workspace_id)
+    # Upload com job ativo so recebe o job existente: nao acrescenta nada a fila.
+    ensure_capacity(db, workspace_id, incoming=count_new_batch_jobs(db, [upload.id]))
     consume_credits(
         db,
         workspace_id,
@@ -103,16 +135,36 @@ def process_upload_endpoint(
         idempotency_key=f"process:{upload.id}:start",
         metadata={"upload_id": upload.id},
     )
-    background_tasks.add_task(
-        process_upload,
-        upload.id,
-        payload.language,
-        payload.force_reprocess,
-        payload.use_api,
-        payload.whisper_model,
-        payload.transcription_provider,
-    )
-    return ProcessingResponse(id=upload.id, status=upload.status, message="Processamento iniciado")
+    job = call_with_workspace(enqueue_processing_job, db, upload, payload, workspace_id=workspace_id)
+    return ProcessingResponse(id=upload.id, status=upload.status, message="Processamento na fila", job_id=job.id)
+
+
+@router.get("/process/jobs", response_model=ProcessingJobListResponse)
+def list_processing_jobs_endpoint(db: Session = Depends(get_db), workspace_id: str = Depends(get_workspace_id)) -> ProcessingJobListResponse:
+    return call_with_workspace(list_active_processing_jobs, db, workspace_id=workspace_id)
+
+
+@router.get("/process/queue", response_model=ProcessingQueueStatus)
+def read_processing_queue_endpoint(db: Session = Depends(get_db), workspace_id: str = Depends(get_workspace_id)) -> ProcessingQueueStatus:
+    return read_queue_status(db, workspace_id)
+
+
+@router.get("/process/jobs/{job_id}", response_model=ProcessingJobRead)
+def read_processing_job_endpoint(
+    job_id: str,
+    db: Session = Depends(get_db),
+    workspace_id: str = Depends(get_workspace_id),
+) -> ProcessingJobRead:
+    return call_with_workspace(read_processing_job, db, job_id, workspace_id=workspace_id)
+
+
+@router.post("/process/jobs/{job_id}/cancel", response_model=ProcessingJobRead)
+def cancel_processing_job_endpoint(
+    job_id: str,
+    db: Session = Depends(get_db),
+    workspace_id: str = Depends(get_workspace_id),
+) -> ProcessingJobRead:
+    return call_with_workspace(cancel_processing_job, db, job_id, workspace_id=workspace_id)
 
 
 @router.get("/dashboard/stats", response_model=UploadStatsResponse)
@@ -0,0 +1,111 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+
+CANCELLED_MESSAGE = "Processamento cancelado pelo usuario"
+
+
+class JobCancelled(RuntimeError):
+    """Interrompe o pipeline de um job cancelado; nunca deve cair no proximo provedor."""
+
+    def __init__(self, message: str = CANCELLED_MESSAGE) -> None:
+        super().__init__(message)
+
+
+class CancellationToken:
+    """Sinal de cancelamento de um job, compartilhado entre as etapas do pipeline.
+
+    Callbacks registrados (matar o ffmpeg, fechar o cliente HTTP do provedor)
+    rodam na thread que cancela, entao a etapa bloqueada e interrompida na hora.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: list[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def wait(self, timeout: float) -> bool:
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise JobCancelled()
+
+    @contextmanager
+    def on_cancel(self, callback: Callable[[], None]) -> Iterator[None]:
+        """Registra ``callback`` enquanto o bloco roda (ou chama na hora, se ja cancelado)."""
+        with self._lock:
+            already_cancelled = self._event.is_set()
+            if not already_cancelled:
+                self._callbacks.append(callback)
+        if already_cancelled:
+            callback()
+        try:
+            yield
+        finally:
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+
+
+_current_token: ContextVar[CancellationToken | None] = ContextVar("cancellation_token", default=None)
+_job_tokens: dict[str, CancellationToken] = {}
+_job_tokens_lock = threading.Lock()
+
+
+def current_token() -> CancellationToken | None:
+    return _current_token.get()
+
+
+def raise_if_cancelled() -> None:
+    token = _current_token.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+@contextmanager
+def cancellation_scope(token: CancellationToken | None) -> Iterator[None]:
+    """Torna ``token`` visivel para ffmpeg e provedores chamados dentro do bloco."""
+    reset = _current_token.set(token)
+    try:
+        yield
+    finally:
+        _current_token.reset(reset)
+
+
+def register_job_token(job_id: str, token: CancellationToken) -> None:
+    with _job_tokens_lock:
+        _job_tokens[job_id] = token
+
+
+def release_job_token(job_id: str) -> None:
+    with _job_tokens_lock:
+        _job_tokens.pop(job_id, None)
+
+
+def cancel_local_job(job_id: str) -> bool:
+    """Cancela na hora um job rodando neste processo (workers embutidos na API)."""
+    with _job_tokens_lock:
+        token = _job_tokens.get(job_id)
+    if token is None:
+        return False
+    token.cancel()
+    return True
@@ -55,10 +55,124 @@ class Settings(BaseSettings):
     gemini_transcription_model: str = "gemini-2.5-flash"
     gemini_report_model: str = "gemini-2.5-flash"
     claude_report_model: str = "claude-3-5-sonnet-latest"
-    transcription_provider_order: str = "openai,gemini,whisper"
+    # RAM (MB) para manter modelos Whisper carregados entre jobs; acima disso os
+    # menos usados sao descartados. 0 = sem limite.
+    whisper_model_cache_mb: int = 8192
+    # Carrega e aquece o WHISPER_MODEL configurado ao subir a API/worker, para o
+    # primeiro job nao pagar o carregamento (desktop e nos offline).
+    whisper_warmup: bool = False
+    # Whisper PyTorch em CPU: "accuracy" (fp32) ou "speed" (camadas lineares em
+    # int8 dinamico; mais rapido e mais leve, com pequena perda de precisao).
+    # Compare os dois com benchmark_whisper.py.
+    whisper_cpu_mode: str = "accuracy"
+    # Em CPU o Whisper roda num pool dedicado de WHISPER_PARALLEL_WORKERS processos
+    # (0 = metade dos nucleos, limitado a quantas copias de WHISPER_MODEL cabem em
+    # WHISPER_MODEL_CACHE_MB), cada um com WHISPER_THREADS_PER_WORKER threads do
+    # torch (0 = nucleos / processos) e os proprios modelos carregados. O limite de
+    # RAM vale para o pool inteiro: cada processo fica com a sua parte. Jobs
+    # simultaneos deixam de disputar o GIL e os nucleos da API.
+    whisper_inference_pool: bool = True
+    whisper_parallel_workers: int = 0
+    whisper_threads_per_worker: int = 0
+    # Audio local mais longo que ~1,5x WHISPER_CHUNK_SECONDS e cortado nos
+    # silencios e os trechos sao transcritos em paralelo no pool. 0 = desliga.
+    whisper_chunk_seconds: int = 600
+    # Transcricao parcial: sem o pool de trechos, o Whisper local decodifica em
+    # janelas deste tamanho (cortadas nos silencios) e grava cada uma ao terminar,
+    # para GET /api/transcriptions/{id} mostrar o texto antes do fim. 0 = desliga.
+    whisper_stream_window_seconds: int = 120
+    # Pre-passe de deteccao de voz: silencios com pelo menos VAD_MIN_SILENCE_SECONDS
+    # abaixo de VAD_NOISE_DB sao removidos antes de transcrever (menos minutos
+    # cobrados pelos provedores e menos CPU no Whisper local).
+    vad_enabled: bool = True
+    vad_noise_db: float = -35.0
+    vad_min_silence_seconds: float = 2.0
+    # Motor local "faster_whisper" (CTranslate2): tipo de computacao dos pesos
+    # ("int8" em CPU; "float16"/"int8_float16" em GPU) e threads por transcricao
+    # (0 = padrao da biblioteca).
+    faster_whisper_compute_type: str = "int8"
+    faster_whisper_cpu_threads: int = 0
+    # "whisper" encerra a cadeia (sem fallback depois dele): o faster_whisper so
+    # entra em uso quando e colocado antes dele na ordem (opcional).
+    transcription_provider_order: str = "openai,gemini,whisper,faster_whisper"
+    # Formato do audio enviado as APIs: "auto" escolhe por provedor (Opus 16 kHz
+    # mono para a OpenAI, MP3 16 kHz mono para o Gemini); "speech_mp3" ou
+    # "speech_opus" fixam um. Motores locais sempre leem PCM.
+    transcription_audio_profile: str = "auto"
     report_provider_order: str = "openai,claude,gemini,local"
+    # Audio mais longo que ~1,5x API_CHUNK_SECONDS vai para OpenAI/Gemini em
+    # trechos cortados nos silencios (com sobreposicao), enviados em paralelo e
+    # emendados em ordem. PROVIDER_CHUNK_CONCURRENCY limita os envios
+    # simultaneos de cada provedor no processo. API_CHUNK_SECONDS=0 desliga.
+    api_chunk_seconds: int = 600
+    provider_chunk_concurrency: str = "openai:4,gemini:4"
     provider_timeout_seconds: int = 120
     provider_retries: int = 2
+    # Disjuntor por provedor: depois de PROVIDER_BREAKER_FAILURES falhas seguidas
+    # as cadeias pulam o provedor (sem tentativas nem espera) por
+    # PROVIDER_BREAKER_COOLDOWN_SECONDS; entao uma chamada de teste decide se volta.
+    provider_breaker_failures: int = 3
+    provider_breaker_cooldown_seconds: float = 60.0
+    # Limitador de taxa por chave de API (token bucket): requisicoes, tokens e
+    # segundos de audio por minuto, no formato "provedor:valor" (0 ou ausente =
+    # sem limite). Acima do limite as chamadas esperam a vez em vez de tomar 429;
+    # um 429 mesmo assim pausa a chave inteira. Os padroes sao do tier 1 de cada API.
+    provider_requests_per_minute: str = "openai:500,gemini:1000,claude:50"
+    provider_tokens_per_minute: str = "openai:200000,gemini:1000000,claude:40000"
+    provider_audio_seconds_per_minute: str = ""
+    # Pedidos em paralelo (hedging), opt-in: quando o provedor da vez passa do
+    # percentil PROVIDER_HEDGE_PERCENTILE das proprias latencias (ou de
+    # PROVIDER_HEDGE_DELAY_SECONDS enquanto nao ha historico), o proximo da cadeia
+    # e chamado junto e vale a primeira resposta. A chamada descartada ainda e
+    # cobrada pelo provedor; o custo extra aparece nos logs e nos metadados.
+    provider_hedging: bool = False
+    provider_hedge_percentile: float = 95.0
+    provider_hedge_delay_seconds: float = 30.0
+    # Fila de processamento: quantos uploads sao processados ao mesmo tempo e por
+    # quanto tempo um worker segura o job antes de precisar renovar a posse.
+    processing_concurrency: int = 2
+    # O pipeline separa conversao (ffmpeg) de transcricao (provedores):
+    # PROCESSING_CONCURRENCY dimensiona o pool de transcricao e este o de
+    # conversao (0 = PROCESSING_CONCURRENCY + PROCESSING_STAGE_QUEUE_SIZE,
+    # limitado aos nucleos). Um worker so reivindica jobs ate esse mesmo total
+    # (transcricoes + fila entre etapas); o resto espera na fila do banco.
+    processing_conversion_workers: int = 0
+    processing_stage_queue_size: int = 2
+    # Ordem da fila: "sjf" (midias curtas primeiro, com faixas por plano) ou "fifo".
+    # Cada segundo de espera desconta PROCESSING_AGING_FACTOR segundos da duracao
+    # estimada, para que videos longos nao fiquem parados para sempre; cada nivel
+    # de plano (trial < pro < business < enterprise) vale PROCESSING_PRIORITY_LANE_SECONDS.
+    processing_scheduler: str = "sjf"
+    processing_aging_factor: float = 10.0
+    processing_priority_lane_seconds: float = 600.0
+    # Teto de jobs simultaneos por workspace, por plano (0 = sem teto). Entre os
+    # workspaces abaixo do teto a fila e dividida de forma justa, com peso maior
+    # para planos maiores. Ignorado no desktop.
+    processing_workspace_concurrency: str = "trial:1,pro:2,business:4,enterprise:0"
+    processing_lease_seconds: int = 300
+    processing_poll_interval_seconds: float = 1.0
+    processing_heartbeat_seconds: int = 30
+    # Com que frequencia um worker confere se o job foi cancelado por outro processo.
+    processing_cancel_poll_seconds: float = 2.0
+    # Jobs cujo lease expirou (worker morto) voltam para a fila ate este limite.
+    processing_max_attempts: int = 3
+    processing_reaper_interval_seconds: int = 60
+    # Por quanto tempo o audio convertido fica guardado para reprocessar sem
+    # reconverter (com AUTO_CLEANUP_TEMP_FILES ligado). 0 = apaga ao concluir.
+    processing_checkpoint_retention_hours: float = 24
+    # Desligue na API quando os jobs forem consumidos por processos run_worker.py.
+    processing_embedded_workers: bool = True
+    # Controle de admissao de /api/process e /api/uploads/import (0 = desligado):
+    # acima destes limites a API responde 429/503 com Retry-After.
+    admission_max_active_jobs_per_workspace: int = 200
+    admission_max_queued_jobs: int = 500
+    admission_min_free_disk_mb: int = 2048
+    # ffmpeg ativos: -1 = automatico (workers de conversao + de transcricao, que
+    # rodam um ffmpeg cada, mais uma folga para o request), para nao recusar o
+    # processamento normal em maquinas com muitos nucleos.
+    admission_max_active_ffmpeg: int = -1
+    admission_max_pending_provider_calls: int = 32
+    admission_retry_after_seconds: int = 30
 
     model_config = SettingsConfigDict(env_file=_settings_env_files(), env_file_encoding="utf-8", case_sensitive=False, extra="ignore")
 
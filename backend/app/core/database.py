@@ -78,6 +78,25 @@ def run_startup_migrations() -> None:
             if "updated_at" not in system_config_columns:
                 connection.execute(text("ALTER TABLE system_config ADD COLUMN updated_at DATETIME DEFAULT (datetime('now'))"))
 
+        processing_job_columns = {
+            row[1]
+            for row in connection.execute(text("PRAGMA table_info(processing_jobs)"))
+        }
+        if processing_job_columns:
+            if "heartbeat_at" not in processing_job_columns:
+                connection.execute(text("ALTER TABLE processing_jobs ADD COLUMN heartbeat_at DATETIME"))
+            if "priority" not in processing_job_columns:
+                connection.execute(text("ALTER TABLE processing_jobs ADD COLUMN priority INTEGER DEFAULT 0 NOT NULL"))
+            if "estimated_seconds" not in processing_job_columns:
+                connection.execute(text("ALTER TABLE processing_jobs ADD COLUMN estimated_seconds FLOAT"))
+            if "cancel_requested" not in processing_job_columns:
+                connection.execute(text("ALTER TABLE processing_jobs ADD COLUMN cancel_requested BOOLEAN DEFAULT 0 NOT NULL"))
+            if "batch_id" not in processing_job_columns:
+                connection.execute(text("ALTER TABLE processing_jobs ADD COLUMN batch_id VARCHAR(36)"))
+                connection.execute(text("CREATE INDEX IF NOT EXISTS ix_processing_jobs_batch_id ON processing_jobs (batch_id)"))
+            if "progress" not in processing_job_columns:
+                connection.execute(text("ALTER TABLE processing_jobs ADD COLUMN progress FLOAT"))
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
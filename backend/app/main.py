@@ -10,7 +10,14 @@ from app.api.router import api_router  # noqa: E402
 from app.core.config import get_settings  # noqa: E402
 from app.core.database import Base, SessionLocal, engine, run_startup_migrations  # noqa: E402
 from app.models import DocumentModel  # noqa: E402
+from app.models.processing_checkpoint import ProcessingCheckpoint  # noqa: E402
+from app.models.processing_job import ProcessingJob  # noqa: E402
+from app.models.transcript_segment import TranscriptSegment  # noqa: E402
+from app.services.provider_gateway import provider_health  # noqa: E402
 from app.services.seed_service import seed_report_templates  # noqa: E402
+from app.services.whisper_inference_pool import shutdown_inference_pool  # noqa: E402
+from app.services.whisper_runtime import start_whisper_warmup, warmup_status  # noqa: E402
+from app.workers.processing_worker import start_processing_workers, stop_processing_workers  # noqa: E402
 
 
 settings = get_settings()
@@ -28,7 +35,7 @@ app.add_middleware(
 
 @app.on_event("startup")
 def on_startup() -> None:
-    _ = DocumentModel
+    _ = (DocumentModel, ProcessingJob, ProcessingCheckpoint, TranscriptSegment)
     Base.metadata.create_all(bind=engine)
     run_startup_migrations()
     db = SessionLocal()
@@ -36,11 +43,33 @@ def on_startup() -> None:
         seed_report_templates(db)
     finally:
         db.close()
+    start_processing_workers()
+    start_whisper_warmup()
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    stop_processing_workers()
+    shutdown_inference_pool()
 
 
 @app.get("/api/health")
-def health_check() -> dict[str, str]:
-    return {"status": "ok", "app": settings.app_name}
+def health_check() -> dict[str, object]:
+    """``status`` diz que a API responde; ``ready`` diz se o Whisper ja esta aquecido.
+
+    Com o pool de inferencia, ``whisper.processes`` de ``whisper.pool_workers``
+    processos ja carregaram o modelo; os que faltarem carregam no primeiro job.
+
+    ``providers`` traz o disjuntor e a saude de cada provedor ja chamado por este processo.
+    """
+    whisper = warmup_status()
+    return {
+        "status": "ok",
+        "app": settings.app_name,
+        "ready": whisper["status"] in {"disabled", "ready", "failed"},
+        "whisper": whisper,
+        "providers": provider_health(),
+    }
 
 
 app.include_router(api_router)
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class ProcessingJob(Base):
+    """Pedido de processamento de um upload, consumido pelos workers da fila."""
+
+    __tablename__ = "processing_jobs"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
+    workspace_id: Mapped[str] = mapped_column(String(80), index=True, default="local-workspace", nullable=False)
+    upload_id: Mapped[str] = mapped_column(String(36), ForeignKey("uploads.id", ondelete="CASCADE"), index=True, nullable=False)
+    # Lote que criou o job; quem pertence a cada lote fica em processing_batch_items.
+    batch_id: Mapped[str | None] = mapped_column(String(36), index=True, nullable=True)
+    status: Mapped[str] = mapped_column(String(20), index=True, default="queued", nullable=False)
+    language: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    force_reprocess: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    use_api: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    whisper_model: Mapped[str | None] = mapped_column(String(40), nullable=True)
+    transcription_provider: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    # Faixa de prioridade do plano do workspace (maior passa na frente) e duracao
+    # estimada da midia, usadas pelo escalonador shortest-job-first.
+    priority: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    estimated_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # Pedido de cancelamento de um job em andamento; o heartbeat do worker o percebe.
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    # Fracao ja transcrita (0-1) enquanto o motor local decodifica; None sem estimativa.
+    progress: Mapped[float | None] = mapped_column(Float, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    worker_id: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=_utcnow, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=_utcnow, onupdate=_utcnow, nullable=False)
+
+
+class ProcessingBatchItem(Base):
+    """Upload pedido num lote e o job que o atende (criado pelo lote ou ja ativo)."""
+
+    __tablename__ = "processing_batch_items"
+    __table_args__ = (UniqueConstraint("batch_id", "job_id", name="uq_processing_batch_items_batch_job"),)
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
+    batch_id: Mapped[str] = mapped_column(String(36), index=True, nullable=False)
+    job_id: Mapped[str] = mapped_column(String(36), ForeignKey("processing_jobs.id", ondelete="CASCADE"), index=True, nullable=False)
+    # Ordem em que o upload veio no pedido.
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=_utcnow, nullable=False)
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.models.processing_checkpoint import ProcessingCheckpoint
+
+
+class ProcessingCheckpointRepository:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def get(self, upload_id: str, stage: str) -> ProcessingCheckpoint | None:
+        return self.db.scalar(
+            select(ProcessingCheckpoint).where(ProcessingCheckpoint.upload_id == upload_id, ProcessingCheckpoint.stage == stage)
+        )
+
+    def save(self, checkpoint: ProcessingCheckpoint) -> ProcessingCheckpoint:
+        self.db.add(checkpoint)
+        self.db.commit()
+        self.db.refresh(checkpoint)
+        return checkpoint
+
+    def list_for_upload(self, upload_id: str) -> list[ProcessingCheckpoint]:
+        return list(self.db.scalars(select(ProcessingCheckpoint).where(ProcessingCheckpoint.upload_id == upload_id)).all())
+
+    def list_with_artifacts_before(self, cutoff: datetime) -> list[ProcessingCheckpoint]:
+        return list(
+            self.db.scalars(
+                select(ProcessingCheckpoint).where(
+                    ProcessingCheckpoint.artifact_path.is_not(None),
+                    ProcessingCheckpoint.updated_at < cutoff,
+                )
+            ).all()
+        )
+
+    def delete_for_upload(self, upload_id: str, stages: list[str] | None = None) -> None:
+        statement = delete(ProcessingCheckpoint).where(ProcessingCheckpoint.upload_id == upload_id)
+        if stages is not None:
+            statement = statement.where(ProcessingCheckpoint.stage.in_(stages))
+        self.db.execute(statement)
+        self.db.commit()
@@ -0,0 +1,205 @@
+from datetime import datetime
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.models.processing_job import ProcessingBatchItem, ProcessingJob
+
+
+ACTIVE_JOB_STATUSES = ("queued", "running")
+# Classe do advisory lock do Postgres que serializa o claim por workspace.
+WORKSPACE_CLAIM_LOCK_CLASS = 7007
+
+
+class ProcessingJobRepository:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def create(self, job: ProcessingJob) -> ProcessingJob:
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def save(self, job: ProcessingJob) -> ProcessingJob:
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get(self, job_id: str) -> ProcessingJob | None:
+        return self.db.get(ProcessingJob, job_id)
+
+    def get_for_workspace(self, job_id: str, workspace_id: str) -> ProcessingJob | None:
+        return self.db.scalar(select(ProcessingJob).where(ProcessingJob.id == job_id, ProcessingJob.workspace_id == workspace_id))
+
+    def get_active_for_upload(self, upload_id: str) -> ProcessingJob | None:
+        return self.db.scalar(
+            select(ProcessingJob)
+            .where(ProcessingJob.upload_id == upload_id, ProcessingJob.status.in_(ACTIVE_JOB_STATUSES))
+            .order_by(ProcessingJob.created_at.desc())
+        )
+
+    def add_batch_items(self, batch_id: str, jobs: list[ProcessingJob]) -> None:
+        """Liga ao lote os jobs de todos os uploads pedidos, sem confirmar a transacao."""
+        self.db.add_all(ProcessingBatchItem(batch_id=batch_id, job_id=job.id, position=index) for index, job in enumerate(jobs))
+
+    def list_for_batch(self, batch_id: str, workspace_id: str | None = None) -> list[ProcessingJob]:
+        statement = (
+            select(ProcessingJob)
+            .join(ProcessingBatchItem, ProcessingBatchItem.job_id == ProcessingJob.id)
+            .where(ProcessingBatchItem.batch_id == batch_id)
+        )
+        if workspace_id is not None:
+            statement = statement.where(ProcessingJob.workspace_id == workspace_id)
+        return list(self.db.scalars(statement.order_by(ProcessingBatchItem.position.asc())).all())
+
+    def list_queued(self, limit: int = 50) -> list[ProcessingJob]:
+        return list(
+            self.db.scalars(
+                select(ProcessingJob)
+                .where(ProcessingJob.status == "queued")
+                .order_by(ProcessingJob.created_at.asc())
+                .limit(limit)
+            ).all()
+        )
+
+    def try_claim(
+        self,
+        job_id: str,
+        worker_id: str,
+        now: datetime,
+        lease_expires_at: datetime,
+        workspace_id: str | None = None,
+        workspace_cap: int | None = None,
+    ) -> bool:
+        """Compare-and-set: so um worker consegue mover o job de queued para running.
+
+        Com ``workspace_cap`` a mesma instrucao confere quantos jobs do workspace
+        ja estao rodando. No Postgres (READ COMMITTED) so isso nao basta: dois
+        workers veriam a contagem antiga e passariam juntos. Por isso o claim
+        primeiro pega um advisory lock do workspace, solto no commit; o UPDATE
+        seguinte ja enxerga o job que o outro worker confirmou. O SQLite
+        serializa as escritas e dispensa o lock.
+        """
+        conditions = [ProcessingJob.id == job_id, ProcessingJob.status == "queued"]
+        if workspace_id is not None and workspace_cap is not None:
+            if self.db.get_bind().dialect.name == "postgresql":
+                self.db.execute(select(func.pg_advisory_xact_lock(WORKSPACE_CLAIM_LOCK_CLASS, func.hashtext(workspace_id))))
+            running = aliased(ProcessingJob)
+            running_count = (
+                select(func.count())
+                .select_from(running)
+                .where(running.workspace_id == workspace_id, running.status == "running")
+                .scalar_subquery()
+            )
+            conditions.append(running_count < workspace_cap)
+        result = self.db.execute(
+            update(ProcessingJob)
+            .where(*conditions)
+            .values(
+                status="running",
+                worker_id=worker_id,
+                lease_expires_at=lease_expires_at,
+                attempts=ProcessingJob.attempts + 1,
+                heartbeat_at=now,
+                started_at=now,
+                updated_at=now,
+            )
+        )
+        self.db.commit()
+        return result.rowcount == 1
+
+    def count_running_by_workspace(self) -> dict[str, int]:
+        rows = self.db.execute(
+            select(ProcessingJob.workspace_id, func.count()).where(ProcessingJob.status == "running").group_by(ProcessingJob.workspace_id)
+        ).all()
+        return {str(workspace_id): int(total) for workspace_id, total in rows}
+
+    def list_active(self, workspace_id: str | None = None) -> list[ProcessingJob]:
+        statement = select(ProcessingJob).where(ProcessingJob.status.in_(ACTIVE_JOB_STATUSES))
+        if workspace_id is not None:
+            statement = statement.where(ProcessingJob.workspace_id == workspace_id)
+        return list(self.db.scalars(statement.order_by(ProcessingJob.created_at.asc())).all())
+
+    def renew_lease(self, job_id: str, worker_id: str, now: datetime, lease_expires_at: datetime) -> bool:
+        """Heartbeat: so renova se o job ainda pertence a este worker."""
+        result = self.db.execute(
+            update(ProcessingJob)
+            .where(ProcessingJob.id == job_id, ProcessingJob.worker_id == worker_id, ProcessingJob.status == "running")
+            .values(heartbeat_at=now, lease_expires_at=lease_expires_at, updated_at=now)
+        )
+        self.db.commit()
+        return result.rowcount == 1
+
+    def list_expired(self, now: datetime) -> list[ProcessingJob]:
+        return list(
+            self.db.scalars(
+                select(ProcessingJob).where(
+                    ProcessingJob.status == "running",
+                    ProcessingJob.lease_expires_at.is_not(None),
+                    ProcessingJob.lease_expires_at < now,
+                )
+            ).all()
+        )
+
+    def release_expired(self, job_id: str, now: datetime, status_value: str, error: str | None = None) -> bool:
+        """Devolve (ou encerra) um job abandonado, sem atropelar um heartbeat concorrente."""
+        values: dict[str, object] = {
+            "status": status_value,
+            "worker_id": None,
+            "lease_expires_at": None,
+            "error_message": error,
+            "updated_at": now,
+        }
+        if status_value == "failed":
+            values["completed_at"] = now
+        result = self.db.execute(
+            update(ProcessingJob)
+            .where(
+                ProcessingJob.id == job_id,
+                ProcessingJob.status == "running",
+                ProcessingJob.lease_expires_at < now,
+            )
+            .values(**values)
+        )
+        self.db.commit()
+        return result.rowcount == 1
+
+    def request_cancel(self, job_id: str, now: datetime) -> bool:
+        result = self.db.execute(
+            update(ProcessingJob)
+            .where(ProcessingJob.id == job_id, ProcessingJob.status == "running")
+            .values(cancel_requested=True, updated_at=now)
+        )
+        self.db.commit()
+        return result.rowcount == 1
+
+    def cancel_queued(self, job_id: str, now: datetime) -> bool:
+        """Job ainda na fila e cancelado direto, sem disputar com um worker que o reivindique."""
+        result = self.db.execute(
+            update(ProcessingJob)
+            .where(ProcessingJob.id == job_id, ProcessingJob.status == "queued")
+            .values(status="cancelled", cancel_requested=True, error_message=None, completed_at=now, updated_at=now)
+        )
+        self.db.commit()
+        return result.rowcount == 1
+
+    def set_progress(self, job_id: str, progress: float) -> None:
+        self.db.execute(update(ProcessingJob).where(ProcessingJob.id == job_id).values(progress=progress))
+        self.db.commit()
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        return bool(self.db.scalar(select(ProcessingJob.cancel_requested).where(ProcessingJob.id == job_id)))
+
+    def count_active_for_workspace(self, workspace_id: str) -> int:
+        total = self.db.scalar(
+            select(func.count())
+            .select_from(ProcessingJob)
+            .where(ProcessingJob.workspace_id == workspace_id, ProcessingJob.status.in_(ACTIVE_JOB_STATUSES))
+        )
+        return int(total or 0)
+
+    def count_by_status(self) -> dict[str, int]:
+        rows = self.db.execute(select(ProcessingJob.status, func.count()).group_by(ProcessingJob.status)).all()
+        return {str(status): int(total) for status, total in rows}
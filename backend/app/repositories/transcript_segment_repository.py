@@ -0,0 +1,42 @@
+from typing import Any
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.models.transcript_segment import TranscriptSegment
+
+
+class TranscriptSegmentRepository:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def list_for_upload(self, upload_id: str) -> list[TranscriptSegment]:
+        return list(
+            self.db.scalars(
+                select(TranscriptSegment).where(TranscriptSegment.upload_id == upload_id).order_by(TranscriptSegment.position)
+            ).all()
+        )
+
+    def append(self, upload_id: str, segments: list[dict[str, Any]]) -> None:
+        next_position = self.db.scalar(
+            select(func.coalesce(func.max(TranscriptSegment.position), -1)).where(TranscriptSegment.upload_id == upload_id)
+        )
+        self.db.add_all(
+            TranscriptSegment(
+                upload_id=upload_id,
+                position=next_position + 1 + index,
+                start_seconds=float(segment["start"]),
+                end_seconds=float(segment["end"]),
+                text=str(segment["text"]),
+            )
+            for index, segment in enumerate(segments)
+        )
+        self.db.commit()
+
+    def replace_for_upload(self, upload_id: str, segments: list[dict[str, Any]]) -> None:
+        self.db.execute(delete(TranscriptSegment).where(TranscriptSegment.upload_id == upload_id))
+        self.append(upload_id, segments)
+
+    def delete_for_upload(self, upload_id: str) -> None:
+        self.db.execute(delete(TranscriptSegment).where(TranscriptSegment.upload_id == upload_id))
+        self.db.commit()
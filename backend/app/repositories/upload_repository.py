@@ -1,6 +1,7 @@
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from app.models.enums import ProcessingStatus
 from app.models.report import GeneratedReport
 from app.models.upload import Upload
 
@@ -27,6 +28,15 @@ class UploadRepository:
             statement = statement.where(Upload.workspace_id == workspace_id)
         return list(self.db.scalars(statement.order_by(Upload.created_at.desc())).all())
 
+    def list_by_ids(self, upload_ids: list[str], workspace_id: str | None = None) -> list[Upload]:
+        statement = select(Upload).where(Upload.id.in_(upload_ids))
+        if workspace_id is not None:
+            statement = statement.where(Upload.workspace_id == workspace_id)
+        return list(self.db.scalars(statement).all())
+
+    def list_by_statuses(self, statuses: list[ProcessingStatus]) -> list[Upload]:
+        return list(self.db.scalars(select(Upload).where(Upload.status.in_(statuses))).all())
+
     def delete(self, upload: Upload) -> None:
         self.db.delete(upload)
         self.db.commit()
@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel
+
+from app.schemas.common import ORMModel
+
+
+ProcessingJobState = Literal["queued", "running", "done", "failed", "cancelled"]
+
+
+class ProcessingJobRead(ORMModel):
+    id: str
+    workspace_id: str = "local-workspace"
+    upload_id: str
+    batch_id: str | None = None
+    status: ProcessingJobState
+    priority: int = 0
+    estimated_seconds: float | None = None
+    attempts: int
+    cancel_requested: bool = False
+    progress: float | None = None
+    worker_id: str | None = None
+    heartbeat_at: datetime | None = None
+    lease_expires_at: datetime | None = None
+    error_message: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    completed_at: datetime | None = None
+
+
+class ProcessingJobListResponse(BaseModel):
+    items: list[ProcessingJobRead]
+    total: int
+
+
+class ProcessingBatchRead(BaseModel):
+    batch_id: str
+    total: int
+    queued: int
+    running: int
+    done: int
+    failed: int
+    cancelled: int
+    progress: float
+    items: list[ProcessingJobRead]
+
+
+class ProcessingQueueStatus(BaseModel):
+    queued: int
+    running: int
+    workspace_active: int
+    active_ffmpeg: int
+    pending_provider_calls: int
+    free_disk_mb: int | None = None
@@ -4,7 +4,7 @@ from typing import Literal
 from pydantic import BaseModel, Field
 
 
-TranscriptionProvider = Literal["openai", "gemini", "whisper"]
+TranscriptionProvider = Literal["openai", "gemini", "whisper", "faster_whisper"]
 ReportProvider = Literal["openai", "claude", "gemini", "local"]
 
 
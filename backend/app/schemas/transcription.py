@@ -14,3 +14,6 @@ class TranscriptionRead(BaseModel):
     language_detected: str | None
     duration_seconds: float | None
     updated_at: datetime
+    # Enquanto TRANSCRIBING: texto ja decodificado pelo motor local e fracao concluida (0-1).
+    partial_text: str | None = None
+    progress: float | None = None
@@ -58,10 +58,15 @@ class ProcessRequest(BaseModel):
     transcription_provider: TranscriptionProvider | None = None
 
 
+class ProcessBatchRequest(ProcessRequest):
+    upload_ids: list[str] = Field(..., min_length=1, max_length=200)
+
+
 class ProcessingResponse(BaseModel):
     id: str
     status: ProcessingStatus
     message: str
+    job_id: str | None = None
 
 
 class UploadListResponse(BaseModel):
@@ -0,0 +1,109 @@
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.repositories.processing_job_repository import ProcessingJobRepository
+from app.schemas.processing import ProcessingQueueStatus
+from app.utils.ffmpeg import active_ffmpeg_processes
+
+
+# ffmpeg/ffprobe alem dos workers: sondagens e importacoes feitas no proprio request.
+FFMPEG_REQUEST_HEADROOM = 2
+
+_provider_lock = threading.Lock()
+_pending_provider_calls = 0
+
+
+@contextmanager
+def track_provider_call() -> Iterator[None]:
+    """Conta chamadas em andamento a provedores de IA (OpenAI, Gemini, Claude).
+
+    Envolve as cadeias de transcricao, relatorio/formulario, OCR e a analise
+    de imagem de modelo; o Whisper local e o Tesseract nao entram.
+    """
+    global _pending_provider_calls
+    with _provider_lock:
+        _pending_provider_calls += 1
+    try:
+        yield
+    finally:
+        with _provider_lock:
+            _pending_provider_calls -= 1
+
+
+def pending_provider_calls() -> int:
+    return _pending_provider_calls
+
+
+def _free_disk_mb() -> int | None:
+    try:
+        return int(shutil.disk_usage(get_settings().storage_dir).free / (1024 * 1024))
+    except OSError:
+        return None
+
+
+def read_queue_status(db: Session, workspace_id: str = "local-workspace") -> ProcessingQueueStatus:
+    """Profundidade da fila e recursos que a admissao observa.
+
+    ffmpeg ativos e chamadas pendentes sao deste processo: com run_worker.py
+    separado, a API enxerga so a fila do banco e o disco.
+    """
+    repository = ProcessingJobRepository(db)
+    counts = repository.count_by_status()
+    return ProcessingQueueStatus(
+        queued=counts.get("queued", 0),
+        running=counts.get("running", 0),
+        workspace_active=repository.count_active_for_workspace(workspace_id),
+        active_ffmpeg=active_ffmpeg_processes(),
+        pending_provider_calls=pending_provider_calls(),
+        free_disk_mb=_free_disk_mb(),
+    )
+
+
+def ffmpeg_admission_limit() -> int:
+    """Teto de ffmpeg ativos; no automatico acompanha o tamanho dos pools de workers."""
+    settings = get_settings()
+    if settings.admission_max_active_ffmpeg >= 0:
+        return settings.admission_max_active_ffmpeg
+    # Mesmo padrao do ProcessingWorkerPool: uma conversao por vaga do pipeline.
+    pipeline_slots = settings.processing_concurrency + max(1, settings.processing_stage_queue_size)
+    conversion_workers = settings.processing_conversion_workers or min(pipeline_slots, os.cpu_count() or 1)
+    return conversion_workers + settings.processing_concurrency + FFMPEG_REQUEST_HEADROOM
+
+
+def _reject(status_code: int, detail: str) -> HTTPException:
+    retry_after = max(1, get_settings().admission_retry_after_seconds)
+    return HTTPException(status_code=status_code, detail=detail, headers={"Retry-After": str(retry_after)})
+
+
+def ensure_capacity(db: Session, workspace_id: str = "local-workspace", incoming: int = 1) -> ProcessingQueueStatus:
+    """Recusa trabalho novo antes de o servidor entrar em swap ou encher o disco.
+
+    429 quando o proprio workspace ja tem jobs demais na fila; 503 quando o
+    servidor inteiro esta sem folga. ``incoming`` e quantos jobs o pedido
+    acrescenta (lotes). Os limites valem 0 para desligar.
+    """
+    settings = get_settings()
+    queue = read_queue_status(db, workspace_id)
+
+    if settings.admission_max_active_jobs_per_workspace and queue.workspace_active + incoming > settings.admission_max_active_jobs_per_workspace:
+        raise _reject(
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            f"Voce ja tem {queue.workspace_active} processamentos na fila. Aguarde alguns terminarem.",
+        )
+    if settings.admission_min_free_disk_mb and queue.free_disk_mb is not None and queue.free_disk_mb < settings.admission_min_free_disk_mb:
+        raise _reject(status.HTTP_503_SERVICE_UNAVAILABLE, "Servidor sem espaco em disco no momento. Tente novamente em instantes.")
+    if settings.admission_max_queued_jobs and queue.queued + incoming > settings.admission_max_queued_jobs:
+        raise _reject(status.HTTP_503_SERVICE_UNAVAILABLE, "Fila de processamento cheia. Tente novamente em instantes.")
+    ffmpeg_limit = ffmpeg_admission_limit()
+    if ffmpeg_limit and queue.active_ffmpeg >= ffmpeg_limit:
+        raise _reject(status.HTTP_503_SERVICE_UNAVAILABLE, "Servidor ocupado convertendo midias. Tente novamente em instantes.")
+    if settings.admission_max_pending_provider_calls and queue.pending_provider_calls >= settings.admission_max_pending_provider_calls:
+        raise _reject(status.HTTP_503_SERVICE_UNAVAILABLE, "Provedores de IA ocupados. Tente novamente em instantes.")
+    return queue
@@ -0,0 +1,114 @@
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, TypeVar
+
+from app.core.cancellation import JobCancelled, raise_if_cancelled
+from app.core.config import get_settings
+from app.services.whisper_chunking import CUT_SEARCH_RATIO, dedupe_boundary_words, plan_chunks
+from app.utils.ffmpeg import cut_audio, detect_silences, probe_duration_seconds
+from app.utils.files import safe_unlink
+
+
+logger = logging.getLogger("api_chunking")
+
+# As APIs so devolvem texto: uma sobreposicao maior garante a palavra do corte
+# inteira nos dois lados, e a emenda remove a repeticao.
+API_CHUNK_OVERLAP_SECONDS = 2.0
+
+T = TypeVar("T")
+
+_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_semaphores_lock = threading.Lock()
+
+
+def provider_chunk_limit(provider: str) -> int:
+    """Envios simultaneos de trechos por provedor (PROVIDER_CHUNK_CONCURRENCY="openai:4,...")."""
+    limits: dict[str, int] = {}
+    for item in get_settings().provider_chunk_concurrency.split(","):
+        name, _, value = item.partition(":")
+        if name.strip() and value.strip().isdigit():
+            limits[name.strip().lower()] = int(value)
+    return max(1, limits.get(provider, 1))
+
+
+def _provider_semaphore(provider: str) -> threading.BoundedSemaphore:
+    # Um limite por processo: jobs simultaneos dividem as mesmas vagas do provedor.
+    with _semaphores_lock:
+        semaphore = _semaphores.get(provider)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(provider_chunk_limit(provider))
+            _semaphores[provider] = semaphore
+        return semaphore
+
+
+def _acquire(semaphore: threading.BoundedSemaphore) -> None:
+    while not semaphore.acquire(timeout=1.0):
+        raise_if_cancelled()
+
+
+def merge_chunk_texts(texts: list[str]) -> str:
+    """Junta os textos dos trechos em ordem, sem as palavras repetidas na sobreposicao."""
+    merged = ""
+    for text in texts:
+        text = text.strip()
+        if merged and text:
+            text = dedupe_boundary_words(merged, text)
+        merged = f"{merged} {text}".strip() if text else merged
+    return merged
+
+
+def plan_api_chunks(audio_path: Path) -> list[tuple[float, float]]:
+    """Janelas (inicio, duracao) com sobreposicao, ou lista vazia quando o arquivo vai inteiro."""
+    chunk_seconds = get_settings().api_chunk_seconds
+    if chunk_seconds <= 0:
+        return []
+    try:
+        duration = probe_duration_seconds(audio_path)
+    except JobCancelled:
+        raise
+    except Exception:
+        return []
+    if not duration or duration <= chunk_seconds * (1 + CUT_SEARCH_RATIO):
+        return []
+
+    chunks = plan_chunks(duration, detect_silences(audio_path, duration=duration), chunk_seconds)
+    windows = []
+    for chunk in chunks:
+        start = max(0.0, chunk.start - (API_CHUNK_OVERLAP_SECONDS if chunk.index else 0.0))
+        end = min(duration, chunk.end + API_CHUNK_OVERLAP_SECONDS)
+        windows.append((start, end - start))
+    return windows
+
+
+def transcribe_chunks(provider: str, audio_path: Path, windows: list[tuple[float, float]], transcribe: Callable[[Path], T]) -> list[T]:
+    """Corta e envia os trechos em paralelo, respeitando o limite do provedor.
+
+    Cada trecho roda no contexto do job (cancelamento incluso) e e apagado
+    ao terminar; os resultados voltam na ordem do audio.
+    """
+    semaphore = _provider_semaphore(provider)
+
+    def run(start: float, duration: float) -> T:
+        _acquire(semaphore)
+        try:
+            raise_if_cancelled()
+            chunk_path = cut_audio(audio_path, start, duration)
+            try:
+                return transcribe(chunk_path)
+            finally:
+                safe_unlink(chunk_path)
+        finally:
+            semaphore.release()
+
+    print(f"[{provider}] {audio_path.name}: {len(windows)} trechos, ate {provider_chunk_limit(provider)} em paralelo", flush=True)
+    with ThreadPoolExecutor(max_workers=provider_chunk_limit(provider), thread_name_prefix=f"{provider}-chunk") as executor:
+        futures = [executor.submit(contextvars.copy_context().run, run, start, duration) for start, duration in windows]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
@@ -0,0 +1,111 @@
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.processing_checkpoint import ProcessingCheckpoint
+from app.repositories.processing_checkpoint_repository import ProcessingCheckpointRepository
+from app.repositories.processing_job_repository import ProcessingJobRepository
+from app.repositories.upload_repository import UploadRepository
+from app.services.settings_service import get_effective_provider_settings
+from app.utils.files import safe_unlink
+
+
+STAGE_CONVERT = "convert"
+STAGE_PROBE = "probe"
+STAGE_VAD = "vad"
+STAGE_TRANSCRIBE = "transcribe"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def fingerprint(*parts: object) -> str:
+    return hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def media_fingerprint(source_path: str | Path, recipe: str) -> str:
+    """Identifica o arquivo de origem + receita de conversao sem ler o conteudo."""
+    path = Path(source_path)
+    stat = path.stat()
+    return fingerprint(path.resolve(), stat.st_size, stat.st_mtime_ns, recipe)
+
+
+def load_checkpoint(db: Session, upload_id: str, stage: str, expected_fingerprint: str) -> ProcessingCheckpoint | None:
+    """Checkpoint valido para reaproveitar; o uso renova a retencao do artefato."""
+    repository = ProcessingCheckpointRepository(db)
+    checkpoint = repository.get(upload_id, stage)
+    if not checkpoint or checkpoint.fingerprint != expected_fingerprint:
+        return None
+    if checkpoint.artifact_path and not Path(checkpoint.artifact_path).is_file():
+        return None
+    checkpoint.updated_at = _utcnow()
+    return repository.save(checkpoint)
+
+
+def checkpoint_payload(checkpoint: ProcessingCheckpoint | None) -> dict[str, Any]:
+    if not checkpoint or not checkpoint.payload_json:
+        return {}
+    try:
+        data = json.loads(checkpoint.payload_json)
+    except json.JSONDecodeError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_checkpoint(
+    db: Session,
+    upload_id: str,
+    stage: str,
+    checkpoint_fingerprint: str,
+    *,
+    artifact_path: str | Path | None = None,
+    payload: dict[str, Any] | None = None,
+) -> ProcessingCheckpoint:
+    repository = ProcessingCheckpointRepository(db)
+    checkpoint = repository.get(upload_id, stage) or ProcessingCheckpoint(upload_id=upload_id, stage=stage)
+    if checkpoint.artifact_path and str(checkpoint.artifact_path) != str(artifact_path or ""):
+        safe_unlink(checkpoint.artifact_path)
+    checkpoint.fingerprint = checkpoint_fingerprint
+    checkpoint.artifact_path = str(artifact_path) if artifact_path else None
+    checkpoint.payload_json = json.dumps(payload, ensure_ascii=False) if payload is not None else None
+    checkpoint.updated_at = _utcnow()
+    return repository.save(checkpoint)
+
+
+def discard_checkpoints(db: Session, upload_id: str, stages: list[str] | None = None) -> None:
+    repository = ProcessingCheckpointRepository(db)
+    for checkpoint in repository.list_for_upload(upload_id):
+        if stages is None or checkpoint.stage in stages:
+            safe_unlink(checkpoint.artifact_path)
+    repository.delete_for_upload(upload_id, stages)
+
+
+def purge_expired_checkpoints(db: Session) -> int:
+    """Com limpeza automatica ligada, apaga o audio convertido apos a retencao configurada.
+
+    Uploads com job na fila ou rodando ficam de fora: o job pode estar lendo o arquivo.
+    """
+    if not bool(get_effective_provider_settings(db).get("auto_cleanup_temp_files")):
+        return 0
+
+    repository = ProcessingCheckpointRepository(db)
+    upload_repository = UploadRepository(db)
+    job_repository = ProcessingJobRepository(db)
+    cutoff = _utcnow() - timedelta(hours=max(0.0, get_settings().processing_checkpoint_retention_hours))
+    purged = 0
+    for checkpoint in repository.list_with_artifacts_before(cutoff):
+        if job_repository.get_active_for_upload(checkpoint.upload_id):
+            continue
+        upload = upload_repository.get(checkpoint.upload_id)
+        if upload and upload.converted_path == checkpoint.artifact_path:
+            upload.converted_path = None
+            upload_repository.save(upload)
+        discard_checkpoints(db, checkpoint.upload_id, [checkpoint.stage])
+        purged += 1
+    return purged
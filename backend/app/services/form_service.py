@@ -12,11 +12,8 @@ from app.schemas.form import FormDetectFieldsRequest, FormDetectFieldsResponse,
 from app.schemas.report import ReportExportExtension
 from app.services.report_service import (
     REPORT_EXPORT_MEDIA_TYPES,
-    _generate_claude,
-    _generate_gemini,
     _generate_local_fallback,
-    _generate_openai,
-    _report_provider_order,
+    _generate_with_providers,
     build_export_download_filename,
     build_report_prompt,
     write_docx_export,
@@ -53,28 +50,9 @@ def _run_report_provider_chain(
     local_fallback_request: str,
 ) -> tuple[str, TranscriptionEngine]:
     settings_data = get_effective_provider_settings(db)
-    content: str | None = None
-    engine = TranscriptionEngine.NONE
-    for provider in _report_provider_order(settings_data):
-        try:
-            if provider == "openai" and isinstance(settings_data.get("openai_api_key"), str) and settings_data["openai_api_key"]:
-                content, engine = _generate_openai(prompt, str(settings_data["openai_api_key"]))
-                break
-            if provider == "claude" and isinstance(settings_data.get("claude_api_key"), str) and settings_data["claude_api_key"]:
-                content, engine = _generate_claude(prompt, str(settings_data["claude_api_key"]))
-                break
-            if provider == "gemini" and isinstance(settings_data.get("gemini_api_key"), str) and settings_data["gemini_api_key"]:
-                content, engine = _generate_gemini(prompt, str(settings_data["gemini_api_key"]))
-                break
-            if provider == "local":
-                content, engine = _generate_local_fallback(local_fallback_title, local_fallback_source, local_fallback_request)
-                break
-        except Exception:
-            continue
-
-    if content is None:
-        content, engine = _generate_local_fallback(local_fallback_title, local_fallback_source, local_fallback_request)
-    return content, engine
+    return _generate_with_providers(settings_data, prompt) or _generate_local_fallback(
+        local_fallback_title, local_fallback_source, local_fallback_request
+    )
 
 
 def _template_field_specs(template_fields: list[dict] | None) -> list[dict[str, str]]:
@@ -117,17 +95,7 @@ def _build_field_detection_prompt(payload: FormDetectFieldsRequest, field_specs:
 
 def _run_field_detection_provider_chain(db: Session, prompt: str) -> tuple[str | None, TranscriptionEngine]:
     settings_data = get_effective_provider_settings(db)
-    for provider in _report_provider_order(settings_data):
-        try:
-            if provider == "openai" and isinstance(settings_data.get("openai_api_key"), str) and settings_data["openai_api_key"]:
-                return _generate_openai(prompt, str(settings_data["openai_api_key"]))
-            if provider == "claude" and isinstance(settings_data.get("claude_api_key"), str) and settings_data["claude_api_key"]:
-                return _generate_claude(prompt, str(settings_data["claude_api_key"]))
-            if provider == "gemini" and isinstance(settings_data.get("gemini_api_key"), str) and settings_data["gemini_api_key"]:
-                return _generate_gemini(prompt, str(settings_data["gemini_api_key"]))
-        except Exception:
-            continue
-    return None, TranscriptionEngine.NONE
+    return _generate_with_providers(settings_data, prompt, stop_at_local=False) or (None, TranscriptionEngine.NONE)
 
 
 def _extract_json_object(raw: str) -> dict[str, object]:
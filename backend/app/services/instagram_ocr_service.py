@@ -24,11 +24,13 @@ from app.schemas.instagram import (
     InstagramAnalyzeSlideResult,
     InstagramSlide,
 )
+from app.services.admission_service import track_provider_call
 from app.services.instagram_post_service import (
     _collect_slides,
     _extract_short_code,
     _used_cookies,
 )
+from app.services.provider_gateway import gemini_client, openai_client, provider_available, provider_call
 from app.services.settings_service import get_effective_provider_settings
 from app.services.upload_service import (
     _build_ydl_options,
@@ -42,6 +44,8 @@ logger = logging.getLogger(__name__)
 
 VISION_PROVIDER_ORDER = ("gemini", "openai", "tesseract")
 DEFAULT_VISION_OPENAI_MODEL = "gpt-4o-mini"
+# Tokens reservados no limite de taxa por imagem enviada ao OCR (imagem + texto extraido).
+OCR_IMAGE_TOKENS = 2000
 TESSERACT_LANGS = "por+eng"
 DOWNLOAD_TIMEOUT_SECONDS = 30
 MAX_DOWNLOAD_BYTES = 25 * 1024 * 1024
@@ -133,23 +137,22 @@ def _resolve_tesseract_binary() -> str | None:
 
 
 def _ocr_with_gemini(image_bytes: bytes, mime_type: str, api_key: str) -> str:
-    from google import genai
     from google.genai import types
 
     settings = get_settings()
-    client = genai.Client(api_key=api_key)
-    response = client.models.generate_content(
-        model=settings.gemini_report_model,
-        contents=[
-            types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
-            (
-                "Extraia literalmente todo o texto visivel desta imagem do Instagram. "
-                "Preserve quebras de linha, listas e ordem original. "
-                "Nao traduza, nao resuma, nao explique. "
-                "Se nao houver texto, responda apenas: SEM_TEXTO."
-            ),
-        ],
-    )
+    with provider_call("gemini", api_key, tokens=OCR_IMAGE_TOKENS):
+        response = gemini_client(api_key).models.generate_content(
+            model=settings.gemini_report_model,
+            contents=[
+                types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
+                (
+                    "Extraia literalmente todo o texto visivel desta imagem do Instagram. "
+                    "Preserve quebras de linha, listas e ordem original. "
+                    "Nao traduza, nao resuma, nao explique. "
+                    "Se nao houver texto, responda apenas: SEM_TEXTO."
+                ),
+            ],
+        )
     text = (getattr(response, "text", None) or "").strip()
     if not text:
         raise RuntimeError("Gemini retornou OCR vazio")
@@ -157,32 +160,29 @@ def _ocr_with_gemini(image_bytes: bytes, mime_type: str, api_key: str) -> str:
 
 
 def _ocr_with_openai(image_bytes: bytes, mime_type: str, api_key: str) -> str:
-    from openai import OpenAI
-
-    settings = get_settings()
-    client = OpenAI(api_key=api_key, timeout=settings.provider_timeout_seconds)
     encoded = base64.b64encode(image_bytes).decode("ascii")
     data_url = f"data:{mime_type};base64,{encoded}"
-    response = client.chat.completions.create(
-        model=DEFAULT_VISION_OPENAI_MODEL,
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": (
-                            "Extraia literalmente todo o texto visivel desta imagem do Instagram. "
-                            "Preserve quebras de linha, listas e ordem original. "
-                            "Nao traduza, nao resuma, nao explique. "
-                            "Se nao houver texto, responda apenas: SEM_TEXTO."
-                        ),
-                    },
-                    {"type": "image_url", "image_url": {"url": data_url}},
-                ],
-            }
-        ],
-    )
+    with provider_call("openai", api_key, tokens=OCR_IMAGE_TOKENS):
+        response = openai_client(api_key).chat.completions.create(
+            model=DEFAULT_VISION_OPENAI_MODEL,
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": (
+                                "Extraia literalmente todo o texto visivel desta imagem do Instagram. "
+                                "Preserve quebras de linha, listas e ordem original. "
+                                "Nao traduza, nao resuma, nao explique. "
+                                "Se nao houver texto, responda apenas: SEM_TEXTO."
+                            ),
+                        },
+                        {"type": "image_url", "image_url": {"url": data_url}},
+                    ],
+                }
+            ],
+        )
     content = response.choices[0].message.content or ""
     text = content.strip()
     if not text:
@@ -227,17 +227,21 @@ def _run_ocr_chain(
     last_error: Exception | None = None
 
     for provider in VISION_PROVIDER_ORDER:
+        if provider != "tesseract" and not provider_available(provider):
+            continue
         try:
             if provider == "gemini":
                 key = provider_settings.get("gemini_api_key")
                 if isinstance(key, str) and key.strip():
-                    return _ocr_with_gemini(image_bytes, mime_type, key.strip()), provider
+                    with track_provider_call():
+                        return _ocr_with_gemini(image_bytes, mime_type, key.strip()), provider
                 continue
 
             if provider == "openai":
                 key = provider_settings.get("openai_api_key")
                 if isinstance(key, str) and key.strip():
-                    return _ocr_with_openai(image_bytes, mime_type, key.strip()), provider
+                    with track_provider_call():
+                        return _ocr_with_openai(image_bytes, mime_type, key.strip()), provider
                 continue
 
             if provider == "tesseract":
@@ -0,0 +1,335 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.cancellation import cancel_local_job
+from app.core.config import get_settings
+from app.models.commercial import Workspace
+from app.models.enums import ProcessingStatus
+from app.models.processing_job import ProcessingJob
+from app.models.upload import Upload
+from app.repositories.processing_job_repository import ProcessingJobRepository
+from app.repositories.upload_repository import UploadRepository
+from app.schemas.processing import ProcessingBatchRead, ProcessingJobListResponse, ProcessingJobRead
+from app.schemas.upload import ProcessBatchRequest, ProcessRequest
+from app.services.usage_service import (
+    audio_video_credits,
+    consume_credits_batch,
+    plan_processing_concurrency,
+    plan_processing_priority,
+)
+from app.utils.ffmpeg import probe_duration_seconds
+
+
+INTERRUPTED_UPLOAD_STATUSES = [ProcessingStatus.CONVERTING, ProcessingStatus.TRANSCRIBING]
+FINISHED_JOB_STATUSES = ("done", "failed", "cancelled")
+# Quantos jobs da fila o escalonador compara a cada reivindicacao.
+SCHEDULER_WINDOW = 200
+# Custo assumido quando nem o ffprobe consegue ler a duracao da midia.
+UNKNOWN_DURATION_SECONDS = 1800.0
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _estimate_duration(upload: Upload) -> float | None:
+    """Duracao ja conhecida do upload; sem ela o reaper sonda a midia fora do request."""
+    return upload.duration_seconds or None
+
+
+def _workspace_plan(db: Session, workspace_id: str) -> str | None:
+    workspace = db.get(Workspace, workspace_id)
+    return workspace.plan if workspace else None
+
+
+def enqueue_processing_job(
+    db: Session,
+    upload: Upload,
+    payload: ProcessRequest,
+    workspace_id: str = "local-workspace",
+) -> ProcessingJob:
+    """Registra o pedido na fila; um segundo clique reaproveita o job ainda ativo."""
+    repository = ProcessingJobRepository(db)
+    active_job = repository.get_active_for_upload(upload.id)
+    if active_job:
+        return active_job
+
+    priority = plan_processing_priority(_workspace_plan(db, workspace_id))
+    return repository.create(_build_job(upload, payload, workspace_id, priority))
+
+
+def _build_job(
+    upload: Upload,
+    payload: ProcessRequest,
+    workspace_id: str,
+    priority: int,
+    batch_id: str | None = None,
+) -> ProcessingJob:
+    return ProcessingJob(
+        workspace_id=workspace_id,
+        upload_id=upload.id,
+        batch_id=batch_id,
+        status="queued",
+        language=payload.language,
+        force_reprocess=payload.force_reprocess,
+        use_api=payload.use_api,
+        whisper_model=payload.whisper_model,
+        transcription_provider=payload.transcription_provider,
+        priority=priority,
+        estimated_seconds=_estimate_duration(upload),
+    )
+
+
+def enqueue_processing_batch(
+    db: Session,
+    payload: ProcessBatchRequest,
+    workspace_id: str = "local-workspace",
+) -> ProcessingBatchRead:
+    """Enfileira varios uploads com as mesmas opcoes numa unica transacao.
+
+    O credito de inicio de todos os uploads e cobrado junto; se algo falhar,
+    nada e enfileirado nem cobrado. O custo pela duracao so e conferido contra o
+    saldo (melhor esforco, sem reserva, e so para midias de duracao ja
+    conhecida): quem cobra de fato e o worker. Uploads com job ativo (mesmo de
+    outro lote) entram no lote com esse job, sem criar outro; o lote sempre
+    relata todos os uploads pedidos.
+    """
+    upload_ids = list(dict.fromkeys(payload.upload_ids))
+    uploads = {upload.id: upload for upload in UploadRepository(db).list_by_ids(upload_ids, workspace_id)}
+    missing = [upload_id for upload_id in upload_ids if upload_id not in uploads]
+    if missing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Processos nao encontrados: {', '.join(missing)}")
+
+    repository = ProcessingJobRepository(db)
+    batch_id = str(uuid4())
+    priority = plan_processing_priority(_workspace_plan(db, workspace_id))
+    members: list[ProcessingJob] = []
+    new_jobs: list[ProcessingJob] = []
+    for upload_id in upload_ids:
+        job = repository.get_active_for_upload(upload_id)
+        if job is None:
+            job = _build_job(uploads[upload_id], payload, workspace_id, priority, batch_id)
+            new_jobs.append(job)
+        members.append(job)
+
+    try:
+        consume_credits_batch(
+            db,
+            workspace_id,
+            "media_processing_start",
+            [(f"process:{job.upload_id}:start", 1, {"upload_id": job.upload_id, "batch_id": batch_id}) for job in new_jobs],
+            reserve=[
+                (f"process:{job.upload_id}:duration", max(0, audio_video_credits(job.estimated_seconds) - 1))
+                for job in new_jobs
+            ],
+            commit=False,
+        )
+        db.add_all(new_jobs)
+        db.flush()
+        repository.add_batch_items(batch_id, members)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return read_processing_batch(db, batch_id, workspace_id)
+
+
+def count_new_batch_jobs(db: Session, upload_ids: list[str]) -> int:
+    """Quantos jobs o lote cria de fato; uploads com job ativo so entram no lote."""
+    repository = ProcessingJobRepository(db)
+    return sum(1 for upload_id in dict.fromkeys(upload_ids) if not repository.get_active_for_upload(upload_id))
+
+
+def read_processing_batch(db: Session, batch_id: str, workspace_id: str = "local-workspace") -> ProcessingBatchRead:
+    jobs = ProcessingJobRepository(db).list_for_batch(batch_id, workspace_id)
+    if not jobs:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lote de processamento não encontrado")
+
+    counts = {state: sum(1 for job in jobs if job.status == state) for state in ("queued", "running", *FINISHED_JOB_STATUSES)}
+    finished = sum(counts[state] for state in FINISHED_JOB_STATUSES)
+    return ProcessingBatchRead(
+        batch_id=batch_id,
+        total=len(jobs),
+        progress=round(finished / len(jobs), 4),
+        items=[ProcessingJobRead.model_validate(job) for job in jobs],
+        **counts,
+    )
+
+
+def get_processing_job_or_404(db: Session, job_id: str, workspace_id: str | None = None) -> ProcessingJob:
+    repository = ProcessingJobRepository(db)
+    job = repository.get_for_workspace(job_id, workspace_id) if workspace_id else repository.get(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job de processamento não encontrado")
+    return job
+
+
+def read_processing_job(db: Session, job_id: str, workspace_id: str = "local-workspace") -> ProcessingJobRead:
+    return ProcessingJobRead.model_validate(get_processing_job_or_404(db, job_id, workspace_id))
+
+
+def list_active_processing_jobs(db: Session, workspace_id: str = "local-workspace") -> ProcessingJobListResponse:
+    items = [ProcessingJobRead.model_validate(job) for job in ProcessingJobRepository(db).list_active(workspace_id)]
+    return ProcessingJobListResponse(items=items, total=len(items))
+
+
+def schedule_score(job: ProcessingJob, now: datetime) -> float:
+    """Custo do job para o escalonador shortest-job-first; menor sai primeiro.
+
+    Parte da duracao estimada da midia, desconta o tempo de espera (aging) e
+    a faixa de prioridade do plano.
+    """
+    settings = get_settings()
+    estimated = job.estimated_seconds if job.estimated_seconds is not None else UNKNOWN_DURATION_SECONDS
+    waited = max(0.0, (now - job.created_at).total_seconds())
+    return estimated - waited * settings.processing_aging_factor - job.priority * settings.processing_priority_lane_seconds
+
+
+def schedule_queued_jobs(
+    jobs: list[ProcessingJob],
+    now: datetime,
+    running_by_workspace: dict[str, int] | None = None,
+) -> list[ProcessingJob]:
+    """Ordena a fila com fair share entre workspaces e, dentro dela, SJF ou FIFO.
+
+    O workspace com menos jobs rodando em relacao ao seu peso (faixa do plano
+    + 1) vai primeiro, entao um tenant importando 200 videos nao segura os
+    clipes de quem mandou um arquivo so.
+    """
+    running_by_workspace = running_by_workspace or {}
+    shortest_first = get_settings().processing_scheduler.strip().lower() != "fifo"
+
+    def key(job: ProcessingJob) -> tuple[float, float, datetime]:
+        share = running_by_workspace.get(job.workspace_id, 0) / (job.priority + 1)
+        return (share, schedule_score(job, now) if shortest_first else 0.0, job.created_at)
+
+    return sorted(jobs, key=key)
+
+
+def claim_next_job(db: Session, worker_id: str) -> ProcessingJob | None:
+    settings = get_settings()
+    repository = ProcessingJobRepository(db)
+    candidates = repository.list_queued(SCHEDULER_WINDOW)
+    if not candidates:
+        return None
+
+    running_by_workspace = repository.count_running_by_workspace()
+    caps = {
+        workspace_id: plan_processing_concurrency(_workspace_plan(db, workspace_id))
+        for workspace_id in {candidate.workspace_id for candidate in candidates}
+    }
+    for candidate in schedule_queued_jobs(candidates, _utcnow(), running_by_workspace):
+        cap = caps[candidate.workspace_id]
+        if cap is not None and running_by_workspace.get(candidate.workspace_id, 0) >= cap:
+            continue
+        now = _utcnow()
+        lease_expires_at = now + timedelta(seconds=settings.processing_lease_seconds)
+        if repository.try_claim(candidate.id, worker_id, now, lease_expires_at, candidate.workspace_id, cap):
+            return repository.get(candidate.id)
+    return None
+
+
+def renew_job_lease(db: Session, job_id: str, worker_id: str) -> bool:
+    settings = get_settings()
+    now = _utcnow()
+    lease_expires_at = now + timedelta(seconds=settings.processing_lease_seconds)
+    return ProcessingJobRepository(db).renew_lease(job_id, worker_id, now, lease_expires_at)
+
+
+def cancel_processing_job(db: Session, job_id: str, workspace_id: str = "local-workspace") -> ProcessingJobRead:
+    """Cancela um job: na fila sai direto; rodando, o worker mata o ffmpeg e aborta o provedor."""
+    job = get_processing_job_or_404(db, job_id, workspace_id)
+    repository = ProcessingJobRepository(db)
+    now = _utcnow()
+    if not repository.cancel_queued(job.id, now):
+        if not repository.request_cancel(job.id, now):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Este processamento ja foi finalizado")
+        cancel_local_job(job.id)
+    db.expire_all()
+    return ProcessingJobRead.model_validate(get_processing_job_or_404(db, job_id, workspace_id))
+
+
+def is_job_cancel_requested(db: Session, job_id: str) -> bool:
+    return ProcessingJobRepository(db).is_cancel_requested(job_id)
+
+
+def finish_processing_job(db: Session, job: ProcessingJob, status_value: str, error: str | None = None) -> ProcessingJob:
+    job.status = status_value
+    job.error_message = error
+    if status_value == "done":
+        job.progress = 1.0
+    job.lease_expires_at = None
+    job.completed_at = _utcnow()
+    return ProcessingJobRepository(db).save(job)
+
+
+def estimate_queued_durations(db: Session) -> int:
+    """Sonda (ffprobe) a duracao dos jobs na fila que ainda nao tem estimativa.
+
+    Roda no reaper, nunca no request: enfileirar 200 uploads nao dispara 200
+    ffprobes sincronos. Sem leitura possivel fica o custo padrao, para nao
+    sondar o mesmo arquivo a cada rodada.
+    """
+    upload_repository = UploadRepository(db)
+    estimated = 0
+    for job in ProcessingJobRepository(db).list_queued(SCHEDULER_WINDOW):
+        if job.estimated_seconds is not None:
+            continue
+        upload = upload_repository.get(job.upload_id)
+        if not upload:
+            continue
+        try:
+            duration = probe_duration_seconds(upload.original_path)
+        except Exception:
+            duration = None
+        job.estimated_seconds = duration or UNKNOWN_DURATION_SECONDS
+        estimated += 1
+    if estimated:
+        db.commit()
+    return estimated
+
+
+def reap_expired_jobs(db: Session) -> dict[str, int]:
+    """Recupera jobs de workers que morreram no meio do pipeline.
+
+    Lease vencido volta para a fila enquanto houver tentativas; depois disso o
+    job e o upload ficam como erro. Uploads presos em CONVERTING/TRANSCRIBING
+    sem job ativo (processamentos antigos, de antes da fila) sao reenfileirados.
+    """
+    settings = get_settings()
+    repository = ProcessingJobRepository(db)
+    upload_repository = UploadRepository(db)
+    summary = {"requeued": 0, "failed": 0, "orphans_requeued": 0}
+    now = _utcnow()
+
+    for job in repository.list_expired(now):
+        exhausted = job.attempts >= settings.processing_max_attempts
+        error = f"Processamento interrompido {job.attempts} vez(es); limite de tentativas atingido" if exhausted else None
+        if not repository.release_expired(job.id, now, "failed" if exhausted else "queued", error):
+            continue
+
+        upload = upload_repository.get(job.upload_id)
+        if upload:
+            upload.status = ProcessingStatus.ERROR if exhausted else ProcessingStatus.UPLOADED
+            upload.error_message = error
+            upload_repository.save(upload)
+        summary["failed" if exhausted else "requeued"] += 1
+
+    for upload in upload_repository.list_by_statuses(INTERRUPTED_UPLOAD_STATUSES):
+        if repository.get_active_for_upload(upload.id):
+            continue
+        upload.status = ProcessingStatus.UPLOADED
+        upload_repository.save(upload)
+        enqueue_processing_job(
+            db,
+            upload,
+            # Interrompido no meio: refaz mesmo que reste uma transcricao anterior no upload.
+            ProcessRequest(language=settings.default_language, force_reprocess=True),
+            getattr(upload, "workspace_id", "local-workspace"),
+        )
+        summary["orphans_requeued"] += 1
+
+    return summary
@@ -0,0 +1,519 @@
+import contextvars
+import hashlib
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Generic, Hashable, Iterator, TypeVar
+
+from app.core.cancellation import CancellationToken, JobCancelled, cancellation_scope, current_token
+from app.core.config import get_settings
+
+
+logger = logging.getLogger("provider_gateway")
+
+T = TypeVar("T")
+
+# Clientes guardados por (provedor, chave); acima disso os menos usados saem do cache.
+MAX_CACHED_CLIENTS = 32
+# De quanto em quanto tempo uma chamada em andamento confere o cancelamento do job.
+CANCEL_POLL_SECONDS = 0.5
+
+_clients: OrderedDict[Hashable, Any] = OrderedDict()
+_clients_lock = threading.Lock()
+
+
+def _client_key(provider: str, api_key: str) -> tuple[str, str]:
+    # A chave da API nao fica exposta como chave do cache (logs, depuracao).
+    return provider, hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+def _cached_client(provider: str, api_key: str, factory: Callable[[], Any]) -> Any:
+    """Cliente do SDK reaproveitado entre chamadas, com o pool de conexoes HTTP dele.
+
+    Os SDKs (httpx por baixo) aceitam chamadas simultaneas de varias threads,
+    entao um cliente por chave basta para todos os jobs do processo.
+    """
+    key = _client_key(provider, api_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None:
+            _clients.move_to_end(key)
+            return client
+    # Construido fora do lock: importar o SDK na primeira vez pode demorar.
+    client = factory()
+    with _clients_lock:
+        existing = _clients.get(key)
+        if existing is not None:
+            return existing
+        _clients[key] = client
+        while len(_clients) > MAX_CACHED_CLIENTS:
+            # Sem fechar: outra thread pode estar no meio de uma chamada com ele.
+            _clients.popitem(last=False)
+    return client
+
+
+def openai_client(api_key: str) -> Any:
+    from openai import OpenAI
+
+    return _cached_client("openai", api_key, lambda: OpenAI(api_key=api_key, timeout=get_settings().provider_timeout_seconds))
+
+
+def gemini_client(api_key: str) -> Any:
+    from google import genai
+
+    return _cached_client("gemini", api_key, lambda: genai.Client(api_key=api_key))
+
+
+def anthropic_client(api_key: str) -> Any:
+    from anthropic import Anthropic
+
+    return _cached_client("claude", api_key, lambda: Anthropic(api_key=api_key, timeout=get_settings().provider_timeout_seconds))
+
+
+def run_cancellable(func: Callable[[], T]) -> T:
+    """Executa a chamada ao provedor liberando o job assim que ele for cancelado.
+
+    Com clientes compartilhados nao da mais para fechar o cliente no
+    cancelamento (derrubaria as chamadas dos outros jobs): a chamada segue
+    numa thread propria e o resultado e descartado. Fora de um job, chama direto.
+    """
+    token = current_token()
+    if token is None:
+        return func()
+
+    future: Future = Future()
+    context = contextvars.copy_context()
+
+    def run() -> None:
+        try:
+            future.set_result(context.run(func))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=run, name="provider-call", daemon=True).start()
+    while True:
+        try:
+            return future.result(timeout=CANCEL_POLL_SECONDS)
+        except FutureTimeoutError:
+            # Ate o Python 3.10 o timeout do Future nao e o TimeoutError embutido.
+            if token.cancelled:
+                raise JobCancelled()
+
+
+class ProviderUnavailableError(RuntimeError):
+    """Circuito do provedor aberto: a cadeia pula direto para o proximo."""
+
+
+# Peso da chamada mais recente na taxa de sucesso (media movel exponencial).
+HEALTH_SMOOTHING = 0.2
+# Latencias guardadas por provedor e operacao para os percentis.
+LATENCY_WINDOW = 200
+
+
+class ProviderBreaker:
+    """Disjuntor e saude de um provedor, compartilhados por todos os jobs do processo.
+
+    Abre depois de ``failure_threshold`` falhas seguidas; apos
+    ``cooldown_seconds`` deixa passar uma unica chamada de teste (meio
+    aberto), que fecha o circuito se der certo ou o reabre se falhar.
+    """
+
+    def __init__(self, provider: str, failure_threshold: int, cooldown_seconds: float) -> None:
+        self.provider = provider
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = max(0.0, cooldown_seconds)
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._success_rate = 1.0
+        self._calls = 0
+        self._failures = 0
+        # Por operacao ("report", "transcription", ...): cada uma tem sua escala de tempo.
+        self._latencies: dict[str, deque[float]] = {}
+
+    def state(self, now: float | None = None) -> str:
+        with self._lock:
+            return self._state_locked(now if now is not None else time.monotonic())
+
+    def _state_locked(self, now: float) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._probing or now - self._opened_at < self.cooldown_seconds:
+            return "open"
+        return "half_open"
+
+    def acquire(self) -> None:
+        with self._lock:
+            state = self._state_locked(time.monotonic())
+            if state == "open":
+                raise ProviderUnavailableError(f"{self.provider} indisponivel (circuito aberto)")
+            if state == "half_open":
+                self._probing = True
+
+    def record_success(self, seconds: float, operation: str = "default") -> None:
+        with self._lock:
+            self._calls += 1
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._probing = False
+            self._success_rate += HEALTH_SMOOTHING * (1.0 - self._success_rate)
+            self._latencies.setdefault(operation, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._calls += 1
+            self._failures += 1
+            self._consecutive_failures += 1
+            self._success_rate -= HEALTH_SMOOTHING * self._success_rate
+            if self._probing or self._consecutive_failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    logger.warning("[provedores] circuito de %s aberto por %.0fs", self.provider, self.cooldown_seconds)
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self) -> None:
+        """Chamada abandonada (job cancelado): nao conta como sucesso nem falha."""
+        with self._lock:
+            self._probing = False
+
+    def latency_percentile(self, percentile: float, operation: str = "default", min_samples: int = 1) -> float | None:
+        with self._lock:
+            latencies = sorted(self._latencies.get(operation, ()))
+        if not latencies or len(latencies) < min_samples:
+            return None
+        index = min(len(latencies) - 1, max(0, round(percentile / 100 * len(latencies)) - 1))
+        return latencies[index]
+
+    def snapshot(self) -> dict[str, object]:
+        with self._lock:
+            now = time.monotonic()
+            state = self._state_locked(now)
+            retry_in = None
+            if state == "open" and self._opened_at is not None and not self._probing:
+                retry_in = round(max(0.0, self.cooldown_seconds - (now - self._opened_at)), 1)
+            data: dict[str, object] = {
+                "state": state,
+                "score": round(self._success_rate, 3),
+                "calls": self._calls,
+                "failures": self._failures,
+                "consecutive_failures": self._consecutive_failures,
+                "retry_in_seconds": retry_in,
+            }
+            operations = list(self._latencies)
+        p50 = {operation: self.latency_percentile(50, operation) for operation in operations}
+        data["latency_p50_seconds"] = {operation: round(value, 3) for operation, value in p50.items() if value is not None}
+        return data
+
+
+_breakers: dict[str, ProviderBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider: str) -> ProviderBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            settings = get_settings()
+            breaker = ProviderBreaker(provider, settings.provider_breaker_failures, settings.provider_breaker_cooldown_seconds)
+            _breakers[provider] = breaker
+        return breaker
+
+
+def provider_available(provider: str) -> bool:
+    """Circuito fechado ou meio aberto: a cadeia confere antes de preparar a chamada."""
+    return get_breaker(provider).state() != "open"
+
+
+# Rajada maxima de cada balde, em segundos de vazao: acima disso as chamadas
+# saem espacadas, sem estourar o limite de uma vez e depois esperar o 429.
+RATE_BURST_SECONDS = 10.0
+# Pausa aplicada a chave inteira quando o provedor responde 429 sem Retry-After.
+RATE_LIMITED_PAUSE_SECONDS = 5.0
+# Estimativa grosseira de tokens por caractere de texto (portugues/ingles).
+CHARS_PER_TOKEN = 4
+
+
+class TokenBucket:
+    """Balde de fichas com reserva: quem chega debita na hora e espera a sua vez.
+
+    O saldo pode ficar negativo; a espera de cada chamada e o tempo ate a
+    reposicao cobrir a propria reserva, entao as chamadas saem em ordem de
+    chegada e no ritmo do limite, sem disputar o balde a cada reposicao.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = RATE_BURST_SECONDS) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self._level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Debita ``amount`` e devolve quantos segundos esperar antes de usar."""
+        self._refill(now)
+        self._level -= amount
+        return max(0.0, -self._level / self.rate)
+
+    def refund(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self._level = min(self.capacity, self._level + amount)
+
+    def pause(self, seconds: float, now: float) -> None:
+        # O provedor recusou: ninguem sai antes de ``seconds``.
+        self._refill(now)
+        self._level = min(self._level, -self.rate * seconds)
+
+
+def _per_provider_limits(raw: str) -> dict[str, float]:
+    limits: dict[str, float] = {}
+    for item in raw.split(","):
+        name, _, value = item.partition(":")
+        try:
+            limits[name.strip().lower()] = float(value)
+        except ValueError:
+            continue
+    return limits
+
+
+class RateLimiter:
+    """Limites de uma chave de API: requisicoes, tokens e segundos de audio por minuto."""
+
+    def __init__(self, provider: str, limits: dict[str, float]) -> None:
+        self.provider = provider
+        self._lock = threading.Lock()
+        self._buckets = {unit: TokenBucket(per_minute) for unit, per_minute in limits.items() if per_minute > 0}
+
+    def acquire(self, costs: dict[str, float]) -> None:
+        """Espera a vez da chamada; cancelar o job devolve a reserva e libera a fila."""
+        costs = {unit: amount for unit, amount in costs.items() if unit in self._buckets and amount > 0}
+        if not costs:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = max(self._buckets[unit].reserve(amount, now) for unit, amount in costs.items())
+        if delay <= 0:
+            return
+        logger.info("[provedores] %s: aguardando %.1fs pelo limite de taxa", self.provider, delay)
+        token = current_token()
+        if token is None:
+            time.sleep(delay)
+            return
+        if token.wait(delay):
+            with self._lock:
+                now = time.monotonic()
+                for unit, amount in costs.items():
+                    self._buckets[unit].refund(amount, now)
+            raise JobCancelled()
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            for bucket in self._buckets.values():
+                bucket.pause(seconds, now)
+
+
+_limiters: OrderedDict[Hashable, RateLimiter] = OrderedDict()
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, api_key: str) -> RateLimiter:
+    """Limitador por (provedor, chave): os limites dos provedores valem por chave."""
+    key = _client_key(provider, api_key)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            settings = get_settings()
+            limits = {
+                "requests": _per_provider_limits(settings.provider_requests_per_minute).get(provider, 0.0),
+                "tokens": _per_provider_limits(settings.provider_tokens_per_minute).get(provider, 0.0),
+                "audio_seconds": _per_provider_limits(settings.provider_audio_seconds_per_minute).get(provider, 0.0),
+            }
+            limiter = RateLimiter(provider, limits)
+            _limiters[key] = limiter
+            while len(_limiters) > MAX_CACHED_CLIENTS:
+                _limiters.popitem(last=False)
+        else:
+            _limiters.move_to_end(key)
+        return limiter
+
+
+def estimate_tokens(*texts: str) -> int:
+    return sum(len(text) for text in texts) // CHARS_PER_TOKEN + 1
+
+
+def _rate_limit_pause(exc: BaseException) -> float | None:
+    """Segundos a esperar se ``exc`` for um 429 do provedor; None para outras falhas."""
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    if status != 429 and "RESOURCE_EXHAUSTED" not in str(exc):
+        return None
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return RATE_LIMITED_PAUSE_SECONDS
+
+
+@contextmanager
+def provider_call(
+    provider: str,
+    api_key: str | None = None,
+    *,
+    tokens: float = 0,
+    audio_seconds: float = 0,
+    operation: str = "default",
+) -> Iterator[None]:
+    """Passa uma chamada pelo disjuntor e pelo limite de taxa do provedor.
+
+    Com o circuito aberto levanta ProviderUnavailableError na hora, sem
+    chamar a API; cancelamento do job nao conta como falha do provedor.
+    Com ``api_key``, espera a vez da chamada no limitador da chave
+    (``tokens`` e ``audio_seconds`` estimados); um 429 pausa a chave inteira
+    e tambem nao conta como falha: o provedor esta de pe, so saturado.
+    A latencia fica registrada por ``operation``; com ``audio_seconds`` ela e
+    guardada por segundo de audio, para comparar arquivos de tamanhos diferentes.
+    """
+    breaker = get_breaker(provider)
+    breaker.acquire()
+    limiter = get_rate_limiter(provider, api_key) if api_key else None
+    try:
+        if limiter is not None:
+            limiter.acquire({"requests": 1, "tokens": tokens, "audio_seconds": audio_seconds})
+    except BaseException:
+        breaker.release()
+        raise
+    started = time.monotonic()
+    try:
+        yield
+    except JobCancelled:
+        breaker.release()
+        raise
+    except Exception as exc:
+        pause = _rate_limit_pause(exc)
+        if pause is None:
+            breaker.record_failure()
+        else:
+            breaker.release()
+            if limiter is not None:
+                limiter.pause(pause)
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    elapsed = time.monotonic() - started
+    breaker.record_success(elapsed / audio_seconds if audio_seconds > 0 else elapsed, operation)
+
+
+def provider_health() -> dict[str, dict[str, object]]:
+    """Estado dos disjuntores para /api/health (so provedores ja chamados neste processo)."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.provider: breaker.snapshot() for breaker in breakers}
+
+
+# Amostras minimas de latencia antes de confiar no percentil; antes disso vale PROVIDER_HEDGE_DELAY_SECONDS.
+HEDGE_MIN_SAMPLES = 10
+# Nunca dispara o pedido extra antes disso, mesmo com um percentil muito baixo.
+HEDGE_MIN_DELAY_SECONDS = 1.0
+
+
+@dataclass
+class HedgeOutcome(Generic[T]):
+    value: T
+    provider: str
+    # Provedores chamados, em ordem; ``abandoned`` ainda rodavam quando o vencedor respondeu (custo extra).
+    launched: list[str] = field(default_factory=list)
+    abandoned: list[str] = field(default_factory=list)
+
+
+def hedge_delay(provider: str, operation: str, scale: float | None = 1.0) -> float:
+    """Quanto esperar pelo ``provider`` antes de chamar o proximo junto.
+
+    ``scale`` converte a latencia guardada por unidade (segundos de audio na
+    transcricao) para esta chamada; None usa o atraso fixo configurado.
+    """
+    settings = get_settings()
+    observed = get_breaker(provider).latency_percentile(settings.provider_hedge_percentile, operation, HEDGE_MIN_SAMPLES)
+    if observed is None or scale is None:
+        return max(HEDGE_MIN_DELAY_SECONDS, settings.provider_hedge_delay_seconds)
+    return max(HEDGE_MIN_DELAY_SECONDS, observed * scale)
+
+
+def run_hedged(attempts: list[tuple[str, Callable[[], T]]], operation: str, scale: float | None = 1.0) -> HedgeOutcome[T]:
+    """Percorre ``attempts`` (provedor, chamada) em ordem, com pedidos em paralelo.
+
+    Cada provedor tem ate o percentil das proprias latencias para responder;
+    passado isso o proximo e chamado junto, e uma falha chama o proximo na
+    hora. Vale a primeira resposta: os demais recebem cancelamento (as
+    chamadas ja enviadas sao descartadas, como em run_cancellable). Se
+    todos falharem, levanta o ultimo erro.
+    """
+    parent = current_token()
+    results: queue.Queue = queue.Queue()
+    tokens: list[CancellationToken] = []
+    launched: list[str] = []
+    running: set[int] = set()
+    deadline = 0.0
+    last_error: BaseException | None = None
+
+    def launch() -> None:
+        nonlocal deadline
+        index = len(launched)
+        provider, func = attempts[index]
+        token = CancellationToken()
+        tokens.append(token)
+        launched.append(provider)
+        running.add(index)
+        context = contextvars.copy_context()
+
+        def run() -> None:
+            try:
+                with cancellation_scope(token):
+                    results.put((index, True, func()))
+            except BaseException as exc:
+                results.put((index, False, exc))
+
+        threading.Thread(target=context.run, args=(run,), name=f"hedge-{provider}", daemon=True).start()
+        deadline = time.monotonic() + hedge_delay(provider, operation, scale)
+
+    launch()
+    try:
+        while running:
+            pending = len(launched) < len(attempts)
+            wait = min(0.5, max(0.0, deadline - time.monotonic())) if pending else 0.5
+            try:
+                index, ok, payload = results.get(timeout=wait)
+            except queue.Empty:
+                if parent is not None and parent.cancelled:
+                    raise JobCancelled()
+                if pending and time.monotonic() >= deadline:
+                    logger.info("[hedge] %s: %s passou do limite, chamando %s junto", operation, launched[-1], attempts[len(launched)][0])
+                    launch()
+                continue
+            running.discard(index)
+            if ok:
+                abandoned = [launched[other] for other in sorted(running)]
+                if abandoned:
+                    message = f"[hedge] {operation}: {launched[index]} respondeu primeiro; descartado(s) {', '.join(abandoned)} (custo extra)"
+                    logger.info(message)
+                    print(message, flush=True)
+                return HedgeOutcome(payload, launched[index], list(launched), abandoned)
+            if isinstance(payload, JobCancelled) and parent is not None and parent.cancelled:
+                raise payload
+            last_error = payload
+            logger.warning("[hedge] %s: %s falhou: %s", operation, launched[index], str(payload)[:300])
+            if len(launched) < len(attempts):
+                launch()
+        raise last_error or ProviderUnavailableError("Nenhum provedor respondeu")
+    finally:
+        for token in tokens:
+            token.cancel()
@@ -1,7 +1,9 @@
 import logging
 import re
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
+from typing import Callable
 from xml.sax.saxutils import escape
 
 from sqlalchemy.orm import Session
@@ -14,6 +16,16 @@ from app.repositories.report_repository import ReportRepository
 from app.repositories.report_template_repository import ReportTemplateRepository
 from app.repositories.upload_repository import UploadRepository
 from app.schemas.report import GenerateReportRequest, ReportExportExtension
+from app.services.admission_service import track_provider_call
+from app.services.provider_gateway import (
+    anthropic_client,
+    estimate_tokens,
+    gemini_client,
+    openai_client,
+    provider_available,
+    provider_call,
+    run_hedged,
+)
 from app.services.settings_service import get_effective_provider_settings
 from app.services.usage_service import consume_credits
 
@@ -36,6 +48,8 @@ REPORT_EXPORT_MEDIA_TYPES = {
     ReportExportExtension.PDF: "application/pdf",
 }
 EXPORT_CONTROL_CHARACTERS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]")
+# Teto de saida pedido ao Claude e reservado no limite de tokens de todos os provedores.
+REPORT_MAX_OUTPUT_TOKENS = 4096
 
 
 def _markdown_heading_level(line: str) -> int:
@@ -178,17 +192,15 @@ def build_report_prompt(
 
 
 def _generate_openai(prompt: str, api_key: str) -> tuple[str, TranscriptionEngine]:
-    from openai import OpenAI
-
     settings = get_settings()
-    client = OpenAI(api_key=api_key, timeout=settings.provider_timeout_seconds)
-    response = client.chat.completions.create(
-        model=settings.openai_report_model,
-        messages=[
-            {"role": "system", "content": "Você gera relatórios claros, objetivos e bem estruturados."},
-            {"role": "user", "content": prompt},
-        ],
-    )
+    with provider_call("openai", api_key, tokens=estimate_tokens(prompt) + REPORT_MAX_OUTPUT_TOKENS, operation="report"):
+        response = openai_client(api_key).chat.completions.create(
+            model=settings.openai_report_model,
+            messages=[
+                {"role": "system", "content": "Você gera relatórios claros, objetivos e bem estruturados."},
+                {"role": "user", "content": prompt},
+            ],
+        )
     content = response.choices[0].message.content or ""
     if not content.strip():
         raise RuntimeError("OpenAI retornou relatório vazio")
@@ -196,11 +208,9 @@ def _generate_openai(prompt: str, api_key: str) -> tuple[str, TranscriptionEngin
 
 
 def _generate_gemini(prompt: str, api_key: str) -> tuple[str, TranscriptionEngine]:
-    from google import genai
-
     settings = get_settings()
-    client = genai.Client(api_key=api_key)
-    response = client.models.generate_content(model=settings.gemini_report_model, contents=prompt)
+    with provider_call("gemini", api_key, tokens=estimate_tokens(prompt) + REPORT_MAX_OUTPUT_TOKENS, operation="report"):
+        response = gemini_client(api_key).models.generate_content(model=settings.gemini_report_model, contents=prompt)
     content = getattr(response, "text", None) or ""
     if not content.strip():
         raise RuntimeError("Gemini retornou relatório vazio")
@@ -208,16 +218,14 @@ def _generate_gemini(prompt: str, api_key: str) -> tuple[str, TranscriptionEngin
 
 
 def _generate_claude(prompt: str, api_key: str) -> tuple[str, TranscriptionEngine]:
-    from anthropic import Anthropic
-
     settings = get_settings()
-    client = Anthropic(api_key=api_key, timeout=settings.provider_timeout_seconds)
-    response = client.messages.create(
-        model=settings.claude_report_model,
-        max_tokens=4096,
-        system="Você gera relatórios claros, objetivos e bem estruturados.",
-        messages=[{"role": "user", "content": prompt}],
-    )
+    with provider_call("claude", api_key, tokens=estimate_tokens(prompt) + REPORT_MAX_OUTPUT_TOKENS, operation="report"):
+        response = anthropic_client(api_key).messages.create(
+            model=settings.claude_report_model,
+            max_tokens=REPORT_MAX_OUTPUT_TOKENS,
+            system="Você gera relatórios claros, objetivos e bem estruturados.",
+            messages=[{"role": "user", "content": prompt}],
+        )
     blocks = [getattr(block, "text", "") for block in getattr(response, "content", [])]
     content = "\n".join(block for block in blocks if block).strip()
     if not content:
@@ -247,6 +255,57 @@ def _report_provider_order(settings_data: dict[str, str | int | bool | None]) ->
     return ["openai", "claude", "gemini", "local"]
 
 
+def _log_report_failure(provider: str, exc: Exception) -> None:
+    # Sem este log, uma falha de rede/TLS/chave virava um relatorio
+    # gerado pelo modelo local sem nenhum aviso ao usuario.
+    detail = str(exc).strip() or exc.__class__.__name__
+    message = f"[relatorio] {provider} falhou, tentando o proximo provedor: {detail[:300]}"
+    logger.warning(message)
+    print(message, flush=True)
+
+
+def _generate_with_providers(
+    settings_data: dict[str, str | int | bool | None],
+    prompt: str,
+    *,
+    stop_at_local: bool = True,
+) -> tuple[str, TranscriptionEngine] | None:
+    """Percorre a cadeia de relatorio ate o modelo local; None quando nenhuma API respondeu.
+
+    Com ``stop_at_local=False`` o "local" da ordem e ignorado (usos em que o
+    modelo local nao serve, como extrair campos). Provedores com o circuito
+    aberto ficam de fora. Com PROVIDER_HEDGING, as APIs com chave sao chamadas
+    por run_hedged: a seguinte entra junto quando a atual demora alem do
+    percentil de latencia.
+    """
+    generators = {"openai": _generate_openai, "claude": _generate_claude, "gemini": _generate_gemini}
+    attempts: list[tuple[str, Callable[[], tuple[str, TranscriptionEngine]]]] = []
+    for provider in _report_provider_order(settings_data):
+        if provider == "local":
+            if stop_at_local:
+                break
+            continue
+        api_key = settings_data.get(f"{provider}_api_key")
+        if isinstance(api_key, str) and api_key and provider_available(provider):
+            attempts.append((provider, partial(generators[provider], prompt, api_key)))
+
+    if get_settings().provider_hedging and len(attempts) > 1:
+        try:
+            with track_provider_call():
+                return run_hedged(attempts, operation="report").value
+        except Exception as exc:
+            _log_report_failure("+".join(provider for provider, _ in attempts), exc)
+            return None
+
+    for provider, generate in attempts:
+        try:
+            with track_provider_call():
+                return generate()
+        except Exception as exc:
+            _log_report_failure(provider, exc)
+    return None
+
+
 def _read_report_or_error(db: Session, report_id: str, workspace_id: str | None = None) -> GeneratedReport:
     repository = ReportRepository(db)
     report = repository.get_for_workspace(report_id, workspace_id) if workspace_id else repository.get(report_id)
@@ -366,45 +425,9 @@ def generate_report(db: Session, payload: GenerateReportRequest, workspace_id: s
 
     settings_data = get_effective_provider_settings(db)
 
-    content: str | None = None
-    engine = TranscriptionEngine.NONE
-    for provider in _report_provider_order(settings_data):
-        try:
-            if provider == "openai":
-                openai_key = settings_data.get("openai_api_key")
-                if isinstance(openai_key, str) and openai_key:
-                    content, engine = _generate_openai(prompt, openai_key)
-                    break
-                continue
-
-            if provider == "claude":
-                claude_key = settings_data.get("claude_api_key")
-                if isinstance(claude_key, str) and claude_key:
-                    content, engine = _generate_claude(prompt, claude_key)
-                    break
-                continue
-
-            if provider == "gemini":
-                gemini_key = settings_data.get("gemini_api_key")
-                if isinstance(gemini_key, str) and gemini_key:
-                    content, engine = _generate_gemini(prompt, gemini_key)
-                    break
-                continue
-
-            if provider == "local":
-                content, engine = _generate_local_fallback(payload.title, upload.transcription_text, payload.custom_request)
-                break
-        except Exception as exc:
-            # Sem este log, uma falha de rede/TLS/chave virava um relatorio
-            # gerado pelo modelo local sem nenhum aviso ao usuario.
-            detail = str(exc).strip() or exc.__class__.__name__
-            message = f"[relatorio] {provider} falhou, tentando o proximo provedor: {detail[:300]}"
-            logger.warning(message)
-            print(message, flush=True)
-            continue
-
-    if content is None:
-        content, engine = _generate_local_fallback(payload.title, upload.transcription_text, payload.custom_request)
+    content, engine = _generate_with_providers(settings_data, prompt) or _generate_local_fallback(
+        payload.title, upload.transcription_text, payload.custom_request
+    )
 
     report = GeneratedReport(
         workspace_id=workspace_id,
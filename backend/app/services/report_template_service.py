@@ -20,7 +20,9 @@ from app.schemas.report_template import (
     ReportTemplateReferenceText,
     ReportTemplateUpdate,
 )
-from app.services.report_service import _generate_claude, _generate_gemini, _generate_openai, _report_provider_order
+from app.services.admission_service import track_provider_call
+from app.services.report_service import _generate_with_providers
+from app.services.provider_gateway import estimate_tokens, openai_client, provider_call
 from app.services.settings_service import get_effective_provider_settings
 
 
@@ -30,6 +32,8 @@ DOCX_REFERENCE_EXTENSIONS = {".docx"}
 ODT_REFERENCE_EXTENSIONS = {".odt"}
 PDF_REFERENCE_EXTENSIONS = {".pdf"}
 IMAGE_REFERENCE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp"}
+# Tokens reservados no limite de taxa pela imagem e pela resposta da analise.
+IMAGE_ANALYSIS_TOKENS = 3000
 
 
 def get_template(db: Session, template_id: str, workspace_id: str = "local-workspace") -> ReportTemplate:
@@ -455,21 +459,8 @@ def extract_template_reference_text(reference_file: UploadFile) -> ReportTemplat
 
 
 def _generate_reference_analysis_text(db: Session, prompt: str) -> str | None:
-    settings_data = get_effective_provider_settings(db)
-    for provider in _report_provider_order(settings_data):
-        try:
-            if provider == "openai" and isinstance(settings_data.get("openai_api_key"), str) and settings_data["openai_api_key"]:
-                content, _ = _generate_openai(prompt, str(settings_data["openai_api_key"]))
-                return content
-            if provider == "claude" and isinstance(settings_data.get("claude_api_key"), str) and settings_data["claude_api_key"]:
-                content, _ = _generate_claude(prompt, str(settings_data["claude_api_key"]))
-                return content
-            if provider == "gemini" and isinstance(settings_data.get("gemini_api_key"), str) and settings_data["gemini_api_key"]:
-                content, _ = _generate_gemini(prompt, str(settings_data["gemini_api_key"]))
-                return content
-        except Exception:
-            continue
-    return None
+    generated = _generate_with_providers(get_effective_provider_settings(db), prompt, stop_at_local=False)
+    return generated[0] if generated else None
 
 
 def _generate_reference_analysis_image(db: Session, prompt: str, data: bytes, content_type: str | None) -> str:
@@ -478,24 +469,22 @@ def _generate_reference_analysis_image(db: Session, prompt: str, data: bytes, co
     if not isinstance(openai_key, str) or not openai_key:
         raise ValueError("Configure uma chave OpenAI para a IA analisar imagens de modelos.")
 
-    from openai import OpenAI
-
     media_type = content_type or "image/png"
-    client = OpenAI(api_key=openai_key, timeout=get_settings().provider_timeout_seconds)
     encoded = base64.b64encode(data).decode("ascii")
-    response = client.chat.completions.create(
-        model=get_settings().openai_report_model,
-        messages=[
-            {"role": "system", "content": "Voce transforma documentos e imagens em modelos reutilizaveis de formulario."},
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {"type": "image_url", "image_url": {"url": f"data:{media_type};base64,{encoded}"}},
-                ],
-            },
-        ],
-    )
+    with track_provider_call(), provider_call("openai", openai_key, tokens=estimate_tokens(prompt) + IMAGE_ANALYSIS_TOKENS):
+        response = openai_client(openai_key).chat.completions.create(
+            model=get_settings().openai_report_model,
+            messages=[
+                {"role": "system", "content": "Voce transforma documentos e imagens em modelos reutilizaveis de formulario."},
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt},
+                        {"type": "image_url", "image_url": {"url": f"data:{media_type};base64,{encoded}"}},
+                    ],
+                },
+            ],
+        )
     content = response.choices[0].message.content or ""
     if not content.strip():
         raise ValueError("A IA retornou uma analise vazia da imagem.")
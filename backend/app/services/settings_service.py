@@ -9,7 +9,7 @@ from app.repositories.settings_repository import SettingsRepository
 from app.schemas.settings import SettingsRead, SettingsUpdate
 
 
-DEFAULT_TRANSCRIPTION_PROVIDER_ORDER = ["openai", "gemini", "whisper"]
+DEFAULT_TRANSCRIPTION_PROVIDER_ORDER = ["openai", "gemini", "whisper", "faster_whisper"]
 DEFAULT_REPORT_PROVIDER_ORDER = ["openai", "claude", "gemini", "local"]
 ORDER_FIELDS = {
     "transcription_provider_order": DEFAULT_TRANSCRIPTION_PROVIDER_ORDER,
@@ -111,6 +111,7 @@ def _normalize_provider_order(value: str | list[str] | None, fallback: list[str]
         if item and item in fallback and item not in normalized:
             normalized.append(item)
 
+    # Provedor novo vai para o fim: a ordem salva pelo usuario fica como esta.
     for item in fallback:
         if item not in normalized:
             normalized.append(item)
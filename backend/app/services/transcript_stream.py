@@ -0,0 +1,101 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.repositories.processing_job_repository import ProcessingJobRepository
+from app.repositories.transcript_segment_repository import TranscriptSegmentRepository
+from app.services.vad_service import TimestampMap, remap_segments
+
+
+logger = logging.getLogger("transcript_stream")
+
+
+class TranscriptSink:
+    """Destino dos segmentos que o motor local vai decodificando."""
+
+    def restart(self) -> None:
+        """Nova tentativa (retry ou proximo motor): descarta o parcial anterior."""
+
+    def emit(self, segments: list[dict[str, Any]], progress: float | None = None) -> None:
+        """Segmentos novos, com tempos do audio transcrito, e a fracao ja concluida."""
+
+
+class DatabaseTranscriptSink(TranscriptSink):
+    """Grava os segmentos do upload e o progresso do job conforme chegam.
+
+    Usa sessao propria a cada escrita para nao misturar com a transacao da
+    etapa de transcricao. Falhas so sao registradas: o parcial e um extra e
+    nunca deve derrubar a transcricao.
+    """
+
+    def __init__(self, upload_id: str, job_id: str | None = None, timestamp_map: TimestampMap | None = None) -> None:
+        self.upload_id = upload_id
+        self.job_id = job_id
+        self.timestamp_map = timestamp_map
+
+    def restart(self) -> None:
+        self._write([], 0.0, replace=True)
+
+    def emit(self, segments: list[dict[str, Any]], progress: float | None = None) -> None:
+        if self.timestamp_map:
+            segments = remap_segments(segments, self.timestamp_map)
+        self._write(segments, progress)
+
+    def _write(self, segments: list[dict[str, Any]], progress: float | None, replace: bool = False) -> None:
+        db = SessionLocal()
+        try:
+            segment_repository = TranscriptSegmentRepository(db)
+            if replace:
+                segment_repository.delete_for_upload(self.upload_id)
+            if segments:
+                segment_repository.append(self.upload_id, segments)
+            if self.job_id and progress is not None:
+                ProcessingJobRepository(db).set_progress(self.job_id, round(min(1.0, max(0.0, progress)), 4))
+        except Exception:
+            logger.exception("Falha ao gravar transcricao parcial do upload %s", self.upload_id)
+        finally:
+            db.close()
+
+
+_current_sink: ContextVar[TranscriptSink | None] = ContextVar("transcript_sink", default=None)
+
+
+def current_sink() -> TranscriptSink | None:
+    return _current_sink.get()
+
+
+def streaming_enabled() -> bool:
+    return _current_sink.get() is not None
+
+
+@contextmanager
+def transcript_scope(sink: TranscriptSink | None) -> Iterator[None]:
+    reset = _current_sink.set(sink)
+    try:
+        yield
+    finally:
+        _current_sink.reset(reset)
+
+
+def restart_transcript_stream() -> None:
+    sink = _current_sink.get()
+    if sink is not None:
+        sink.restart()
+
+
+def emit_transcript_segments(segments: list[dict[str, Any]], progress: float | None = None) -> None:
+    sink = _current_sink.get()
+    if sink is not None and (segments or progress is not None):
+        sink.emit(segments, progress)
+
+
+def read_partial_transcript(db: Session, upload_id: str) -> tuple[str | None, float | None]:
+    """Texto ja decodificado e fracao concluida de um upload ainda em transcricao."""
+    segments = TranscriptSegmentRepository(db).list_for_upload(upload_id)
+    job = ProcessingJobRepository(db).get_active_for_upload(upload_id)
+    partial_text = " ".join(segment.text for segment in segments if segment.text).strip() or None
+    return partial_text, job.progress if job else None
@@ -1,14 +1,44 @@
 import logging
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
 from typing import Any, Callable, Literal
 
 from sqlalchemy.orm import Session
 
+from app.core.cancellation import JobCancelled, current_token, raise_if_cancelled
 from app.core.config import get_settings
 from app.models.enums import TranscriptionEngine
+from app.services.admission_service import track_provider_call
+from app.services.api_chunking import merge_chunk_texts, plan_api_chunks, transcribe_chunks
+from app.services.provider_gateway import (
+    ProviderUnavailableError,
+    gemini_client,
+    openai_client,
+    provider_available,
+    provider_call,
+    run_cancellable,
+    run_hedged,
+)
 from app.services.settings_service import get_effective_provider_settings
+from app.services.transcript_stream import emit_transcript_segments, restart_transcript_stream, streaming_enabled
+from app.services.whisper_chunking import CUT_SEARCH_RATIO, plan_chunks, should_chunk, transcribe_chunked
+from app.services.whisper_inference_pool import inference_pool_enabled, run_inference
+from app.services.whisper_runtime import (
+    acquire_faster_whisper_model,
+    acquire_whisper_model,
+    whisper_device,
+    whisper_quantization_enabled,
+)
+from app.utils.ffmpeg import (
+    AUDIO_PROFILES,
+    DEFAULT_AUDIO_PROFILE,
+    PCM_SAMPLE_RATE,
+    detect_silences,
+    load_audio_pcm,
+    probe_duration_seconds,
+)
 
 
 logger = logging.getLogger("transcription")
@@ -24,21 +54,47 @@ class TranscriptionResult:
     engine: TranscriptionEngine
     language_detected: str | None
     metadata: dict[str, Any]
+    # Segmentos com tempo ({start, end, text}) quando o motor informa; as APIs so devolvem texto.
+    segments: list[dict[str, Any]] = field(default_factory=list)
 
 
-TranscriptionProviderName = Literal["openai", "gemini", "whisper"]
+# Caracteres do fim da janela anterior passados como contexto para a seguinte.
+WINDOW_PROMPT_CHARS = 200
+
+TranscriptionProviderName = Literal["openai", "gemini", "whisper", "faster_whisper"]
+TRANSCRIPTION_PROVIDERS = ("openai", "gemini", "whisper", "faster_whisper")
+# Motores que rodam na maquina; "whisper" e o ultimo recurso de qualquer cadeia.
+LOCAL_TRANSCRIPTION_PROVIDERS = ("faster_whisper", "whisper")
+# Formato de audio de cada API (o Gemini nao lista Opus entre os formatos aceitos).
+PROVIDER_AUDIO_PROFILES = {"openai": "speech_opus", "gemini": "speech_mp3"}
+LOCAL_AUDIO_PROFILE = "pcm_wav"
+# O Gemini cobra audio em tokens (~32 por segundo), que contam no limite de tokens por minuto.
+GEMINI_AUDIO_TOKENS_PER_SECOND = 32
 
 
 def _run_with_retries(func: Callable[[], TranscriptionResult], retries: int) -> TranscriptionResult:
     last_error: Exception | None = None
+    token = current_token()
     for attempt in range(retries + 1):
+        raise_if_cancelled()
         try:
             return func()
+        except (JobCancelled, ProviderUnavailableError):
+            # Circuito aberto: repetir so adiaria o proximo provedor da cadeia.
+            raise
+        except ImportError as exc:
+            # Motor opcional nao instalado: repetir so atrasaria o proximo da cadeia.
+            raise ProviderExecutionError(f"Dependencia nao instalada: {exc.name or exc}") from exc
         except Exception as exc:
+            raise_if_cancelled()
             last_error = exc
             if attempt >= retries:
                 break
-            time.sleep(min(2 * (attempt + 1), 5))
+            delay = min(2 * (attempt + 1), 5)
+            if token is not None:
+                token.wait(delay)
+            else:
+                time.sleep(delay)
     raise ProviderExecutionError(str(last_error) if last_error else "Falha no provedor")
 
 
@@ -49,26 +105,38 @@ def _language_hint(language: str | None) -> str | None:
     return normalized or None
 
 
+def _audio_seconds(audio_path: Path) -> float:
+    """Duracao para o limitador de taxa; sem ffprobe, a chamada conta so como requisicao."""
+    try:
+        return probe_duration_seconds(audio_path) or 0.0
+    except JobCancelled:
+        raise
+    except Exception:
+        return 0.0
+
+
 def _normalize_provider(provider: str | None) -> TranscriptionProviderName | None:
     if not provider:
         return None
     normalized = provider.strip().lower()
-    if normalized in {"openai", "gemini", "whisper"}:
+    if normalized in TRANSCRIPTION_PROVIDERS:
         return normalized
     return None
 
 
 def _transcribe_openai(audio_path: Path, language: str | None, api_key: str) -> TranscriptionResult:
-    from openai import OpenAI
-
     settings = get_settings()
-    client = OpenAI(api_key=api_key, timeout=settings.provider_timeout_seconds)
-    with audio_path.open("rb") as audio_file:
-        response = client.audio.transcriptions.create(
-            model=settings.openai_transcription_model,
-            file=audio_file,
-            language=_language_hint(language),
+    client = openai_client(api_key)
+    seconds = _audio_seconds(audio_path)
+    with provider_call("openai", api_key, audio_seconds=seconds, operation="transcription"), audio_path.open("rb") as audio_file:
+        response = run_cancellable(
+            lambda: client.audio.transcriptions.create(
+                model=settings.openai_transcription_model,
+                file=audio_file,
+                language=_language_hint(language),
+            )
         )
+    raise_if_cancelled()
     text = getattr(response, "text", None) or ""
     if not text.strip():
         raise ProviderExecutionError("OpenAI retornou transcrição vazia")
@@ -81,22 +149,33 @@ def _transcribe_openai(audio_path: Path, language: str | None, api_key: str) ->
 
 
 def _transcribe_gemini(audio_path: Path, language: str | None, api_key: str) -> TranscriptionResult:
-    from google import genai
-
     settings = get_settings()
-    client = genai.Client(api_key=api_key)
-    uploaded = client.files.upload(file=str(audio_path))
-    while getattr(uploaded.state, "name", "") == "PROCESSING":
-        time.sleep(2)
-        uploaded = client.files.get(name=uploaded.name)
+    client = gemini_client(api_key)
     prompt = (
         "Transcreva o arquivo de áudio com máxima fidelidade, mantendo nomes, números e estrutura. "
         f"Idioma preferencial: {language or 'auto-detect'}"
     )
-    response = client.models.generate_content(
-        model=settings.gemini_transcription_model,
-        contents=[prompt, uploaded],
-    )
+    seconds = _audio_seconds(audio_path)
+    with provider_call(
+        "gemini",
+        api_key,
+        audio_seconds=seconds,
+        tokens=seconds * GEMINI_AUDIO_TOKENS_PER_SECOND,
+        operation="transcription",
+    ):
+        uploaded = run_cancellable(lambda: client.files.upload(file=str(audio_path)))
+        while getattr(uploaded.state, "name", "") == "PROCESSING":
+            raise_if_cancelled()
+            time.sleep(2)
+            uploaded = client.files.get(name=uploaded.name)
+        raise_if_cancelled()
+        response = run_cancellable(
+            lambda: client.models.generate_content(
+                model=settings.gemini_transcription_model,
+                contents=[prompt, uploaded],
+            )
+        )
+    raise_if_cancelled()
     text = getattr(response, "text", None) or ""
     if not text.strip():
         raise ProviderExecutionError("Gemini retornou transcrição vazia")
@@ -108,38 +187,254 @@ def _transcribe_gemini(audio_path: Path, language: str | None, api_key: str) ->
     )
 
 
-def _transcribe_whisper(audio_path: Path, language: str | None, model_name: str) -> TranscriptionResult:
-    import whisper
-    import torch
+def _transcribe_with_api(provider: str, audio_path: Path, language: str | None, api_key: str, retries: int) -> TranscriptionResult:
+    """Arquivo longo vai em trechos paralelos, cada um com as proprias tentativas.
+
+    Com o circuito aberto desiste antes de sondar, procurar silencios e cortar
+    os trechos, trabalho que seria jogado fora.
+    """
+    if not provider_available(provider):
+        raise ProviderUnavailableError(f"{provider} indisponivel (circuito aberto)")
+    transcribe = {"openai": _transcribe_openai, "gemini": _transcribe_gemini}[provider]
+    windows = plan_api_chunks(audio_path)
+    if not windows:
+        return _run_with_retries(lambda: transcribe(audio_path, language, api_key), retries)
+
+    def transcribe_chunk(chunk_path: Path) -> TranscriptionResult:
+        return _run_with_retries(lambda: transcribe(chunk_path, language, api_key), retries)
+
+    start = time.monotonic()
+    results = transcribe_chunks(provider, audio_path, windows, transcribe_chunk)
+    print(f"[{provider}] {len(results)} trechos transcritos em {time.monotonic() - start:.1f}s", flush=True)
+    first = results[0]
+    return TranscriptionResult(
+        text=merge_chunk_texts([result.text for result in results]),
+        engine=first.engine,
+        language_detected=first.language_detected,
+        metadata={**first.metadata, "chunks": len(results)},
+    )
+
 
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    use_fp16 = device == "cuda"
+def _hedge_group(remaining: list[TranscriptionProviderName], config: dict[str, Any]) -> list[str]:
+    """APIs com chave que abrem o resto da cadeia, ate o primeiro motor local."""
+    group: list[str] = []
+    for provider in remaining:
+        if provider not in PROVIDER_AUDIO_PROFILES:
+            break
+        api_key = config.get(f"{provider}_api_key")
+        if isinstance(api_key, str) and api_key and provider_available(provider):
+            group.append(provider)
+    return group
 
-    logger.info("[whisper] carregando modelo '%s' em %s", model_name, device)
-    print(f"[whisper] carregando modelo '{model_name}' em {device}", flush=True)
-    model = whisper.load_model(model_name, device=device)
 
-    logger.info("[whisper] iniciando transcricao de %s (fp16=%s)", audio_path.name, use_fp16)
-    print(f"[whisper] iniciando transcricao de {audio_path.name} (fp16={use_fp16})", flush=True)
+def _transcribe_hedged(
+    providers: list[str],
+    audio_path: Path,
+    language: str | None,
+    config: dict[str, Any],
+    retries: int,
+) -> TranscriptionResult:
+    """Transcreve com as APIs de ``providers`` em pedidos paralelos (PROVIDER_HEDGING).
+
+    O limite de espera de cada uma e o percentil da latencia por segundo de
+    audio vezes a duracao deste arquivo.
+    """
+    seconds = _audio_seconds(audio_path)
+    outcome = run_hedged(
+        [(provider, partial(_transcribe_with_api, provider, audio_path, language, config[f"{provider}_api_key"], retries)) for provider in providers],
+        operation="transcription",
+        scale=seconds or None,
+    )
+    result = outcome.value
+    if len(outcome.launched) > 1:
+        result.metadata = {**result.metadata, "hedge": {"launched": outcome.launched, "abandoned": outcome.abandoned}}
+    return result
+
+
+def _transcribe_whisper_chunked(
+    audio_path: Path,
+    language: str | None,
+    model_name: str,
+    duration: float,
+    silences: list[tuple[float, float]] | None,
+) -> TranscriptionResult:
+    restart_transcript_stream()
     start = time.monotonic()
-    result = model.transcribe(
-        str(audio_path),
-        language=_language_hint(language),
-        fp16=use_fp16,
-        verbose=True,
+    result = transcribe_chunked(audio_path, _language_hint(language), model_name, duration, silences)
+    elapsed = time.monotonic() - start
+    logger.info("[whisper] transcricao em %s trechos concluida em %.1fs", result["chunks"], elapsed)
+    print(f"[whisper] transcricao em {result['chunks']} trechos concluida em {elapsed:.1f}s", flush=True)
+
+    if not result["text"]:
+        raise ProviderExecutionError("Whisper retornou transcrição vazia")
+    return TranscriptionResult(
+        text=result["text"],
+        engine=TranscriptionEngine.WHISPER,
+        language_detected=result["language"] or language,
+        metadata={
+            "model": model_name,
+            "device": "cpu",
+            "chunks": result["chunks"],
+            **({"quantization": "int8"} if whisper_quantization_enabled("cpu") else {}),
+        },
+        segments=result["segments"],
     )
+
+
+def _transcribe_whisper_windows(
+    model: Any,
+    audio_path: Path,
+    language: str | None,
+    use_fp16: bool,
+    duration: float,
+    window_seconds: int,
+    silences: list[tuple[float, float]] | None = None,
+) -> dict[str, Any]:
+    """Decodifica em janelas cortadas nos silencios, publicando cada uma ao terminar.
+
+    O ``model.transcribe`` do openai-whisper so devolve o texto no fim do
+    arquivo; em janelas o usuario ve o parcial em segundos. O fim da janela
+    anterior segue como contexto (initial_prompt) para manter a continuidade.
+    Os silencios vem do pre-passe de VAD; sem ele o arquivo e varrido aqui.
+    """
+    audio = load_audio_pcm(audio_path)
+    if silences is None:
+        silences = detect_silences(audio_path, duration=duration)
+    windows = plan_chunks(duration, silences, window_seconds)
+    segments: list[dict[str, Any]] = []
+    language_detected: str | None = None
+    prompt: str | None = None
+    for window in windows:
+        raise_if_cancelled()
+        piece = audio[int(window.start * PCM_SAMPLE_RATE) : int(window.end * PCM_SAMPLE_RATE)]
+        result = model.transcribe(piece, language=language or language_detected, fp16=use_fp16, initial_prompt=prompt)
+        language_detected = language_detected or result.get("language")
+        window_segments = [
+            {"start": window.start + float(segment["start"]), "end": window.start + float(segment["end"]), "text": str(segment["text"]).strip()}
+            for segment in result.get("segments") or []
+        ]
+        segments.extend(window_segments)
+        emit_transcript_segments(window_segments, window.end / duration)
+        window_text = " ".join(segment["text"] for segment in window_segments).strip()
+        prompt = window_text[-WINDOW_PROMPT_CHARS:] or prompt
+    return {
+        "text": " ".join(segment["text"] for segment in segments if segment["text"]),
+        "segments": segments,
+        "language": language_detected,
+    }
+
+
+def decode_whisper_audio(
+    audio_path: str,
+    language: str | None,
+    model_name: str,
+    duration: float | None,
+    silences: list[tuple[float, float]] | None = None,
+) -> dict[str, Any]:
+    """Transcreve o arquivo inteiro com o modelo residente do processo.
+
+    Roda no pool de inferencia (CPU) ou no proprio processo (GPU/pool
+    desligado); publica o parcial no destino do contexto e devolve texto,
+    segmentos, idioma e dispositivo.
+    """
+    path = Path(audio_path)
+    restart_transcript_stream()
+    window_seconds = get_settings().whisper_stream_window_seconds
+    windowed = streaming_enabled() and window_seconds > 0 and bool(duration) and duration > window_seconds * (1 + CUT_SEARCH_RATIO)
+    with acquire_whisper_model(model_name) as (model, device):
+        use_fp16 = device == "cuda"
+        raise_if_cancelled()
+        logger.info("[whisper] iniciando transcricao de %s (fp16=%s)", path.name, use_fp16)
+        print(f"[whisper] iniciando transcricao de {path.name} (fp16={use_fp16})", flush=True)
+        if windowed:
+            result = _transcribe_whisper_windows(model, path, language, use_fp16, duration, window_seconds, silences)
+        else:
+            # PCM pronto em memoria: o whisper nao abre outro ffmpeg para decodificar o arquivo.
+            result = model.transcribe(load_audio_pcm(path), language=language, fp16=use_fp16, verbose=True)
+    raise_if_cancelled()
+
+    segments = [
+        {"start": float(segment["start"]), "end": float(segment["end"]), "text": str(segment["text"]).strip()}
+        for segment in result.get("segments") or []
+    ]
+    if not windowed:
+        emit_transcript_segments(segments, 1.0)
+    return {
+        "text": (result.get("text") or "").strip(),
+        "segments": segments,
+        "language": result.get("language"),
+        "device": device,
+    }
+
+
+def _transcribe_whisper(
+    audio_path: Path,
+    language: str | None,
+    model_name: str,
+    silences: list[tuple[float, float]] | None = None,
+) -> TranscriptionResult:
+    try:
+        duration = probe_duration_seconds(audio_path)
+    except JobCancelled:
+        raise
+    except Exception:
+        duration = None
+    device = whisper_device()
+    if should_chunk(duration, device):
+        return _transcribe_whisper_chunked(audio_path, language, model_name, duration, silences)
+
+    start = time.monotonic()
+    args = (str(audio_path), _language_hint(language), model_name, duration, silences)
+    # Em CPU a inferencia vai para o pool dedicado: threads do torch repartidas e sem GIL compartilhado.
+    result = run_inference(decode_whisper_audio, *args) if inference_pool_enabled(device) else decode_whisper_audio(*args)
     elapsed = time.monotonic() - start
     logger.info("[whisper] transcricao concluida em %.1fs", elapsed)
     print(f"[whisper] transcricao concluida em {elapsed:.1f}s", flush=True)
 
-    text = (result.get("text") or "").strip()
-    if not text:
+    if not result["text"]:
         raise ProviderExecutionError("Whisper retornou transcrição vazia")
+    return TranscriptionResult(
+        text=result["text"],
+        engine=TranscriptionEngine.WHISPER,
+        language_detected=result["language"] or language,
+        metadata={
+            "model": model_name,
+            "device": result["device"],
+            **({"quantization": "int8"} if whisper_quantization_enabled(result["device"]) else {}),
+        },
+        segments=result["segments"],
+    )
+
+
+def _transcribe_faster_whisper(audio_path: Path, language: str | None, model_name: str) -> TranscriptionResult:
+    with acquire_faster_whisper_model(model_name) as (model, device, compute_type):
+        raise_if_cancelled()
+        logger.info("[faster-whisper] iniciando transcricao de %s (%s)", audio_path.name, compute_type)
+        print(f"[faster-whisper] iniciando transcricao de {audio_path.name} ({compute_type})", flush=True)
+        start = time.monotonic()
+        restart_transcript_stream()
+        segments, info = model.transcribe(str(audio_path), language=_language_hint(language), vad_filter=False)
+        # Os segmentos sao gerados sob demanda: cada um e publicado e o cancelamento conferido entre eles.
+        total_seconds = getattr(info, "duration", None)
+        parts: list[dict[str, Any]] = []
+        for segment in segments:
+            raise_if_cancelled()
+            part = {"start": float(segment.start), "end": float(segment.end), "text": segment.text.strip()}
+            parts.append(part)
+            emit_transcript_segments([part], part["end"] / total_seconds if total_seconds else None)
+    elapsed = time.monotonic() - start
+    logger.info("[faster-whisper] transcricao concluida em %.1fs", elapsed)
+    print(f"[faster-whisper] transcricao concluida em {elapsed:.1f}s", flush=True)
+
+    text = " ".join(part["text"] for part in parts if part["text"]).strip()
+    if not text:
+        raise ProviderExecutionError("faster-whisper retornou transcrição vazia")
     return TranscriptionResult(
         text=text,
         engine=TranscriptionEngine.WHISPER,
-        language_detected=result.get("language") or language,
-        metadata={"model": model_name, "device": device},
+        language_detected=getattr(info, "language", None) or language,
+        metadata={"model": model_name, "device": device, "backend": "faster-whisper", "compute_type": compute_type},
+        segments=parts,
     )
 
 
@@ -151,7 +446,13 @@ def _configured_transcription_provider_order(config: dict[str, Any]) -> list[Tra
         if filtered:
             return filtered
 
-    return ["openai", "gemini", "whisper"]
+    return ["openai", "gemini", "whisper", "faster_whisper"]
+
+
+def _local_provider_order(config: dict[str, Any]) -> list[TranscriptionProviderName]:
+    """Motores locais na ordem salva, ate o "whisper" (que sempre encerra a cadeia)."""
+    local_order = [provider for provider in _configured_transcription_provider_order(config) if provider in LOCAL_TRANSCRIPTION_PROVIDERS]
+    return local_order[: local_order.index("whisper") + 1] if "whisper" in local_order else ["whisper"]
 
 
 def _transcription_provider_order(
@@ -159,10 +460,11 @@ def _transcription_provider_order(
     use_api: bool,
     preferred_provider: str | None = None,
 ) -> list[TranscriptionProviderName]:
-    if not use_api:
-        return ["whisper"]
-
     normalized_preference = _normalize_provider(preferred_provider)
+    if normalized_preference == "faster_whisper":
+        return ["faster_whisper", "whisper"]
+    if not use_api:
+        return _local_provider_order(config)
     if normalized_preference == "whisper":
         return ["whisper"]
 
@@ -173,6 +475,29 @@ def _transcription_provider_order(
     return [normalized_preference, *[provider for provider in configured_order if provider != normalized_preference]]
 
 
+def transcription_audio_profile(config: dict[str, Any], use_api: bool, preferred_provider: str | None = None) -> str:
+    """Perfil de audio para a cadeia que vai transcrever este job.
+
+    Sem nenhuma API com chave na cadeia, vale o perfil local (a midia original
+    e lida direto como PCM). Com APIs, cada uma pede o seu formato; se a
+    cadeia mistura formatos, o MP3 de fala (aceito por todas) e usado.
+    TRANSCRIPTION_AUDIO_PROFILE fixa um perfil para as APIs.
+    """
+    keyed_providers = []
+    for provider in _transcription_provider_order(config, use_api, preferred_provider):
+        api_key = config.get(f"{provider}_api_key")
+        if provider not in LOCAL_TRANSCRIPTION_PROVIDERS and isinstance(api_key, str) and api_key:
+            keyed_providers.append(provider)
+    if not keyed_providers:
+        return LOCAL_AUDIO_PROFILE
+
+    configured = get_settings().transcription_audio_profile.strip().lower()
+    if configured in AUDIO_PROFILES:
+        return configured
+    profiles = {PROVIDER_AUDIO_PROFILES[provider] for provider in keyed_providers}
+    return profiles.pop() if len(profiles) == 1 else DEFAULT_AUDIO_PROFILE
+
+
 def _log_provider_failure(provider: str, error: Exception) -> None:
     """A troca silenciosa de provedor escondia erros de rede, chave e TLS."""
     detail = str(error).strip() or error.__class__.__name__
@@ -189,22 +514,44 @@ def transcribe_audio(
     use_api: bool = True,
     whisper_model_override: str | None = None,
     transcription_provider_preference: str | None = None,
+    silences: list[tuple[float, float]] | None = None,
 ) -> TranscriptionResult:
     settings = get_settings()
     config = get_effective_provider_settings(db)
     target_path = Path(audio_path)
     retries = settings.provider_retries
 
-    for provider in _transcription_provider_order(
+    order = _transcription_provider_order(
         config,
         use_api=use_api,
         preferred_provider=transcription_provider_preference,
-    ):
+    )
+    hedged: set[str] = set()
+    for index, provider in enumerate(order):
+        if provider in hedged:
+            continue
+
+        if settings.provider_hedging and provider in PROVIDER_AUDIO_PROFILES:
+            group = _hedge_group(order[index:], config)
+            if len(group) > 1:
+                hedged.update(group)
+                try:
+                    with track_provider_call():
+                        return _transcribe_hedged(group, target_path, language, config, retries)
+                except JobCancelled:
+                    raise
+                except Exception as exc:
+                    _log_provider_failure("+".join(group), exc)
+                    continue
+
         if provider == "openai":
             openai_key = config.get("openai_api_key")
             if isinstance(openai_key, str) and openai_key:
                 try:
-                    return _run_with_retries(lambda: _transcribe_openai(target_path, language, openai_key), retries)
+                    with track_provider_call():
+                        return _transcribe_with_api("openai", target_path, language, openai_key, retries)
+                except JobCancelled:
+                    raise
                 except Exception as exc:
                     _log_provider_failure("openai", exc)
                     continue
@@ -213,14 +560,27 @@ def transcribe_audio(
             gemini_key = config.get("gemini_api_key")
             if isinstance(gemini_key, str) and gemini_key:
                 try:
-                    return _run_with_retries(lambda: _transcribe_gemini(target_path, language, gemini_key), retries)
+                    with track_provider_call():
+                        return _transcribe_with_api("gemini", target_path, language, gemini_key, retries)
+                except JobCancelled:
+                    raise
                 except Exception as exc:
                     _log_provider_failure("gemini", exc)
                     continue
 
+        if provider == "faster_whisper":
+            whisper_model = whisper_model_override or str(config.get("whisper_model") or settings.whisper_model)
+            try:
+                return _run_with_retries(lambda: _transcribe_faster_whisper(target_path, language, whisper_model), retries)
+            except JobCancelled:
+                raise
+            except Exception as exc:
+                _log_provider_failure("faster_whisper", exc)
+                continue
+
         if provider == "whisper":
             whisper_model = whisper_model_override or str(config.get("whisper_model") or settings.whisper_model)
-            return _run_with_retries(lambda: _transcribe_whisper(target_path, language, whisper_model), retries)
+            return _run_with_retries(lambda: _transcribe_whisper(target_path, language, whisper_model, silences), retries)
 
     whisper_model = whisper_model_override or str(config.get("whisper_model") or settings.whisper_model)
-    return _run_with_retries(lambda: _transcribe_whisper(target_path, language, whisper_model), retries)
+    return _run_with_retries(lambda: _transcribe_whisper(target_path, language, whisper_model, silences), retries)
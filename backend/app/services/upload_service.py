@@ -14,6 +14,7 @@ from app.models.upload import Upload
 from app.repositories.upload_repository import UploadRepository
 from app.schemas.upload import RemoteMediaSource
 from app.schemas.upload import UploadStatsResponse
+from app.services.checkpoint_service import discard_checkpoints
 from app.utils.files import detect_media_type, safe_unlink, save_upload_file, validate_upload
 
 
@@ -464,6 +465,7 @@ def delete_upload(db: Session, upload_id: str, workspace_id: str = "local-worksp
     upload = get_upload_or_404(db, upload_id, workspace_id)
     safe_unlink(upload.original_path)
     safe_unlink(upload.converted_path)
+    discard_checkpoints(db, upload.id)
     repository.delete(upload)
 
 
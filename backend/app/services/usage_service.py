@@ -19,6 +19,14 @@ PLAN_CREDIT_LIMITS: dict[str, int | None] = {
     "enterprise": None,
 }
 
+# Faixas do escalonador de processamento: planos maiores passam na frente.
+PLAN_PROCESSING_PRIORITY: dict[str, int] = {
+    "trial": 0,
+    "pro": 1,
+    "business": 2,
+    "enterprise": 3,
+}
+
 
 def plan_credit_limit(plan: str | None) -> int | None:
     """Limite mensal do plano, ou None quando nao ha limite (desktop/enterprise)."""
@@ -31,12 +39,43 @@ def plan_credit_limit(plan: str | None) -> int | None:
     return PLAN_CREDIT_LIMITS[plan]
 
 
+def plan_processing_priority(plan: str | None) -> int:
+    """No desktop todos os jobs sao do mesmo usuario, entao nao ha faixas."""
+    if not get_settings().credit_limits_enabled:
+        return 0
+    return PLAN_PROCESSING_PRIORITY.get(plan or "trial", 0)
+
+
+def plan_processing_concurrency(plan: str | None) -> int | None:
+    """Jobs simultaneos permitidos ao workspace, ou None quando nao ha teto.
+
+    Os tetos vem de PROCESSING_WORKSPACE_CONCURRENCY ("trial:1,pro:2,..."); 0
+    libera o plano. No desktop a fila e de um usuario so, entao nao ha teto.
+    """
+    settings = get_settings()
+    if not settings.credit_limits_enabled:
+        return None
+
+    caps: dict[str, int] = {}
+    for item in settings.processing_workspace_concurrency.split(","):
+        name, _, value = item.partition(":")
+        if name.strip() and value.strip().isdigit():
+            caps[name.strip().lower()] = int(value)
+    cap = caps.get(plan or "trial", caps.get("trial", 0))
+    return cap if cap > 0 else None
+
+
 def _month_start() -> datetime:
     now = datetime.now(timezone.utc)
     return datetime(now.year, now.month, 1, tzinfo=timezone.utc).replace(tzinfo=None)
 
 
-def ensure_workspace(db: Session, workspace_id: str) -> Workspace:
+def ensure_workspace(db: Session, workspace_id: str, *, commit: bool = True) -> Workspace:
+    """Workspace do id, criado com plano trial na primeira vez.
+
+    Com ``commit=False`` a criacao so e enviada (flush) e fecha junto com a
+    transacao do chamador.
+    """
     workspace = db.get(Workspace, workspace_id)
     if workspace:
         return workspace
@@ -51,6 +90,9 @@ def ensure_workspace(db: Session, workspace_id: str) -> Workspace:
         billing_status="trialing",
     )
     db.add(workspace)
+    if not commit:
+        db.flush()
+        return workspace
     db.commit()
     db.refresh(workspace)
     return workspace
@@ -81,6 +123,26 @@ def current_month_credits(db: Session, workspace_id: str) -> int:
     return int(total or 0)
 
 
+def _ensure_credits_available(db: Session, workspace_id: str, credits: int) -> None:
+    workspace = ensure_workspace(db, workspace_id)
+    limit = plan_credit_limit(workspace.plan)
+    used = current_month_credits(db, workspace_id)
+
+    if limit is not None and used + credits > limit:
+        if credits > limit:
+            raise HTTPException(
+                status_code=status.HTTP_402_PAYMENT_REQUIRED,
+                detail=(
+                    f"Esta midia precisa de {credits} creditos e o plano atual libera {limit} por mes. "
+                    "Envie um arquivo mais curto ou atualize o plano."
+                ),
+            )
+        raise HTTPException(
+            status_code=status.HTTP_402_PAYMENT_REQUIRED,
+            detail=f"Limite mensal de creditos excedido ({used}/{limit}). Atualize o plano para continuar.",
+        )
+
+
 def consume_credits(
     db: Session,
     workspace_id: str,
@@ -102,23 +164,7 @@ def consume_credits(
         if existing:
             return
 
-    workspace = ensure_workspace(db, workspace_id)
-    limit = plan_credit_limit(workspace.plan)
-    used = current_month_credits(db, workspace_id)
-
-    if limit is not None and used + credits > limit:
-        if credits > limit:
-            raise HTTPException(
-                status_code=status.HTTP_402_PAYMENT_REQUIRED,
-                detail=(
-                    f"Esta midia precisa de {credits} creditos e o plano atual libera {limit} por mes. "
-                    "Envie um arquivo mais curto ou atualize o plano."
-                ),
-            )
-        raise HTTPException(
-            status_code=status.HTTP_402_PAYMENT_REQUIRED,
-            detail=f"Limite mensal de creditos excedido ({used}/{limit}). Atualize o plano para continuar.",
-        )
+    _ensure_credits_available(db, workspace_id, credits)
 
     db.add(
         UsageEvent(
@@ -132,6 +178,54 @@ def consume_credits(
     db.commit()
 
 
+def consume_credits_batch(
+    db: Session,
+    workspace_id: str,
+    event_type: str,
+    charges: list[tuple[str, int, dict[str, Any] | None]],
+    *,
+    reserve: list[tuple[str, int]] | None = None,
+    commit: bool = True,
+) -> int:
+    """Cobra varias midias de uma vez: ou todas cabem no plano, ou nenhuma e cobrada.
+
+    ``charges`` traz (idempotency_key, creditos, metadata). ``reserve`` lista
+    cobrancas que o worker fara depois (duracao da midia) so para conferir o
+    saldo agora e recusar logo de inicio um lote que certamente nao cabe. E
+    uma checagem de melhor esforco, nao um bloqueio: nada fica reservado, entao
+    dois lotes simultaneos podem passar juntos e a cobranca definitiva (e o 402)
+    continua no worker. Com ``commit=False`` nada e confirmado aqui, nem a
+    criacao do workspace; o chamador fecha a transacao junto com o resto do lote.
+    """
+    if not hasattr(db, "get") or not hasattr(db, "add"):
+        return 0
+
+    ensure_workspace(db, workspace_id, commit=commit)
+    reserve = reserve or []
+    keys = [key for key, credits, _ in charges if credits > 0] + [key for key, credits in reserve if credits > 0]
+    existing_keys = set(db.scalars(select(UsageEvent.idempotency_key).where(UsageEvent.idempotency_key.in_(keys))).all()) if keys else set()
+    pending = [(key, credits, metadata) for key, credits, metadata in charges if credits > 0 and key not in existing_keys]
+    total = sum(credits for _, credits, _ in pending)
+    reserved = sum(credits for key, credits in reserve if credits > 0 and key not in existing_keys)
+
+    if total + reserved > 0:
+        _ensure_credits_available(db, workspace_id, total + reserved)
+
+    for key, credits, metadata in pending:
+        db.add(
+            UsageEvent(
+                workspace_id=workspace_id,
+                type=event_type,
+                credits=credits,
+                idempotency_key=key,
+                metadata_json=metadata,
+            )
+        )
+    if commit:
+        db.commit()
+    return total
+
+
 def audio_video_credits(duration_seconds: float | None) -> int:
     if not duration_seconds or duration_seconds <= 0:
         return 1
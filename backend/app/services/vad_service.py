@@ -0,0 +1,120 @@
+import logging
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from app.core.config import get_settings
+from app.utils.ffmpeg import DEFAULT_AUDIO_PROFILE, detect_silences, extract_audio_segments
+
+
+logger = logging.getLogger("vad")
+
+# Margem de audio mantida em volta de cada trecho de fala, para nao cortar silabas.
+SPEECH_PADDING_SECONDS = 0.3
+# Abaixo desta economia o audio original segue inteiro (nao compensa recodificar).
+MIN_SAVINGS_RATIO = 0.05
+
+# Cada item: (inicio no audio so com fala, inicio no original, duracao).
+TimestampMap = list[tuple[float, float, float]]
+Silences = list[tuple[float, float]]
+
+
+@dataclass
+class SpeechAudio:
+    # None quando a economia nao compensa: o audio convertido segue inteiro.
+    path: Path | None
+    timestamp_map: TimestampMap
+    speech_seconds: float
+    original_seconds: float
+    # Silencios do audio convertido; servem de pontos de corte quando ele segue inteiro.
+    silences: Silences = field(default_factory=list)
+
+
+def speech_intervals(
+    duration: float,
+    silences: list[tuple[float, float]],
+    min_silence_seconds: float,
+    padding: float = SPEECH_PADDING_SECONDS,
+) -> list[tuple[float, float]]:
+    """Complemento dos silencios longos, com margem, como intervalos de fala."""
+    intervals: list[tuple[float, float]] = []
+    cursor = 0.0
+    for start, end in sorted(silences):
+        if end - start < min_silence_seconds:
+            continue
+        if start > cursor:
+            intervals.append((cursor, min(duration, start + padding)))
+        # Silencio no comeco ou no fim da midia nao ganha margem.
+        if end >= duration:
+            cursor = duration
+        elif start > 0:
+            cursor = max(cursor, end - padding)
+        else:
+            cursor = max(cursor, end)
+    if duration > cursor:
+        intervals.append((cursor, duration))
+    return [(start, end) for start, end in intervals if end - start > 0.01]
+
+
+def build_timestamp_map(intervals: list[tuple[float, float]]) -> TimestampMap:
+    timestamp_map: TimestampMap = []
+    offset = 0.0
+    for start, end in intervals:
+        timestamp_map.append((round(offset, 3), round(start, 3), round(end - start, 3)))
+        offset += end - start
+    return timestamp_map
+
+
+def to_original_time(timestamp_map: TimestampMap, seconds: float) -> float:
+    if not timestamp_map:
+        return seconds
+    index = max(0, bisect_right([span[0] for span in timestamp_map], seconds) - 1)
+    speech_start, original_start, length = timestamp_map[index]
+    return original_start + min(max(0.0, seconds - speech_start), length)
+
+
+def speech_cut_silences(timestamp_map: TimestampMap) -> Silences:
+    """Emendas do audio so com fala, no tempo dele, como silencios para cortar trechos.
+
+    Cada emenda junta as margens de silencio de dois intervalos de fala, entao
+    e o ponto de corte natural sem decodificar o arquivo de novo.
+    """
+    return [(max(0.0, offset - SPEECH_PADDING_SECONDS), offset + SPEECH_PADDING_SECONDS) for offset, _, _ in timestamp_map[1:]]
+
+
+def remap_segments(segments: list[dict[str, Any]], timestamp_map: TimestampMap) -> list[dict[str, Any]]:
+    """Leva os tempos dos segmentos do audio so com fala de volta para a midia original."""
+    return [
+        {**segment, "start": to_original_time(timestamp_map, segment["start"]), "end": to_original_time(timestamp_map, segment["end"])}
+        for segment in segments
+    ]
+
+
+def prepare_speech_audio(audio_path: str | Path, duration: float | None, profile: str = DEFAULT_AUDIO_PROFILE) -> SpeechAudio | None:
+    """Gera o audio so com fala quando os silencios longos pesam na duracao.
+
+    O audio so com fala sai no perfil do motor (``profile``). Retorna None
+    com o VAD desligado ou sem duracao conhecida. Quando a economia fica
+    abaixo de MIN_SAVINGS_RATIO o arquivo convertido segue inteiro (``path``
+    None) e os silencios detectados vao junto, para os cortes em trechos.
+    """
+    settings = get_settings()
+    if not settings.vad_enabled or not duration:
+        return None
+
+    silences = detect_silences(audio_path, settings.vad_noise_db, settings.vad_min_silence_seconds, duration)
+    intervals = speech_intervals(duration, silences, settings.vad_min_silence_seconds)
+    speech_seconds = sum(end - start for start, end in intervals)
+    if not intervals or speech_seconds > duration * (1 - MIN_SAVINGS_RATIO):
+        return SpeechAudio(path=None, timestamp_map=[], speech_seconds=round(speech_seconds, 3), original_seconds=duration, silences=silences)
+
+    path = extract_audio_segments(audio_path, intervals, profile)
+    logger.info("[vad] %s: %.0fs de fala em %.0fs", Path(audio_path).name, speech_seconds, duration)
+    print(f"[vad] {Path(audio_path).name}: {speech_seconds:.0f}s de fala em {duration:.0f}s", flush=True)
+    return SpeechAudio(
+        path=path,
+        timestamp_map=build_timestamp_map(intervals),
+        speech_seconds=round(speech_seconds, 3),
+        original_seconds=duration,
+    )
@@ -0,0 +1,184 @@
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from app.core.cancellation import raise_if_cancelled
+from app.core.config import get_settings
+from app.services.transcript_stream import emit_transcript_segments
+from app.services.whisper_inference_pool import inference_pool_enabled, inference_workers, iter_inference_results, submit_inference
+from app.utils.ffmpeg import detect_silences, load_audio_pcm
+
+
+logger = logging.getLogger("whisper_chunking")
+
+# Um corte so e procurado entre metade e uma vez e meia do tamanho alvo do trecho.
+CUT_SEARCH_RATIO = 0.5
+# Cada trecho avanca um pouco sobre o vizinho para nao perder a palavra do corte.
+CHUNK_OVERLAP_SECONDS = 1.0
+# Quantas palavras repetidas na emenda entre dois trechos sao procuradas.
+BOUNDARY_WORDS = 8
+# Amostra do inicio do audio usada para detectar o idioma (a janela do Whisper).
+LANGUAGE_SAMPLE_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class AudioChunk:
+    index: int
+    start: float
+    end: float
+
+
+def should_chunk(duration: float | None, device: str) -> bool:
+    """Audio longo so e dividido quando o pool de inferencia tem mais de um processo."""
+    chunk_seconds = get_settings().whisper_chunk_seconds
+    if not inference_pool_enabled(device) or chunk_seconds <= 0 or not duration:
+        return False
+    return duration > chunk_seconds * (1 + CUT_SEARCH_RATIO) and inference_workers() > 1
+
+
+def plan_chunks(duration: float, silences: list[tuple[float, float]], target_seconds: float) -> list[AudioChunk]:
+    """Divide ``duration`` em trechos de ~``target_seconds`` cortando no meio de silencios.
+
+    Sem silencio na janela de busca, o corte cai no tamanho alvo.
+    """
+    midpoints = sorted((start + end) / 2 for start, end in silences if end > start)
+    cuts: list[float] = []
+    cursor = 0.0
+    while duration - cursor > target_seconds * (1 + CUT_SEARCH_RATIO):
+        ideal = cursor + target_seconds
+        window = [
+            point
+            for point in midpoints
+            if cursor + target_seconds * CUT_SEARCH_RATIO <= point <= cursor + target_seconds * (1 + CUT_SEARCH_RATIO)
+        ]
+        cursor = min(window, key=lambda point: abs(point - ideal)) if window else ideal
+        cuts.append(cursor)
+
+    bounds = [0.0, *cuts, duration]
+    return [AudioChunk(index, bounds[index], bounds[index + 1]) for index in range(len(bounds) - 1)]
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w]", "", word.lower())
+
+
+def dedupe_boundary_words(previous_text: str, next_text: str, max_words: int = BOUNDARY_WORDS) -> str:
+    """Remove do inicio de ``next_text`` as palavras que repetem o fim de ``previous_text``."""
+    previous_words = [_normalize_word(word) for word in previous_text.split()[-max_words:]]
+    next_words = next_text.split()
+    normalized_next = [_normalize_word(word) for word in next_words[:max_words]]
+    for size in range(min(len(previous_words), len(normalized_next)), 0, -1):
+        if previous_words[-size:] == normalized_next[:size] and any(previous_words[-size:]):
+            return " ".join(next_words[size:])
+    return next_text
+
+
+def stitch_segments(chunk_segments: list[list[dict[str, Any]]]) -> list[dict[str, Any]]:
+    """Junta os segmentos dos trechos (ja em tempo absoluto) descartando a sobreposicao.
+
+    Segmentos que terminam antes do fim do trecho anterior foram decodificados
+    duas vezes; no primeiro segmento que cruza a emenda, as palavras repetidas
+    sao removidas.
+    """
+    stitched: list[dict[str, Any]] = []
+    for segments in chunk_segments:
+        last_end = stitched[-1]["end"] if stitched else None
+        first = True
+        for segment in segments:
+            text = str(segment.get("text") or "").strip()
+            if last_end is not None and segment["end"] <= last_end:
+                continue
+            if first and stitched:
+                text = dedupe_boundary_words(stitched[-1]["text"], text)
+                first = False
+            if not text:
+                continue
+            stitched.append({"start": max(segment["start"], last_end or 0.0), "end": segment["end"], "text": text})
+            first = False
+    return stitched
+
+
+def detect_chunk_language(audio_path: str, model_name: str) -> str | None:
+    """Roda num processo do pool: detecta o idioma nos primeiros 30s do audio."""
+    import whisper
+
+    from app.services.whisper_runtime import acquire_whisper_model
+
+    raise_if_cancelled()
+    audio = whisper.pad_or_trim(load_audio_pcm(audio_path, start=0.0, duration=LANGUAGE_SAMPLE_SECONDS))
+    with acquire_whisper_model(model_name) as (model, _device):
+        mel = whisper.log_mel_spectrogram(audio, n_mels=model.dims.n_mels).to(model.device)
+        _tokens, probabilities = model.detect_language(mel)
+    return max(probabilities, key=probabilities.get) if probabilities else None
+
+
+def transcribe_chunk(audio_path: str, start: float, end: float, language: str | None, model_name: str) -> dict[str, Any]:
+    """Roda num processo do pool: decodifica so o trecho e transcreve com o modelo residente."""
+    from app.services.whisper_runtime import acquire_whisper_model
+
+    raise_if_cancelled()
+    audio = load_audio_pcm(audio_path, start=start, duration=end - start)
+    with acquire_whisper_model(model_name) as (model, device):
+        result = model.transcribe(audio, language=language, fp16=device == "cuda")
+    return {
+        "language": result.get("language"),
+        "segments": [
+            {"start": start + float(segment["start"]), "end": start + float(segment["end"]), "text": segment["text"]}
+            for segment in result.get("segments") or []
+        ],
+    }
+
+
+def transcribe_chunked(
+    audio_path: Path,
+    language: str | None,
+    model_name: str,
+    duration: float,
+    silences: list[tuple[float, float]] | None = None,
+) -> dict[str, Any]:
+    """Transcreve audio longo em trechos paralelos cortados nos silencios.
+
+    Os cortes usam os silencios do pre-passe de VAD quando ele rodou; sem
+    eles o arquivo e varrido pelo silencedetect. Sem idioma informado, ele e
+    detectado uma vez numa amostra do inicio e repassado a todos os trechos;
+    deixar cada trecho detectar o proprio idioma faria um trecho com musica
+    ou ruido sair em outra lingua.
+    Retorna texto, segmentos com tempos do arquivo original, idioma usado e
+    quantos trechos foram usados.
+    """
+    settings = get_settings()
+    if silences is None:
+        silences = detect_silences(audio_path, duration=duration)
+    chunks = plan_chunks(duration, silences, settings.whisper_chunk_seconds)
+    print(f"[whisper] {audio_path.name}: {len(chunks)} trechos em paralelo ({inference_workers()} processos)", flush=True)
+    if language is None:
+        [language] = iter_inference_results([submit_inference(detect_chunk_language, str(audio_path), model_name, stream=False)])
+
+    futures = [
+        submit_inference(
+            transcribe_chunk,
+            str(audio_path),
+            max(0.0, chunk.start - (CHUNK_OVERLAP_SECONDS if chunk.index else 0.0)),
+            min(duration, chunk.end + CHUNK_OVERLAP_SECONDS),
+            language,
+            model_name,
+            stream=False,
+        )
+        for chunk in chunks
+    ]
+    results: list[dict[str, Any]] = []
+    segments: list[dict[str, Any]] = []
+    for chunk, result in zip(chunks, iter_inference_results(futures)):
+        # A emenda so altera o trecho novo, entao o que ja foi publicado nao muda.
+        results.append(result)
+        published = len(segments)
+        segments = stitch_segments([item["segments"] for item in results])
+        emit_transcript_segments(segments[published:], chunk.end / duration)
+    return {
+        "text": " ".join(segment["text"] for segment in segments).strip(),
+        "segments": segments,
+        "language": language or next((result["language"] for result in results if result.get("language")), None),
+        "chunks": len(chunks),
+    }
@@ -0,0 +1,245 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterator
+
+from app.core.cancellation import CancellationToken, JobCancelled, cancellation_scope, current_token, raise_if_cancelled
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.repositories.processing_job_repository import ProcessingJobRepository
+from app.services.transcript_stream import DatabaseTranscriptSink, current_sink, transcript_scope
+
+
+logger = logging.getLogger("whisper_inference_pool")
+
+# Variaveis lidas pelas bibliotecas de algebra linear ao carregar; precisam valer antes do import do torch.
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+# De quanto em quanto tempo a espera por um resultado confere o cancelamento do job.
+RESULT_POLL_SECONDS = 1.0
+# Rodadas de aquecimento ate todos os processos do pool terem carregado o modelo.
+WARMUP_ROUNDS = 5
+
+
+def inference_workers() -> int:
+    """Processos do pool: WHISPER_PARALLEL_WORKERS ou quantos cabem na RAM.
+
+    Cada processo carrega a propria copia do modelo, entao o padrao e metade
+    dos nucleos limitado a quantas copias de WHISPER_MODEL cabem em
+    WHISPER_MODEL_CACHE_MB (sem limite de RAM, so os nucleos contam).
+    """
+    settings = get_settings()
+    if settings.whisper_parallel_workers > 0:
+        return settings.whisper_parallel_workers
+    from app.services.whisper_runtime import estimate_model_mb
+
+    cores = max(1, (os.cpu_count() or 2) // 2)
+    if not settings.whisper_model_cache_mb:
+        return cores
+    return max(1, min(cores, settings.whisper_model_cache_mb // estimate_model_mb(settings.whisper_model)))
+
+
+def worker_cache_budget_mb(workers: int) -> int:
+    """Parte de WHISPER_MODEL_CACHE_MB de cada processo: o limite vale para o pool inteiro."""
+    budget = get_settings().whisper_model_cache_mb
+    return budget // max(1, workers) if budget else 0
+
+
+def threads_per_worker(workers: int) -> int:
+    """Threads do torch por processo: os nucleos sao repartidos, nunca disputados."""
+    configured = get_settings().whisper_threads_per_worker
+    if configured > 0:
+        return configured
+    return max(1, (os.cpu_count() or workers) // max(1, workers))
+
+
+def inference_pool_enabled(device: str) -> bool:
+    """So em CPU: numa GPU os processos disputariam a mesma placa e a VRAM."""
+    return device == "cpu" and get_settings().whisper_inference_pool
+
+
+def _init_inference_worker(threads: int, cache_budget_mb: int) -> None:
+    from app.core.tls import install_system_trust_store
+    from app.services.whisper_runtime import configure_model_registry
+
+    # Processo novo (spawn): o download dos pesos precisa da mesma loja de certificados da API.
+    install_system_trust_store()
+    # Tabelas referenciadas pelos segmentos e jobs gravados daqui.
+    from app.models import DocumentModel  # noqa: F401
+    from app.models.transcript_segment import TranscriptSegment  # noqa: F401
+
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    import torch
+
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    configure_model_registry(cache_budget_mb)
+
+
+def _watch_cancellation(job_id: str, token: CancellationToken, stop: threading.Event) -> None:
+    # O token do job vive no processo pai; aqui o pedido de cancelamento e lido do banco.
+    interval = max(0.2, get_settings().processing_cancel_poll_seconds)
+    while not stop.wait(interval):
+        db = SessionLocal()
+        try:
+            if ProcessingJobRepository(db).is_cancel_requested(job_id):
+                token.cancel()
+                return
+        except Exception:
+            logger.exception("Falha ao conferir cancelamento do job %s", job_id)
+        finally:
+            db.close()
+
+
+def _run_task(func: Callable[..., Any], args: tuple[Any, ...], sink: DatabaseTranscriptSink | None, job_id: str | None) -> Any:
+    """Roda num processo do pool com o mesmo contexto (parcial e cancelamento) do job."""
+    token = CancellationToken()
+    stop = threading.Event()
+    if job_id:
+        threading.Thread(target=_watch_cancellation, args=(job_id, token, stop), name="whisper-cancel-watch", daemon=True).start()
+    try:
+        with cancellation_scope(token), transcript_scope(sink):
+            return func(*args)
+    finally:
+        stop.set()
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def get_inference_pool() -> ProcessPoolExecutor:
+    """Pool de processos (spawn) dedicado ao Whisper local.
+
+    Cada processo fixa as proprias threads do torch e mantem os modelos no
+    seu registro entre jobs, fora do GIL da API e dos workers da fila.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from app.services.whisper_runtime import estimate_model_mb
+
+            settings = get_settings()
+            workers = inference_workers()
+            threads = threads_per_worker(workers)
+            budget = worker_cache_budget_mb(workers)
+            if budget and budget < estimate_model_mb(settings.whisper_model):
+                logger.warning(
+                    "[whisper] %s MB por processo nao comporta o modelo %s: ele sera recarregado a cada job "
+                    "(aumente WHISPER_MODEL_CACHE_MB ou reduza WHISPER_PARALLEL_WORKERS)",
+                    budget,
+                    settings.whisper_model,
+                )
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_inference_worker,
+                initargs=(threads, budget),
+            )
+            print(f"[whisper] pool de inferencia com {workers} processo(s) x {threads} thread(s), {budget or 'sem limite de'} MB cada", flush=True)
+        return _pool
+
+
+def _discard_broken_pool(pool: ProcessPoolExecutor | None = None) -> None:
+    """Descarta o pool quebrado para a proxima chamada criar outro.
+
+    Um processo morto (OOM ao carregar o modelo, por exemplo) quebra o executor
+    inteiro: sem isso toda transcricao local falharia ate reiniciar a API. Sem
+    ``pool`` so descarta o atual se ele estiver de fato quebrado, para nao
+    derrubar um pool que outra thread acabou de recriar.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or (pool is not None and pool is not _pool):
+            return
+        if pool is None and not getattr(_pool, "_broken", False):
+            return
+        broken, _pool = _pool, None
+    logger.warning("[whisper] pool de inferencia quebrado (processo encerrado); sera recriado")
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def submit_inference(func: Callable[..., Any], *args: Any, stream: bool = True) -> Future:
+    """Envia ``func(*args)`` ao pool levando o destino do parcial e o job a vigiar.
+
+    Com ``stream=False`` o processo nao publica segmentos (o pai publica, como
+    na emenda dos trechos), mas continua atendendo ao cancelamento. Se o pool
+    quebrou num job anterior, ele e recriado e o envio tentado de novo.
+    """
+    sink = current_sink()
+    # So o destino em banco atravessa processos; os demais ficam no pai.
+    sink = sink if isinstance(sink, DatabaseTranscriptSink) else None
+    job_id = sink.job_id if sink else None
+    pool = get_inference_pool()
+    try:
+        return pool.submit(_run_task, func, args, sink if stream else None, job_id)
+    except BrokenProcessPool:
+        _discard_broken_pool(pool)
+    return get_inference_pool().submit(_run_task, func, args, sink if stream else None, job_id)
+
+
+def iter_inference_results(futures: list[Future]) -> Iterator[Any]:
+    """Resultados na ordem do envio, conferindo o cancelamento enquanto espera."""
+    token = current_token()
+    try:
+        for future in futures:
+            while True:
+                raise_if_cancelled()
+                try:
+                    result = future.result(timeout=RESULT_POLL_SECONDS)
+                    break
+                except FutureTimeoutError:
+                    # Ate o Python 3.10 o timeout do Future nao e o TimeoutError embutido.
+                    continue
+            yield result
+    except BaseException as exc:
+        if isinstance(exc, BrokenProcessPool):
+            _discard_broken_pool()
+        # O que ainda esta na fila sai do pool; o que ja roda para ao ver o cancelamento no banco.
+        for future in futures:
+            future.cancel()
+        if token is not None and token.cancelled:
+            raise JobCancelled()
+        raise
+
+
+def run_inference(func: Callable[..., Any], *args: Any) -> Any:
+    return next(iter_inference_results([submit_inference(func, *args)]))
+
+
+def _warm_worker(func: Callable[..., Any], args: tuple[Any, ...]) -> int:
+    func(*args)
+    return os.getpid()
+
+
+def warm_inference_pool(func: Callable[..., Any], *args: Any) -> int:
+    """Aquece os processos do pool e devolve quantos ja rodaram ``func``.
+
+    O executor escolhe quem atende cada tarefa, entao um processo rapido pode
+    pegar duas; as rodadas se repetem (ate WARMUP_ROUNDS) para os que faltam.
+    """
+    pool = get_inference_pool()
+    workers = inference_workers()
+    warmed: set[int] = set()
+    try:
+        for _ in range(WARMUP_ROUNDS):
+            futures = [pool.submit(_warm_worker, func, args) for _ in range(workers - len(warmed))]
+            warmed.update(future.result() for future in futures)
+            if len(warmed) >= workers:
+                break
+    except BrokenProcessPool:
+        _discard_broken_pool(pool)
+        raise
+    return len(warmed)
+
+
+def shutdown_inference_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
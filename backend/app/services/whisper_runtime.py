@@ -0,0 +1,377 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Iterator
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.services.settings_service import get_effective_provider_settings
+
+
+logger = logging.getLogger("whisper_runtime")
+
+# Estimativa (MB) usada antes de medir o modelo carregado.
+MODEL_SIZE_ESTIMATES_MB = {
+    "tiny": 150,
+    "base": 300,
+    "small": 1000,
+    "medium": 3000,
+    "large": 6000,
+    "turbo": 3200,
+}
+
+
+def estimate_model_mb(model_name: str) -> int:
+    base_name = model_name.split(".")[0].split("-")[0]
+    return MODEL_SIZE_ESTIMATES_MB.get(base_name, 3000)
+
+
+def _tensor_bytes(value: Any) -> int:
+    if isinstance(value, (tuple, list)):
+        return sum(_tensor_bytes(item) for item in value)
+    if hasattr(value, "numel") and hasattr(value, "element_size"):
+        return value.numel() * value.element_size()
+    return 0
+
+
+def measure_model_mb(model: Any, fallback_mb: int) -> int:
+    """Soma os tensores do state_dict do modulo torch; outros backends usam a estimativa.
+
+    O state_dict inclui os pesos int8 empacotados da quantizacao dinamica, que
+    nao aparecem em ``parameters()``.
+    """
+    try:
+        total = sum(_tensor_bytes(value) for value in model.state_dict().values())
+    except Exception:
+        return fallback_mb
+    return max(1, int(total / (1024 * 1024))) if total else fallback_mb
+
+
+@dataclass
+class _CachedModel:
+    model: Any
+    size_mb: int
+    users: int = 0
+    inference_lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+@dataclass
+class _PendingLoad:
+    done: threading.Event = field(default_factory=threading.Event)
+    error: BaseException | None = None
+
+
+class WhisperModelRegistry:
+    """Modelos locais residentes, compartilhados entre jobs do processo.
+
+    Cada chave (backend, modelo, dispositivo, variante) carrega uma unica vez
+    mesmo com varios jobs pedindo ao mesmo tempo (single-flight). Acima de
+    ``budget_mb`` os modelos ociosos menos usados recentemente sao descartados;
+    um modelo em uso nunca e removido, entao o limite pode ser ultrapassado
+    enquanto jobs seguram modelos diferentes.
+    """
+
+    def __init__(self, budget_mb: int) -> None:
+        self.budget_mb = max(0, budget_mb)
+        self._lock = threading.Lock()
+        self._models: OrderedDict[Hashable, _CachedModel] = OrderedDict()
+        self._pending: dict[Hashable, _PendingLoad] = {}
+
+    @contextmanager
+    def acquire(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        estimated_mb: int = 0,
+        exclusive: bool = False,
+    ) -> Iterator[Any]:
+        """Empresta o modelo da chave, carregando se preciso.
+
+        ``exclusive`` serializa o uso do mesmo modelo: o decode do
+        openai-whisper instala hooks de KV-cache no proprio modelo, entao dois
+        jobs nao podem transcrever com a mesma instancia ao mesmo tempo.
+        """
+        entry = self._checkout(key, loader, estimated_mb)
+        try:
+            if exclusive:
+                with entry.inference_lock:
+                    yield entry.model
+            else:
+                yield entry.model
+        finally:
+            with self._lock:
+                entry.users -= 1
+                self._evict_locked()
+
+    def _checkout(self, key: Hashable, loader: Callable[[], Any], estimated_mb: int) -> _CachedModel:
+        while True:
+            with self._lock:
+                entry = self._models.get(key)
+                if entry is not None:
+                    entry.users += 1
+                    self._models.move_to_end(key)
+                    return entry
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = _PendingLoad()
+                    self._pending[key] = pending
+                    owner = True
+                else:
+                    owner = False
+
+            if not owner:
+                pending.done.wait()
+                if pending.error is not None:
+                    raise pending.error
+                continue
+
+            try:
+                with self._lock:
+                    # Abre espaco antes de carregar: dois modelos grandes juntos estouram a RAM.
+                    self._evict_locked(extra_mb=estimated_mb)
+                model = loader()
+                entry = _CachedModel(model=model, size_mb=measure_model_mb(model, estimated_mb), users=1)
+                with self._lock:
+                    self._models[key] = entry
+                    self._evict_locked()
+                logger.info("[whisper] modelo %s residente (%s MB, total %s MB)", key, entry.size_mb, self.resident_mb())
+                return entry
+            except BaseException as exc:
+                pending.error = exc
+                raise
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+                pending.done.set()
+
+    def _evict_locked(self, extra_mb: int = 0) -> None:
+        if not self.budget_mb:
+            return
+        total = sum(entry.size_mb for entry in self._models.values()) + extra_mb
+        for key in list(self._models):
+            if total <= self.budget_mb:
+                break
+            entry = self._models[key]
+            if entry.users:
+                continue
+            del self._models[key]
+            total -= entry.size_mb
+            logger.info("[whisper] modelo %s descartado do cache (limite %s MB)", key, self.budget_mb)
+
+    def resident_mb(self) -> int:
+        return sum(entry.size_mb for entry in list(self._models.values()))
+
+    def loaded_keys(self) -> list[Hashable]:
+        with self._lock:
+            return list(self._models)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in [key for key, entry in self._models.items() if not entry.users]:
+                del self._models[key]
+
+
+_registry: WhisperModelRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> WhisperModelRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = WhisperModelRegistry(get_settings().whisper_model_cache_mb)
+        return _registry
+
+
+def configure_model_registry(budget_mb: int) -> None:
+    """Recria o registro com outro limite (cada processo do pool recebe a sua parte)."""
+    global _registry
+    with _registry_lock:
+        _registry = WhisperModelRegistry(budget_mb)
+
+
+def whisper_device() -> str:
+    import torch
+
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def whisper_quantization_enabled(device: str) -> bool:
+    """WHISPER_CPU_MODE=speed: camadas lineares em int8 dinamico (so em CPU)."""
+    return device == "cpu" and get_settings().whisper_cpu_mode.strip().lower() == "speed"
+
+
+def quantize_whisper_model(model: Any) -> Any:
+    """Quantizacao dinamica int8 das camadas lineares do openai-whisper.
+
+    O ``Linear`` do whisper so converte os pesos para o dtype da entrada; em
+    CPU fp32 ele equivale ao ``nn.Linear`` e e trocado por ele, porque o
+    quantize_dynamic so reconhece a classe exata. Feito no proprio modelo para
+    nao manter duas copias na memoria.
+    """
+    import torch
+    from whisper.model import Linear as WhisperLinear
+
+    for module in model.modules():
+        if isinstance(module, WhisperLinear):
+            module.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def load_whisper_model(model_name: str, device: str, quantize: bool = False) -> Any:
+    import whisper
+
+    variant = " int8" if quantize else ""
+    logger.info("[whisper] carregando modelo '%s'%s em %s", model_name, variant, device)
+    print(f"[whisper] carregando modelo '{model_name}'{variant} em {device}", flush=True)
+    model = whisper.load_model(model_name, device=device)
+    return quantize_whisper_model(model) if quantize else model
+
+
+@contextmanager
+def acquire_whisper_model(model_name: str) -> Iterator[tuple[Any, str]]:
+    """Modelo openai-whisper residente (e exclusivo durante o bloco) + dispositivo.
+
+    A versao quantizada tem chave propria no registro: e montada uma vez por
+    processo e reaproveitada pelos jobs seguintes.
+    """
+    device = whisper_device()
+    quantize = whisper_quantization_enabled(device)
+    estimated_mb = estimate_model_mb(model_name) // (2 if quantize else 1)
+    key = ("whisper", model_name, device, "int8" if quantize else "fp32")
+
+    registry = get_model_registry()
+    with registry.acquire(key, lambda: load_whisper_model(model_name, device, quantize), estimated_mb, exclusive=True) as model:
+        yield model, device
+
+
+@contextmanager
+def acquire_faster_whisper_model(model_name: str) -> Iterator[tuple[Any, str, str]]:
+    """Modelo faster-whisper (CTranslate2) residente + dispositivo + tipo de computacao.
+
+    Ao contrario do openai-whisper, o CTranslate2 aceita transcricoes
+    simultaneas na mesma instancia (``num_workers``), entao o uso nao e exclusivo.
+    """
+    from faster_whisper import WhisperModel
+
+    settings = get_settings()
+    device = whisper_device()
+    compute_type = settings.faster_whisper_compute_type.strip() or "int8"
+
+    def load_model():
+        logger.info("[faster-whisper] carregando modelo '%s' em %s (%s)", model_name, device, compute_type)
+        print(f"[faster-whisper] carregando modelo '{model_name}' em {device} ({compute_type})", flush=True)
+        return WhisperModel(
+            model_name,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=max(0, settings.faster_whisper_cpu_threads),
+            num_workers=max(1, settings.processing_concurrency),
+        )
+
+    # Pesos int8 ocupam cerca de um quarto do modelo fp32 equivalente.
+    estimated_mb = estimate_model_mb(model_name) // (4 if compute_type.startswith("int8") else 2)
+    registry = get_model_registry()
+    with registry.acquire(("faster_whisper", model_name, device, compute_type), load_model, estimated_mb) as model:
+        yield model, device, compute_type
+
+
+_warmup_lock = threading.Lock()
+_warmup_state: dict[str, object] = {"status": "disabled"}
+
+
+def warmup_status() -> dict[str, object]:
+    with _warmup_lock:
+        return dict(_warmup_state)
+
+
+def _set_warmup_state(**values: object) -> None:
+    with _warmup_lock:
+        _warmup_state.clear()
+        _warmup_state.update(values)
+
+
+def _configured_warmup_target() -> tuple[str, str]:
+    """Primeiro motor local da ordem efetiva ("whisper" ou "faster_whisper") e o modelo."""
+    from app.services.transcription_service import _local_provider_order
+
+    db = SessionLocal()
+    try:
+        config = get_effective_provider_settings(db)
+    finally:
+        db.close()
+    return _local_provider_order(config)[0], str(config.get("whisper_model") or get_settings().whisper_model)
+
+
+def warm_whisper_model(model_name: str) -> None:
+    import numpy as np
+
+    with acquire_whisper_model(model_name) as (model, device):
+        # Um segundo de silencio: aloca buffers e aquece kernels antes do primeiro job.
+        model.transcribe(np.zeros(16000, dtype=np.float32), fp16=device == "cuda", language="pt")
+
+
+def warm_faster_whisper_model(model_name: str) -> None:
+    import numpy as np
+
+    with acquire_faster_whisper_model(model_name) as (model, _, _):
+        # Os segmentos sao gerados sob demanda: sem consumi-los nada e decodificado.
+        segments, _ = model.transcribe(np.zeros(16000, dtype=np.float32), language="pt", vad_filter=False)
+        list(segments)
+
+
+def _run_warmup(model_name: str, engine: str = "whisper") -> None:
+    from app.services.whisper_inference_pool import inference_pool_enabled, inference_workers, warm_inference_pool
+
+    started = time.monotonic()
+    processes: dict[str, int] = {}
+    try:
+        if engine == "faster_whisper":
+            try:
+                # O faster-whisper roda no proprio processo; o pool e so do openai-whisper.
+                warm_faster_whisper_model(model_name)
+            except ImportError:
+                # Sem o pacote a cadeia cai no openai-whisper, entao e ele que deve ficar quente.
+                logger.warning("[whisper] faster-whisper nao instalado; aquecendo o openai-whisper")
+                engine = "whisper"
+        if engine == "whisper":
+            # Com o pool ligado quem transcreve sao os processos dele; carregar aqui so gastaria RAM.
+            if inference_pool_enabled(whisper_device()):
+                processes = {"processes": warm_inference_pool(warm_whisper_model, model_name), "pool_workers": inference_workers()}
+            else:
+                warm_whisper_model(model_name)
+    except Exception as exc:
+        logger.exception("Falha no aquecimento do Whisper")
+        _set_warmup_state(status="failed", engine=engine, model=model_name, error=str(exc) or exc.__class__.__name__)
+        return
+
+    elapsed = round(time.monotonic() - started, 1)
+    print(f"[whisper] modelo '{model_name}' ({engine}) aquecido em {elapsed}s", flush=True)
+    _set_warmup_state(status="ready", engine=engine, model=model_name, seconds=elapsed, **processes)
+
+
+def start_whisper_warmup() -> threading.Thread | None:
+    """Carrega o Whisper configurado em segundo plano (WHISPER_WARMUP=true).
+
+    Aquece o primeiro motor local da ordem de transcricao, o que atende o
+    primeiro job local. O progresso aparece em /api/health; jobs que chegarem
+    antes esperam o mesmo carregamento pelo single-flight do registro.
+    """
+    if not get_settings().whisper_warmup:
+        return None
+    with _warmup_lock:
+        if _warmup_state.get("status") in {"loading", "ready"}:
+            return None
+    try:
+        engine, model_name = _configured_warmup_target()
+    except Exception:
+        logger.exception("Falha ao ler o modelo Whisper configurado")
+        engine, model_name = "whisper", get_settings().whisper_model
+
+    _set_warmup_state(status="loading", engine=engine, model=model_name)
+    thread = threading.Thread(target=_run_warmup, args=(model_name, engine), name="whisper-warmup", daemon=True)
+    thread.start()
+    return thread
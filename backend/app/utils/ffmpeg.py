@@ -1,9 +1,14 @@
 import json
 import os
+import re
 import subprocess
+import threading
+from contextlib import nullcontext
+from dataclasses import dataclass
 from pathlib import Path
 from uuid import uuid4
 
+from app.core.cancellation import current_token
 from app.core.config import get_settings
 
 
@@ -19,53 +24,139 @@ def _resolve_binary(name: str) -> str:
     return name
 
 
-def run_subprocess(command: list[str], timeout: int = 300) -> subprocess.CompletedProcess[str]:
-    result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+_active_lock = threading.Lock()
+_active_processes = 0
+
+
+def active_ffmpeg_processes() -> int:
+    """ffmpeg/ffprobe rodando agora neste processo (usado pelo controle de admissao)."""
+    return _active_processes
+
+
+def _stop_process(process: subprocess.Popen) -> None:
+    if process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def run_subprocess(command: list[str], timeout: int = 300, text: bool = True) -> subprocess.CompletedProcess:
+    """Roda ffmpeg/ffprobe; o processo filho morre na hora se o job for cancelado.
+
+    Com ``text=False`` stdout/stderr voltam em bytes (audio PCM pelo pipe).
+    """
+    global _active_processes
+    token = current_token()
+    if token:
+        token.raise_if_cancelled()
+    with _active_lock:
+        _active_processes += 1
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=text)
+        with token.on_cancel(lambda: _stop_process(process)) if token else nullcontext():
+            try:
+                stdout, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                _stop_process(process)
+                process.communicate()
+                raise
+        if token:
+            token.raise_if_cancelled()
+        result = subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+    finally:
+        with _active_lock:
+            _active_processes -= 1
     if result.returncode != 0:
-        raise RuntimeError(result.stderr.strip() or "Falha ao executar ffmpeg/ffprobe")
+        stderr = result.stderr if text else result.stderr.decode("utf-8", "replace")
+        raise RuntimeError(stderr.strip() or "Falha ao executar ffmpeg/ffprobe")
     return result
 
 
-def extract_audio_to_mp3(source_path: str | Path, bitrate: str = "320k") -> Path:
+@dataclass(frozen=True)
+class AudioProfile:
+    """Formato do audio entregue a um motor de transcricao."""
+
+    name: str
+    extension: str
+    args: tuple[str, ...]
+
+
+# Fala nao precisa de mais que 16 kHz mono: e o que as APIs e o Whisper usam
+# internamente. O antigo MP3 320k/44,1 kHz estereo ficava ~10x maior a toa.
+AUDIO_PROFILES = {
+    "speech_mp3": AudioProfile("speech_mp3", ".mp3", ("-ac", "1", "-ar", "16000", "-acodec", "libmp3lame", "-b:a", "48k")),
+    "speech_opus": AudioProfile(
+        "speech_opus",
+        ".ogg",
+        ("-ac", "1", "-ar", "16000", "-acodec", "libopus", "-b:a", "24k", "-application", "voip"),
+    ),
+    # Motores locais: PCM sem compressao, que o Whisper le sem decodificar.
+    "pcm_wav": AudioProfile("pcm_wav", ".wav", ("-ac", "1", "-ar", "16000", "-acodec", "pcm_s16le")),
+}
+DEFAULT_AUDIO_PROFILE = "speech_mp3"
+
+
+def get_audio_profile(name: str | None) -> AudioProfile:
+    return AUDIO_PROFILES.get(name or "", AUDIO_PROFILES[DEFAULT_AUDIO_PROFILE])
+
+
+def convert_audio(source_path: str | Path, profile: str = DEFAULT_AUDIO_PROFILE) -> Path:
+    """Extrai/normaliza o audio de ``source_path`` no formato do perfil."""
+    settings = get_settings()
+    audio_profile = get_audio_profile(profile)
+    output_path = settings.processed_dir / f"{uuid4()}{audio_profile.extension}"
+    command = [_resolve_binary("ffmpeg"), "-y", "-i", str(source_path), "-vn", *audio_profile.args, str(output_path)]
+    run_subprocess(command)
+    return output_path
+
+
+def cut_audio(source_path: str | Path, start: float, duration: float) -> Path:
+    """Copia um trecho do audio ja convertido, sem recodificar (corte no quadro mais proximo)."""
     settings = get_settings()
-    output_path = settings.processed_dir / f"{uuid4()}.mp3"
+    output_path = settings.temp_dir / f"chunk-{uuid4()}{Path(source_path).suffix}"
     command = [
         _resolve_binary("ffmpeg"),
         "-y",
+        "-ss",
+        f"{start:.3f}",
+        "-t",
+        f"{duration:.3f}",
         "-i",
         str(source_path),
         "-vn",
-        "-acodec",
-        "libmp3lame",
-        "-b:a",
-        bitrate,
-        "-ar",
-        "44100",
-        "-ac",
-        "2",
+        "-c",
+        "copy",
         str(output_path),
     ]
     run_subprocess(command)
     return output_path
 
 
-def normalize_audio(source_path: str | Path) -> Path:
+def extract_audio_segments(
+    source_path: str | Path,
+    intervals: list[tuple[float, float]],
+    profile: str = DEFAULT_AUDIO_PROFILE,
+) -> Path:
+    """Novo arquivo (no formato do perfil) com apenas os ``intervals`` (segundos) de ``source_path``, emendados."""
     settings = get_settings()
-    output_path = settings.temp_dir / f"normalized-{uuid4()}.mp3"
+    audio_profile = get_audio_profile(profile)
+    output_path = settings.processed_dir / f"speech-{uuid4()}{audio_profile.extension}"
+    selection = "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in intervals)
     command = [
         _resolve_binary("ffmpeg"),
         "-y",
         "-i",
         str(source_path),
-        "-ar",
-        "44100",
-        "-ac",
-        "2",
-        "-b:a",
-        "320k",
+        "-vn",
+        "-af",
+        f"aselect='{selection}',asetpts=N/SR/TB",
+        *audio_profile.args,
         str(output_path),
     ]
-    run_subprocess(command)
+    run_subprocess(command, timeout=1800)
     return output_path
 
 
@@ -84,3 +175,65 @@ def probe_duration_seconds(source_path: str | Path) -> float | None:
     payload = json.loads(result.stdout or "{}")
     duration = payload.get("format", {}).get("duration")
     return float(duration) if duration else None
+
+
+PCM_SAMPLE_RATE = 16000
+_SILENCE_PATTERN = re.compile(r"silence_(start|end): (-?[0-9.]+)")
+
+
+def parse_silences(ffmpeg_log: str, duration: float | None = None) -> list[tuple[float, float]]:
+    """Intervalos (inicio, fim) de silencio no log do filtro silencedetect."""
+    silences: list[tuple[float, float]] = []
+    start: float | None = None
+    for kind, value in _SILENCE_PATTERN.findall(ffmpeg_log):
+        if kind == "start":
+            start = max(0.0, float(value))
+        elif start is not None:
+            silences.append((start, float(value)))
+            start = None
+    if start is not None and duration is not None and duration > start:
+        # Silencio ate o fim do arquivo nao gera silence_end.
+        silences.append((start, duration))
+    return silences
+
+
+def detect_silences(
+    source_path: str | Path,
+    noise_db: float = -35.0,
+    min_silence_seconds: float = 0.5,
+    duration: float | None = None,
+) -> list[tuple[float, float]]:
+    command = [
+        _resolve_binary("ffmpeg"),
+        "-hide_banner",
+        "-nostats",
+        "-i",
+        str(source_path),
+        "-vn",
+        "-af",
+        f"silencedetect=noise={noise_db}dB:d={min_silence_seconds}",
+        "-f",
+        "null",
+        "-",
+    ]
+    result = run_subprocess(command, timeout=1800)
+    return parse_silences(result.stderr, duration)
+
+
+def load_audio_pcm(source_path: str | Path, start: float | None = None, duration: float | None = None):
+    """Decodifica (um trecho de) ``source_path`` para PCM mono 16 kHz float32 em memoria.
+
+    Aceita a midia original (video inclusive): um unico ffmpeg entrega o audio
+    no formato do Whisper, sem MP3 intermediario.
+    """
+    import numpy as np
+
+    command = [_resolve_binary("ffmpeg"), "-nostdin", "-hide_banner", "-loglevel", "error"]
+    if start:
+        command += ["-ss", f"{start:.3f}"]
+    if duration is not None:
+        command += ["-t", f"{duration:.3f}"]
+    # float32 direto do ffmpeg: o buffer vira o array do modelo sem passar por int16.
+    command += ["-i", str(source_path), "-vn", "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(PCM_SAMPLE_RATE), "-"]
+    result = run_subprocess(command, timeout=1800, text=False)
+    return np.frombuffer(result.stdout, np.float32).copy()
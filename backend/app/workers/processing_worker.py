@@ -1,57 +1,229 @@
 import logging
+import os
+import queue
+import socket
+import threading
+import time
 import traceback
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
+from sqlalchemy.orm import Session
+
+from app.core.cancellation import (
+    CANCELLED_MESSAGE,
+    CancellationToken,
+    JobCancelled,
+    cancellation_scope,
+    raise_if_cancelled,
+    register_job_token,
+    release_job_token,
+)
+from app.core.config import get_settings
 from app.core.database import SessionLocal
 from app.models.enums import FileType, ProcessingStatus, TranscriptionEngine
+from app.models.processing_checkpoint import ProcessingCheckpoint
+from app.repositories.processing_job_repository import ProcessingJobRepository
 from app.repositories.upload_repository import UploadRepository
+from app.services.checkpoint_service import (
+    STAGE_CONVERT,
+    STAGE_PROBE,
+    STAGE_TRANSCRIBE,
+    STAGE_VAD,
+    checkpoint_payload,
+    discard_checkpoints,
+    fingerprint,
+    load_checkpoint,
+    media_fingerprint,
+    purge_expired_checkpoints,
+    save_checkpoint,
+)
+from app.services.processing_queue_service import (
+    claim_next_job,
+    estimate_queued_durations,
+    finish_processing_job,
+    is_job_cancel_requested,
+    reap_expired_jobs,
+    renew_job_lease,
+)
 from app.services.settings_service import get_effective_provider_settings
-from app.services.transcription_service import transcribe_audio
+from app.services.transcription_service import LOCAL_AUDIO_PROFILE, TranscriptionResult, transcribe_audio, transcription_audio_profile
 from app.services.usage_service import audio_video_credits, consume_credits
-from app.utils.ffmpeg import extract_audio_to_mp3, normalize_audio, probe_duration_seconds
-from app.utils.files import safe_unlink
+from app.repositories.transcript_segment_repository import TranscriptSegmentRepository
+from app.services.transcript_stream import DatabaseTranscriptSink, transcript_scope
+from app.services.vad_service import Silences, TimestampMap, prepare_speech_audio, remap_segments, speech_cut_silences
+from app.utils.ffmpeg import AUDIO_PROFILES, convert_audio, probe_duration_seconds
 
 
 logger = logging.getLogger("processing_worker")
 
+# Muda quando a receita de conversao muda, invalidando checkpoints antigos. O
+# perfil de audio (por provedor) entra na impressao digital da conversao.
+CONVERSION_RECIPES = {
+    FileType.VIDEO: "extract-audio-profile",
+    FileType.AUDIO: "normalize-audio-profile",
+}
 
-def process_upload(
+
+@dataclass
+class PreparedUpload:
+    """Upload ja convertido e cobrado, aguardando a etapa de transcricao."""
+
+    upload_id: str
+    language: str | None
+    # MP3 convertido ou, quando so motores locais vao transcrever, a propria midia original.
+    converted_path: Path
+    source_fingerprint: str
+    use_api: bool = True
+    whisper_model: str | None = None
+    transcription_provider: str | None = None
+    # Audio so com fala (pre-passe de VAD) e o mapa de volta para os tempos originais.
+    speech_path: Path | None = None
+    timestamp_map: TimestampMap | None = None
+    # Silencios do audio a transcrever ja conhecidos pelo VAD (None: o Whisper procura).
+    silences: Silences | None = None
+
+
+def _prepare_speech_audio(
+    db: Session,
+    upload_id: str,
+    converted_path: Path,
+    source_fingerprint: str,
+    duration: float | None,
+    audio_profile: str,
+) -> tuple[Path | None, TimestampMap | None, Silences | None]:
+    """Pre-passe de VAD com checkpoint; falhar aqui so significa transcrever o audio inteiro.
+
+    Tambem devolve os silencios do audio que sera transcrito (as emendas do
+    audio so com fala ou os silencios do convertido), para o Whisper cortar
+    janelas e trechos sem rodar o silencedetect de novo.
+    """
+    settings = get_settings()
+    if not settings.vad_enabled:
+        return None, None, None
+    vad_fingerprint = fingerprint(
+        source_fingerprint, settings.vad_enabled, settings.vad_noise_db, settings.vad_min_silence_seconds, audio_profile
+    )
+    vad_checkpoint = load_checkpoint(db, upload_id, STAGE_VAD, vad_fingerprint)
+    if vad_checkpoint:
+        payload = checkpoint_payload(vad_checkpoint)
+        if not vad_checkpoint.artifact_path:
+            # Checkpoints anteriores a gravacao dos silencios nao os tem.
+            silences = [tuple(span) for span in payload["silences"]] if "silences" in payload else None
+            return None, None, silences
+        timestamp_map = [tuple(span) for span in payload.get("timestamp_map") or []]
+        return Path(str(vad_checkpoint.artifact_path)), timestamp_map, speech_cut_silences(timestamp_map)
+
+    try:
+        speech = prepare_speech_audio(converted_path, duration, audio_profile)
+    except JobCancelled:
+        raise
+    except Exception:
+        logger.exception("Falha no VAD do upload %s; seguindo com o audio inteiro", upload_id)
+        return None, None, None
+    if speech is None:
+        return None, None, None
+    if speech.path is None:
+        save_checkpoint(db, upload_id, STAGE_VAD, vad_fingerprint, payload={"silences": speech.silences})
+        return None, None, speech.silences
+    save_checkpoint(
+        db,
+        upload_id,
+        STAGE_VAD,
+        vad_fingerprint,
+        artifact_path=speech.path,
+        payload={"timestamp_map": speech.timestamp_map, "speech_seconds": speech.speech_seconds},
+    )
+    return speech.path, speech.timestamp_map, speech_cut_silences(speech.timestamp_map)
+
+
+def _load_conversion(db: Session, upload_id: str, source_fingerprint: str, profiles: list[str]):
+    for profile in profiles:
+        checkpoint = load_checkpoint(db, upload_id, STAGE_CONVERT, fingerprint(source_fingerprint, profile))
+        if checkpoint:
+            return checkpoint
+    return None
+
+
+def _mark_upload_failed(repository: UploadRepository, upload_id: str, exc: Exception) -> None:
+    if isinstance(exc, JobCancelled):
+        print(f"[worker] upload {upload_id} cancelado", flush=True)
+        upload = repository.get(upload_id)
+        if upload:
+            # Cancelar um reprocessamento preserva a transcricao anterior.
+            upload.status = ProcessingStatus.COMPLETED if upload.transcription_text else ProcessingStatus.UPLOADED
+            upload.error_message = CANCELLED_MESSAGE
+            repository.save(upload)
+        return
+
+    tb = traceback.format_exc()
+    print(f"[worker] ERRO no upload {upload_id}: {exc}\n{tb}", flush=True)
+    logger.exception("Falha ao processar upload %s", upload_id)
+    upload = repository.get(upload_id)
+    if upload:
+        upload.status = ProcessingStatus.ERROR
+        upload.error_message = str(exc) or exc.__class__.__name__
+        repository.save(upload)
+
+
+def prepare_upload(
     upload_id: str,
     language: str | None,
     force_reprocess: bool = False,
     use_api: bool = True,
     whisper_model: str | None = None,
     transcription_provider: str | None = None,
-) -> None:
+) -> PreparedUpload | None:
+    """Etapa de CPU: conversao com ffmpeg, duracao e cobranca de creditos.
+
+    Retorna None quando nao ha nada para transcrever (upload inexistente, ja
+    transcrito ou falha na conversao, que fica registrada no proprio upload).
+    """
     print(f"[worker] iniciando processamento upload={upload_id} use_api={use_api} whisper={whisper_model} provider={transcription_provider}", flush=True)
     db = SessionLocal()
     repository = UploadRepository(db)
-    temp_artifacts: list[Path] = []
     try:
+        raise_if_cancelled()
         upload = repository.get(upload_id)
         if not upload:
             print(f"[worker] upload {upload_id} nao encontrado", flush=True)
-            return
+            return None
 
         if upload.transcription_text and not force_reprocess:
             print(f"[worker] upload {upload_id} ja transcrito, ignorando", flush=True)
-            return
+            return None
 
         upload.error_message = None
         upload.status = ProcessingStatus.CONVERTING
         repository.save(upload)
 
         source_path = Path(upload.original_path)
-        print(f"[worker] convertendo {source_path.name} ({upload.file_type})", flush=True)
-        if upload.file_type == FileType.VIDEO:
-            converted_path = extract_audio_to_mp3(source_path)
+        source_fingerprint = media_fingerprint(source_path, CONVERSION_RECIPES[upload.file_type])
+        audio_profile = transcription_audio_profile(get_effective_provider_settings(db), use_api, transcription_provider)
+        local_only = audio_profile == LOCAL_AUDIO_PROFILE
+        # Motor local aceita qualquer conversao ja feita (decodificar o audio e mais barato que o video).
+        convert_checkpoint = _load_conversion(db, upload.id, source_fingerprint, list(AUDIO_PROFILES) if local_only else [audio_profile])
+        if convert_checkpoint:
+            converted_path = Path(str(convert_checkpoint.artifact_path))
+            print(f"[worker] reaproveitando conversao anterior -> {converted_path.name}", flush=True)
+        elif local_only:
+            # So motores locais na cadeia: o Whisper decodifica a midia original direto para PCM.
+            converted_path = source_path
+            print(f"[worker] {source_path.name} segue sem conversao para o motor local", flush=True)
         else:
-            converted_path = normalize_audio(source_path)
-        temp_artifacts.append(converted_path)
-        print(f"[worker] conversao concluida -> {converted_path.name}", flush=True)
+            print(f"[worker] convertendo {source_path.name} ({upload.file_type}, {audio_profile})", flush=True)
+            converted_path = convert_audio(source_path, audio_profile)
+            save_checkpoint(db, upload.id, STAGE_CONVERT, fingerprint(source_fingerprint, audio_profile), artifact_path=converted_path)
+            print(f"[worker] conversao concluida -> {converted_path.name}", flush=True)
 
-        upload.converted_path = str(converted_path)
-        upload.duration_seconds = probe_duration_seconds(converted_path)
+        upload.converted_path = None if converted_path == source_path else str(converted_path)
+        probe_checkpoint = load_checkpoint(db, upload.id, STAGE_PROBE, source_fingerprint)
+        if probe_checkpoint:
+            upload.duration_seconds = checkpoint_payload(probe_checkpoint).get("duration_seconds")
+        else:
+            upload.duration_seconds = probe_duration_seconds(converted_path)
+            save_checkpoint(db, upload.id, STAGE_PROBE, source_fingerprint, payload={"duration_seconds": upload.duration_seconds})
         total_credits = audio_video_credits(upload.duration_seconds)
         consume_credits(
             db,
@@ -61,41 +233,494 @@ def process_upload(
             idempotency_key=f"process:{upload.id}:duration",
             metadata={"upload_id": upload.id, "duration_seconds": upload.duration_seconds},
         )
+        speech_path, timestamp_map, silences = _prepare_speech_audio(
+            db, upload.id, converted_path, source_fingerprint, upload.duration_seconds, audio_profile
+        )
         upload.status = ProcessingStatus.TRANSCRIBING
         repository.save(upload)
-
-        print(f"[worker] iniciando transcricao (duracao={upload.duration_seconds}s)", flush=True)
-        transcription = transcribe_audio(
-            db,
-            converted_path,
-            language,
+        return PreparedUpload(
+            upload_id=upload.id,
+            language=language,
+            converted_path=converted_path,
+            source_fingerprint=source_fingerprint,
             use_api=use_api,
-            whisper_model_override=whisper_model,
-            transcription_provider_preference=transcription_provider,
+            whisper_model=whisper_model,
+            transcription_provider=transcription_provider,
+            speech_path=speech_path,
+            timestamp_map=timestamp_map,
+            silences=silences,
         )
-        print(f"[worker] transcricao OK engine={transcription.engine} chars={len(transcription.text)}", flush=True)
+    except Exception as exc:
+        _mark_upload_failed(repository, upload_id, exc)
+        return None
+    finally:
+        db.close()
+
+
+def _transcription_payload(transcription: TranscriptionResult) -> dict[str, Any]:
+    return {
+        "text": transcription.text,
+        "engine": transcription.engine.value,
+        "language_detected": transcription.language_detected,
+        "metadata": transcription.metadata,
+        "segments": transcription.segments,
+    }
+
+
+def _load_transcription(checkpoint: ProcessingCheckpoint | None) -> TranscriptionResult | None:
+    payload = checkpoint_payload(checkpoint)
+    if not payload.get("text"):
+        return None
+    return TranscriptionResult(
+        text=payload["text"],
+        engine=TranscriptionEngine(payload["engine"]),
+        language_detected=payload.get("language_detected"),
+        metadata=payload.get("metadata") or {},
+        segments=payload.get("segments") or [],
+    )
+
+
+def transcribe_prepared_upload(prepared: PreparedUpload, job_id: str | None = None) -> None:
+    """Etapa de rede/GPU: transcreve o audio convertido e conclui o upload.
+
+    Os motores locais gravam os segmentos conforme decodificam (parcial em
+    GET /api/transcriptions/{id}); no fim a lista e trocada pela definitiva.
+    """
+    upload_id = prepared.upload_id
+    db = SessionLocal()
+    repository = UploadRepository(db)
+    try:
+        raise_if_cancelled()
+        upload = repository.get(upload_id)
+        if not upload:
+            print(f"[worker] upload {upload_id} nao encontrado", flush=True)
+            return
+
+        # Com job_id na impressao digital, so uma nova tentativa do mesmo job retoma o
+        # resultado; reprocessar pelo usuario gera um job novo e transcreve de novo.
+        transcribe_fingerprint = fingerprint(
+            prepared.source_fingerprint,
+            job_id,
+            prepared.language,
+            prepared.use_api,
+            prepared.whisper_model,
+            prepared.transcription_provider,
+        )
+        transcription = _load_transcription(load_checkpoint(db, upload.id, STAGE_TRANSCRIBE, transcribe_fingerprint)) if job_id else None
+        if transcription is not None:
+            print(f"[worker] reaproveitando transcricao ja concluida neste job (engine={transcription.engine})", flush=True)
+        else:
+            print(f"[worker] iniciando transcricao (duracao={upload.duration_seconds}s)", flush=True)
+            with transcript_scope(DatabaseTranscriptSink(upload.id, job_id, prepared.timestamp_map)):
+                transcription = transcribe_audio(
+                    db,
+                    prepared.speech_path or prepared.converted_path,
+                    prepared.language,
+                    use_api=prepared.use_api,
+                    whisper_model_override=prepared.whisper_model,
+                    transcription_provider_preference=prepared.transcription_provider,
+                    silences=prepared.silences,
+                )
+            print(f"[worker] transcricao OK engine={transcription.engine} chars={len(transcription.text)}", flush=True)
+            if prepared.timestamp_map:
+                transcription.segments = remap_segments(transcription.segments, prepared.timestamp_map)
+                transcription.metadata["speech_seconds"] = round(sum(span[2] for span in prepared.timestamp_map), 1)
+            # Gravado antes de concluir o upload: se o worker cair daqui ate o fim do job,
+            # a proxima tentativa nao paga a transcricao de novo.
+            save_checkpoint(db, upload.id, STAGE_TRANSCRIBE, transcribe_fingerprint, payload=_transcription_payload(transcription))
 
         upload.transcription_text = transcription.text
         upload.transcription_engine = transcription.engine
         upload.language_detected = transcription.language_detected
+        TranscriptSegmentRepository(db).replace_for_upload(upload.id, transcription.segments)
         upload.status = ProcessingStatus.COMPLETED
         repository.save(upload)
 
         config = get_effective_provider_settings(db)
-        if bool(config.get("auto_cleanup_temp_files")):
-            for artifact in temp_artifacts:
-                safe_unlink(artifact)
+        if bool(config.get("auto_cleanup_temp_files")) and get_settings().processing_checkpoint_retention_hours <= 0:
+            discard_checkpoints(db, upload.id, [STAGE_CONVERT, STAGE_VAD])
             upload.converted_path = None
             repository.save(upload)
         print(f"[worker] upload {upload_id} COMPLETED", flush=True)
     except Exception as exc:
-        tb = traceback.format_exc()
-        print(f"[worker] ERRO no upload {upload_id}: {exc}\n{tb}", flush=True)
-        logger.exception("Falha ao processar upload %s", upload_id)
-        upload = repository.get(upload_id)
-        if upload:
-            upload.status = ProcessingStatus.ERROR
-            upload.error_message = str(exc) or exc.__class__.__name__
-            repository.save(upload)
+        _mark_upload_failed(repository, upload_id, exc)
     finally:
         db.close()
+
+
+def process_upload(
+    upload_id: str,
+    language: str | None,
+    force_reprocess: bool = False,
+    use_api: bool = True,
+    whisper_model: str | None = None,
+    transcription_provider: str | None = None,
+) -> None:
+    prepared = prepare_upload(upload_id, language, force_reprocess, use_api, whisper_model, transcription_provider)
+    if prepared is not None:
+        transcribe_prepared_upload(prepared)
+
+
+def _owns_job(job, worker_id: str | None) -> bool:
+    if worker_id is None:
+        return True
+    return job.status == "running" and job.worker_id == worker_id
+
+
+def _finalize_job(job_id: str, worker_id: str | None, error: Exception | None = None) -> None:
+    db = SessionLocal()
+    repository = ProcessingJobRepository(db)
+    try:
+        job = repository.get(job_id)
+        if not job or not _owns_job(job, worker_id):
+            # O reaper devolveu o job para a fila (lease vencido); quem assumiu depois finaliza.
+            logger.warning("Job %s nao pertence mais a %s; resultado descartado", job_id, worker_id)
+            return
+
+        if job.cancel_requested or isinstance(error, JobCancelled):
+            finish_processing_job(db, job, "cancelled", CANCELLED_MESSAGE)
+            return
+
+        if error is not None:
+            finish_processing_job(db, job, "failed", str(error) or error.__class__.__name__)
+            return
+
+        upload = UploadRepository(db).get(job.upload_id)
+        if upload and upload.status == ProcessingStatus.ERROR:
+            finish_processing_job(db, job, "failed", upload.error_message)
+        else:
+            finish_processing_job(db, job, "done")
+    except Exception:
+        logger.exception("Falha ao finalizar job %s", job_id)
+    finally:
+        db.close()
+
+
+def _release_cancelled_upload(upload_id: str) -> None:
+    db = SessionLocal()
+    try:
+        _mark_upload_failed(UploadRepository(db), upload_id, JobCancelled())
+    finally:
+        db.close()
+
+
+def run_conversion_stage(
+    job_id: str,
+    worker_id: str | None = None,
+    token: CancellationToken | None = None,
+) -> PreparedUpload | None:
+    """Primeira etapa do job. Quando nao sobra transcricao a fazer o job ja e finalizado aqui."""
+    db = SessionLocal()
+    try:
+        job = ProcessingJobRepository(db).get(job_id)
+        if not job:
+            return None
+        options = (job.upload_id, job.language, job.force_reprocess, job.use_api, job.whisper_model, job.transcription_provider)
+    finally:
+        db.close()
+
+    try:
+        with cancellation_scope(token):
+            prepared = prepare_upload(*options)
+    except Exception as exc:
+        logger.exception("Falha na conversao do job %s", job_id)
+        _finalize_job(job_id, worker_id, exc)
+        return None
+
+    if prepared is not None and token is not None and token.cancelled:
+        # O prepare ja marcou TRANSCRIBING; sem voltar o status o reaper trataria o upload como orfao.
+        _release_cancelled_upload(prepared.upload_id)
+        _finalize_job(job_id, worker_id, JobCancelled())
+        return None
+    if prepared is None or (token is not None and token.cancelled):
+        _finalize_job(job_id, worker_id)
+        return None
+    return prepared
+
+
+def run_transcription_stage(
+    job_id: str,
+    prepared: PreparedUpload,
+    worker_id: str | None = None,
+    token: CancellationToken | None = None,
+) -> None:
+    try:
+        with cancellation_scope(token):
+            transcribe_prepared_upload(prepared, job_id)
+    except Exception as exc:
+        logger.exception("Falha na transcricao do job %s", job_id)
+        _finalize_job(job_id, worker_id, exc)
+        return
+    _finalize_job(job_id, worker_id)
+
+
+def run_processing_job(job_id: str, worker_id: str | None = None, token: CancellationToken | None = None) -> None:
+    """Executa as duas etapas em sequencia (sem o pipeline do pool)."""
+    prepared = run_conversion_stage(job_id, worker_id, token)
+    if prepared is not None:
+        run_transcription_stage(job_id, prepared, worker_id, token)
+
+
+@dataclass
+class StagedJob:
+    """Job convertido esperando vaga no pool de transcricao; o heartbeat segue junto."""
+
+    job_id: str
+    worker_id: str
+    prepared: PreparedUpload
+    heartbeat: "JobHeartbeat"
+    token: CancellationToken
+
+
+class JobHeartbeat:
+    """Renova periodicamente a posse do job enquanto o pipeline roda.
+
+    Tambem acompanha pedidos de cancelamento feitos por outro processo (API
+    separada do run_worker.py) e dispara o ``token`` do job.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        worker_id: str,
+        interval_seconds: float,
+        token: CancellationToken | None = None,
+        cancel_poll_seconds: float = 2.0,
+    ) -> None:
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval_seconds = max(1.0, interval_seconds)
+        self.token = token
+        self.poll_seconds = min(self.interval_seconds, max(0.5, cancel_poll_seconds)) if token else self.interval_seconds
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{job_id[:8]}", daemon=True)
+
+    def start(self) -> "JobHeartbeat":
+        if self.token is not None:
+            register_job_token(self.job_id, self.token)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._thread.join(self.interval_seconds)
+        if self.token is not None:
+            release_job_token(self.job_id)
+
+    def __enter__(self) -> "JobHeartbeat":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        last_renewal = time.monotonic()
+        while not self._stop_event.wait(self.poll_seconds):
+            db = SessionLocal()
+            try:
+                if self.token is not None and not self.token.cancelled and is_job_cancel_requested(db, self.job_id):
+                    print(f"[worker] cancelamento pedido para o job {self.job_id}", flush=True)
+                    self.token.cancel()
+                if time.monotonic() - last_renewal < self.interval_seconds:
+                    continue
+                last_renewal = time.monotonic()
+                if not renew_job_lease(db, self.job_id, self.worker_id):
+                    logger.warning("Worker %s perdeu a posse do job %s (lease expirado)", self.worker_id, self.job_id)
+                    return
+            except Exception:
+                logger.exception("Falha no heartbeat do job %s", self.job_id)
+            finally:
+                db.close()
+
+
+class ProcessingWorkerPool:
+    """Pipeline de processamento em duas etapas com pools independentes.
+
+    Threads de conversao (ffmpeg, CPU) reivindicam jobs da fila e entregam o
+    audio convertido numa fila limitada; threads de transcricao (chamadas aos
+    provedores) consomem essa fila. Assim o upload N+1 converte enquanto o
+    upload N espera a API.
+
+    Backpressure: cada job ocupa uma vaga do pipeline (transcricoes + fila entre
+    etapas) do claim ate o fim da transcricao, e a conversao so reivindica com
+    uma vaga livre. Sem vaga o job continua "queued" no banco, onde o
+    escalonador (SJF, teto por workspace) e outros workers ainda o enxergam.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        poll_interval_seconds: float = 1.0,
+        heartbeat_seconds: float = 30.0,
+        reaper_interval_seconds: float = 60.0,
+        conversion_workers: int | None = None,
+        stage_queue_size: int = 2,
+        cancel_poll_seconds: float = 2.0,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.pipeline_slots = self.concurrency + max(1, stage_queue_size)
+        # Mais threads de conversao que vagas so ficariam paradas esperando.
+        self.conversion_workers = max(1, conversion_workers or min(self.pipeline_slots, os.cpu_count() or 1))
+        self.poll_interval_seconds = max(0.1, poll_interval_seconds)
+        self.heartbeat_seconds = heartbeat_seconds
+        self.cancel_poll_seconds = cancel_poll_seconds
+        self.reaper_interval_seconds = max(1.0, reaper_interval_seconds)
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop_event = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._staged: queue.Queue[StagedJob] = queue.Queue(maxsize=max(1, stage_queue_size))
+        self._slots = threading.Semaphore(self.pipeline_slots)
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop_event.clear()
+        self.reap()
+        reaper = threading.Thread(target=self._reap_periodically, name="processing-reaper", daemon=True)
+        reaper.start()
+        self._threads.append(reaper)
+        for index in range(self.conversion_workers):
+            thread = threading.Thread(
+                target=self._convert,
+                args=(f"{self.worker_prefix}:{index}",),
+                name=f"processing-convert-{index}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+        for index in range(self.concurrency):
+            thread = threading.Thread(target=self._transcribe, name=f"processing-transcribe-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        while True:
+            try:
+                self._staged.get_nowait().heartbeat.stop()
+            except queue.Empty:
+                break
+
+    def run_forever(self) -> None:
+        """Modo processo dedicado (run_worker.py): bloqueia ate stop() ou Ctrl+C."""
+        self.start()
+        try:
+            while not self._stop_event.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def reap(self) -> None:
+        db = SessionLocal()
+        try:
+            summary = reap_expired_jobs(db)
+            summary["checkpoints_purged"] = purge_expired_checkpoints(db)
+            summary["durations_estimated"] = estimate_queued_durations(db)
+            if any(summary.values()):
+                print(f"[worker] reaper: {summary}", flush=True)
+        except Exception:
+            logger.exception("Falha ao recuperar jobs abandonados")
+        finally:
+            db.close()
+
+    def _reap_periodically(self) -> None:
+        while not self._stop_event.wait(self.reaper_interval_seconds):
+            self.reap()
+
+    def _claim(self, worker_id: str) -> str | None:
+        db = SessionLocal()
+        try:
+            job = claim_next_job(db, worker_id)
+            return job.id if job else None
+        finally:
+            db.close()
+
+    def _convert(self, worker_id: str) -> None:
+        while not self._stop_event.is_set():
+            # Vaga antes do claim: job reivindicado e sempre um job em andamento.
+            if not self._slots.acquire(timeout=self.poll_interval_seconds):
+                continue
+            try:
+                job_id = self._claim(worker_id)
+            except Exception:
+                logger.exception("Falha ao buscar job na fila de processamento")
+                job_id = None
+
+            if job_id is None:
+                self._slots.release()
+                self._stop_event.wait(self.poll_interval_seconds)
+                continue
+
+            print(f"[worker] {worker_id} assumiu job {job_id}", flush=True)
+            token = CancellationToken()
+            heartbeat = JobHeartbeat(job_id, worker_id, self.heartbeat_seconds, token, self.cancel_poll_seconds).start()
+            prepared = run_conversion_stage(job_id, worker_id, token)
+            if prepared is None:
+                heartbeat.stop()
+                self._slots.release()
+                continue
+            self._hand_off(StagedJob(job_id, worker_id, prepared, heartbeat, token))
+
+    def _hand_off(self, staged: StagedJob) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self._staged.put(staged, timeout=self.poll_interval_seconds)
+                return
+            except queue.Full:
+                continue
+        # Parando com o job convertido em maos: sem heartbeat o lease vence e o
+        # reaper o devolve para a fila; o checkpoint evita reconverter.
+        staged.heartbeat.stop()
+        self._slots.release()
+
+    def _transcribe(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                staged = self._staged.get(timeout=self.poll_interval_seconds)
+            except queue.Empty:
+                continue
+            try:
+                run_transcription_stage(staged.job_id, staged.prepared, staged.worker_id, staged.token)
+            finally:
+                staged.heartbeat.stop()
+                self._staged.task_done()
+                self._slots.release()
+
+
+_worker_pool: ProcessingWorkerPool | None = None
+
+
+def build_processing_worker_pool(concurrency: int | None = None, conversion_workers: int | None = None) -> ProcessingWorkerPool:
+    settings = get_settings()
+    return ProcessingWorkerPool(
+        concurrency or settings.processing_concurrency,
+        settings.processing_poll_interval_seconds,
+        settings.processing_heartbeat_seconds,
+        settings.processing_reaper_interval_seconds,
+        conversion_workers=conversion_workers or settings.processing_conversion_workers or None,
+        stage_queue_size=settings.processing_stage_queue_size,
+        cancel_poll_seconds=settings.processing_cancel_poll_seconds,
+    )
+
+
+def start_processing_workers() -> ProcessingWorkerPool | None:
+    global _worker_pool
+    if not get_settings().processing_embedded_workers:
+        return None
+    if _worker_pool is None:
+        _worker_pool = build_processing_worker_pool()
+    _worker_pool.start()
+    return _worker_pool
+
+
+def stop_processing_workers() -> None:
+    global _worker_pool
+    if _worker_pool is None:
+        return
+    _worker_pool.stop()
+    _worker_pool = None
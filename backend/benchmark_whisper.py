@@ -0,0 +1,61 @@
+import argparse
+import difflib
+import time
+
+from app.core.tls import install_system_trust_store
+
+install_system_trust_store()
+
+from app.services.whisper_runtime import load_whisper_model  # noqa: E402
+from app.utils.ffmpeg import probe_duration_seconds  # noqa: E402
+
+
+VARIANTS = {"accuracy": False, "speed": True}
+
+
+def benchmark_variant(audio_path: str, model_name: str, quantize: bool, runs: int, language: str | None) -> dict[str, object]:
+    started = time.monotonic()
+    model = load_whisper_model(model_name, "cpu", quantize)
+    load_seconds = time.monotonic() - started
+
+    timings: list[float] = []
+    text = ""
+    for _ in range(runs):
+        started = time.monotonic()
+        result = model.transcribe(audio_path, language=language, fp16=False)
+        timings.append(time.monotonic() - started)
+        text = (result.get("text") or "").strip()
+    return {"load_seconds": load_seconds, "best_seconds": min(timings), "text": text}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Compara o fator de tempo real do Whisper em CPU com WHISPER_CPU_MODE=accuracy (fp32) e speed (int8)."
+    )
+    parser.add_argument("audio", help="Arquivo de audio/video usado no teste")
+    parser.add_argument("--model", default="small", help="Modelo Whisper (padrao: small)")
+    parser.add_argument("--runs", type=int, default=2, help="Transcricoes por modo; vale a mais rapida")
+    parser.add_argument("--language", default="pt", help="Idioma forcado (vazio = detectar)")
+    args = parser.parse_args(argv)
+
+    duration = probe_duration_seconds(args.audio)
+    if not duration:
+        raise SystemExit("Nao foi possivel ler a duracao do audio")
+
+    results = {
+        mode: benchmark_variant(args.audio, args.model, quantize, max(1, args.runs), args.language or None)
+        for mode, quantize in VARIANTS.items()
+    }
+
+    print(f"[benchmark] {args.audio} ({duration:.1f}s de audio), modelo {args.model} em CPU")
+    for mode, result in results.items():
+        rtf = result["best_seconds"] / duration
+        print(f"  {mode:<8} carga {result['load_seconds']:6.1f}s  transcricao {result['best_seconds']:7.1f}s  RTF {rtf:.3f}")
+
+    speedup = results["accuracy"]["best_seconds"] / max(results["speed"]["best_seconds"], 1e-6)
+    similarity = difflib.SequenceMatcher(None, results["accuracy"]["text"], results["speed"]["text"]).ratio()
+    print(f"  int8 {speedup:.2f}x mais rapido; texto {similarity:.1%} igual ao fp32")
+
+
+if __name__ == "__main__":
+    main()
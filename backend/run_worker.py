@@ -0,0 +1,39 @@
+import argparse
+
+from app.core.tls import install_system_trust_store
+
+install_system_trust_store()
+
+from app.core.config import get_settings  # noqa: E402
+from app.core.database import Base, engine, run_startup_migrations  # noqa: E402
+from app.models import DocumentModel  # noqa: E402
+from app.models.processing_checkpoint import ProcessingCheckpoint  # noqa: E402
+from app.models.processing_job import ProcessingJob  # noqa: E402
+from app.models.transcript_segment import TranscriptSegment  # noqa: E402
+from app.services.whisper_runtime import start_whisper_warmup  # noqa: E402
+from app.workers.processing_worker import build_processing_worker_pool  # noqa: E402
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Consome a fila de processamento fora do processo da API.")
+    parser.add_argument("--concurrency", type=int, default=None, help="Transcricoes simultaneas neste processo")
+    parser.add_argument("--conversion-workers", type=int, default=None, help="Conversoes ffmpeg simultaneas (padrao: transcricoes + fila entre etapas)")
+    args = parser.parse_args(argv)
+
+    _ = (DocumentModel, ProcessingJob, ProcessingCheckpoint, TranscriptSegment)
+    Base.metadata.create_all(bind=engine)
+    run_startup_migrations()
+
+    settings = get_settings()
+    pool = build_processing_worker_pool(args.concurrency, args.conversion_workers)
+    print(
+        f"[run_worker] consumindo fila com {pool.conversion_workers} conversao(oes) e {pool.concurrency} transcricao(oes) "
+        f"simultanea(s) ({settings.database_url.split(':', 1)[0]})",
+        flush=True,
+    )
+    start_whisper_warmup()
+    pool.run_forever()
+
+
+if __name__ == "__main__":
+    main()
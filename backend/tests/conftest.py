@@ -6,10 +6,13 @@ from sqlalchemy.orm import sessionmaker
 
 from app.core.database import Base
 from app.models import DocumentModel, GeneratedReport, ReportTemplate, SystemConfig, Upload
+from app.models.processing_checkpoint import ProcessingCheckpoint
+from app.models.processing_job import ProcessingJob
+from app.models.transcript_segment import TranscriptSegment
 
 
 def _load_models() -> None:
-    _ = (DocumentModel, GeneratedReport, ReportTemplate, SystemConfig, Upload)
+    _ = (DocumentModel, GeneratedReport, ReportTemplate, SystemConfig, Upload, ProcessingJob, ProcessingCheckpoint, TranscriptSegment)
 
 
 def pytest_configure() -> None:
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.upload import ProcessRequest
+from app.services import admission_service, processing_queue_service
+from tests.conftest import create_test_session
+from tests.test_processing_queue import _create_upload
+
+
+def _settings(tmp_path, **overrides) -> SimpleNamespace:
+    values = {
+        "storage_dir": tmp_path,
+        "admission_max_active_jobs_per_workspace": 2,
+        "admission_max_queued_jobs": 0,
+        "admission_min_free_disk_mb": 0,
+        "admission_max_active_ffmpeg": 0,
+        "admission_max_pending_provider_calls": 1,
+        "admission_retry_after_seconds": 45,
+        "processing_conversion_workers": 4,
+        "processing_concurrency": 2,
+        "processing_stage_queue_size": 2,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_workspace_with_too_many_jobs_gets_429_with_retry_after(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    monkeypatch.setattr(admission_service, "get_settings", lambda: _settings(tmp_path))
+    for index in range(2):
+        upload = _create_upload(session, tmp_path, f"clipe-{index}.mp3", workspace_id="tenant-pesado")
+        processing_queue_service.enqueue_processing_job(session, upload, ProcessRequest(), "tenant-pesado")
+
+    queue = admission_service.ensure_capacity(session, "tenant-leve")
+    assert queue.queued == 2
+    assert queue.workspace_active == 0
+
+    with pytest.raises(HTTPException) as error:
+        admission_service.ensure_capacity(session, "tenant-pesado")
+    assert error.value.status_code == 429
+    assert error.value.headers == {"Retry-After": "45"}
+
+    session.close()
+    engine.dispose()
+
+
+def test_server_without_disk_or_provider_slots_gets_503(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    monkeypatch.setattr(admission_service, "get_settings", lambda: _settings(tmp_path, admission_min_free_disk_mb=10**9))
+
+    with pytest.raises(HTTPException) as error:
+        admission_service.ensure_capacity(session)
+    assert error.value.status_code == 503
+
+    monkeypatch.setattr(admission_service, "get_settings", lambda: _settings(tmp_path))
+    with admission_service.track_provider_call():
+        with pytest.raises(HTTPException) as error:
+            admission_service.ensure_capacity(session)
+        assert error.value.status_code == 503
+    assert admission_service.pending_provider_calls() == 0
+    admission_service.ensure_capacity(session)
+
+    session.close()
+    engine.dispose()
+
+
+def test_automatic_ffmpeg_limit_follows_the_worker_pools(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(admission_service, "get_settings", lambda: _settings(tmp_path, admission_max_active_ffmpeg=-1))
+    assert admission_service.ffmpeg_admission_limit() == 4 + 2 + admission_service.FFMPEG_REQUEST_HEADROOM
+
+    monkeypatch.setattr(
+        admission_service,
+        "get_settings",
+        lambda: _settings(tmp_path, admission_max_active_ffmpeg=-1, processing_conversion_workers=0),
+    )
+    monkeypatch.setattr(admission_service.os, "cpu_count", lambda: 32)
+    assert admission_service.ffmpeg_admission_limit() == (2 + 2) + 2 + admission_service.FFMPEG_REQUEST_HEADROOM
+
+    monkeypatch.setattr(admission_service, "get_settings", lambda: _settings(tmp_path, admission_max_active_ffmpeg=5))
+    assert admission_service.ffmpeg_admission_limit() == 5
@@ -0,0 +1,68 @@
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from app.services import api_chunking
+from app.services.api_chunking import merge_chunk_texts
+
+
+def _settings(**overrides):
+    values = {"api_chunk_seconds": 600, "provider_chunk_concurrency": "openai:2,gemini:3"}
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_chunk_texts_are_merged_without_the_overlap() -> None:
+    texts = ["Bom dia a todos, vamos comecar", "vamos comecar a reuniao de hoje.", "", "Ultimo ponto."]
+
+    assert merge_chunk_texts(texts) == "Bom dia a todos, vamos comecar a reuniao de hoje. Ultimo ponto."
+
+
+def test_provider_limits_come_from_settings(monkeypatch) -> None:
+    monkeypatch.setattr(api_chunking, "get_settings", lambda: _settings())
+
+    assert api_chunking.provider_chunk_limit("openai") == 2
+    assert api_chunking.provider_chunk_limit("gemini") == 3
+    assert api_chunking.provider_chunk_limit("outro") == 1
+
+
+def test_long_audio_is_planned_in_overlapping_windows(monkeypatch) -> None:
+    monkeypatch.setattr(api_chunking, "get_settings", lambda: _settings())
+    monkeypatch.setattr(api_chunking, "probe_duration_seconds", lambda path: 1800.0)
+    monkeypatch.setattr(api_chunking, "detect_silences", lambda path, duration=None: [(590.0, 596.0), (1190.0, 1192.0)])
+
+    windows = api_chunking.plan_api_chunks(Path("audio.mp3"))
+
+    assert windows == [(0.0, 595.0), (591.0, 602.0), (1189.0, 611.0)]
+
+    monkeypatch.setattr(api_chunking, "probe_duration_seconds", lambda path: 700.0)
+    assert api_chunking.plan_api_chunks(Path("audio.mp3")) == []
+
+
+def test_chunks_run_in_parallel_within_the_provider_limit(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(api_chunking, "get_settings", lambda: _settings(provider_chunk_concurrency="teste:2"))
+    monkeypatch.setattr(api_chunking, "_semaphores", {})
+    deleted: list[Path] = []
+    monkeypatch.setattr(api_chunking, "cut_audio", lambda path, start, duration: tmp_path / f"chunk-{int(start)}.mp3")
+    monkeypatch.setattr(api_chunking, "safe_unlink", deleted.append)
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def transcribe(chunk_path: Path) -> str:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return chunk_path.stem
+
+    windows = [(0.0, 600.0), (598.0, 602.0), (1198.0, 602.0), (1798.0, 300.0)]
+    results = api_chunking.transcribe_chunks("teste", Path("audio.mp3"), windows, transcribe)
+
+    assert results == ["chunk-0", "chunk-598", "chunk-1198", "chunk-1798"]
+    assert peak == 2
+    assert len(deleted) == 4
@@ -228,10 +228,12 @@ def _build_test_client(monkeypatch) -> TestClient:
     monkeypatch.setattr(uploads, "get_upload_or_404", lambda db, upload_id: _upload_namespace(upload_id))
     monkeypatch.setattr(uploads, "delete_upload", lambda db, upload_id: None)
     monkeypatch.setattr(uploads, "read_dashboard_stats", lambda db: _dashboard_payload())
+    monkeypatch.setattr(uploads, "ensure_capacity", lambda db, workspace_id, incoming=1: None)
+    monkeypatch.setattr(uploads, "count_new_batch_jobs", lambda db, upload_ids: len(upload_ids))
     monkeypatch.setattr(
         uploads,
-        "process_upload",
-        lambda upload_id, language, force_reprocess=False, use_api=True, whisper_model=None, transcription_provider=None: None,
+        "enqueue_processing_job",
+        lambda db, upload, payload: SimpleNamespace(id="job-1", upload_id=upload.id, status="queued"),
     )
 
     app = FastAPI()
@@ -247,6 +249,8 @@ def test_health_and_settings_endpoints(monkeypatch) -> None:
     health_response = client.get("/api/health")
     assert health_response.status_code == 200
     assert health_response.json()["status"] == "ok"
+    assert health_response.json()["ready"] is True
+    assert isinstance(health_response.json()["providers"], dict)
 
     settings_response = client.get("/api/settings")
     assert settings_response.status_code == 200
@@ -389,6 +393,7 @@ def test_upload_and_transcription_endpoints(monkeypatch) -> None:
     )
     assert process_response.status_code == 200
     assert process_response.json()["id"] == "upload-1"
+    assert process_response.json()["job_id"] == "job-1"
 
     transcription_response = client.get("/api/transcriptions/upload-1")
     assert transcription_response.status_code == 200
@@ -629,3 +634,31 @@ def test_process_endpoint_validates_payload(monkeypatch) -> None:
         },
     )
     assert response.status_code == 422
+
+
+def test_process_endpoint_does_not_count_an_upload_with_an_active_job(monkeypatch) -> None:
+    client = _build_test_client(monkeypatch)
+    admitted: list[int] = []
+    monkeypatch.setattr(uploads, "count_new_batch_jobs", lambda db, upload_ids: 0)
+    monkeypatch.setattr(uploads, "ensure_capacity", lambda db, workspace_id, incoming=1: admitted.append(incoming))
+
+    response = client.post("/api/process/upload-1", json={"language": "pt-BR"})
+
+    assert response.status_code == 200
+    assert admitted == [0]
+
+
+def test_transcription_returns_partial_text_while_transcribing(monkeypatch) -> None:
+    client = _build_test_client(monkeypatch)
+    monkeypatch.setattr(
+        transcriptions,
+        "get_upload_or_404",
+        lambda db, upload_id: SimpleNamespace(**{**_upload_payload(upload_id), "status": "transcribing", "transcription_text": None}),
+    )
+    monkeypatch.setattr(transcriptions, "read_partial_transcript", lambda db, upload_id: ("primeiros minutos", 0.25))
+
+    response = client.get("/api/transcriptions/upload-1")
+
+    assert response.status_code == 200
+    assert response.json()["partial_text"] == "primeiros minutos"
+    assert response.json()["progress"] == 0.25
@@ -1,11 +1,15 @@
 import io
 import subprocess
+import sys
+import threading
+import time
 from pathlib import Path
 from types import SimpleNamespace
 
 import pytest
 from starlette.datastructures import Headers, UploadFile
 
+from app.core.cancellation import CancellationToken, JobCancelled, cancellation_scope
 from app.models.enums import FileType
 from app.utils import ffmpeg
 from app.utils.files import detect_media_type, validate_upload
@@ -31,15 +35,50 @@ def test_validate_upload_accepts_recorded_audio_webm() -> None:
     assert validate_upload(upload) == FileType.AUDIO
 
 
-def test_extract_audio_to_mp3_builds_expected_ffmpeg_command(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+def test_convert_audio_builds_expected_ffmpeg_command(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(ffmpeg, "get_settings", lambda: SimpleNamespace(processed_dir=tmp_path, temp_dir=tmp_path))
+    commands: list[list[str]] = []
 
     def fake_run(command: list[str], timeout: int = 300) -> subprocess.CompletedProcess[str]:
+        commands.append(command)
         output = Path(command[-1])
         output.write_bytes(b"fake mp3")
         return subprocess.CompletedProcess(command, 0, "", "")
 
     monkeypatch.setattr(ffmpeg, "run_subprocess", fake_run)
-    result = ffmpeg.extract_audio_to_mp3("sample.mp4")
+    result = ffmpeg.convert_audio("sample.mp4")
     assert result.exists()
     assert result.suffix == ".mp3"
+    assert commands[0][commands[0].index("-ac") + 1] == "1"
+    assert commands[0][commands[0].index("-ar") + 1] == "16000"
+
+
+def test_each_audio_profile_picks_its_container(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(ffmpeg, "get_settings", lambda: SimpleNamespace(processed_dir=tmp_path, temp_dir=tmp_path))
+    monkeypatch.setattr(ffmpeg, "run_subprocess", lambda command, timeout=300: subprocess.CompletedProcess(command, 0, "", ""))
+
+    assert ffmpeg.convert_audio("sample.mp4", "speech_opus").suffix == ".ogg"
+    assert ffmpeg.extract_audio_segments("sample.mp4", [(0.0, 5.0)], "pcm_wav").suffix == ".wav"
+    assert ffmpeg.get_audio_profile("desconhecido").name == ffmpeg.DEFAULT_AUDIO_PROFILE
+
+
+def test_run_subprocess_kills_the_child_when_the_job_is_cancelled() -> None:
+    token = CancellationToken()
+    threading.Timer(0.2, token.cancel).start()
+    started = time.monotonic()
+
+    with cancellation_scope(token), pytest.raises(JobCancelled):
+        ffmpeg.run_subprocess([sys.executable, "-c", "import time; time.sleep(30)"])
+
+    assert time.monotonic() - started < 10
+    assert ffmpeg.active_ffmpeg_processes() == 0
+
+
+def test_parse_silences_reads_silencedetect_log() -> None:
+    log = (
+        "[silencedetect @ 0x1] silence_start: 12.5\n"
+        "[silencedetect @ 0x1] silence_end: 14.25 | silence_duration: 1.75\n"
+        "[silencedetect @ 0x1] silence_start: 58.0\n"
+    )
+
+    assert ffmpeg.parse_silences(log, duration=60.0) == [(12.5, 14.25), (58.0, 60.0)]
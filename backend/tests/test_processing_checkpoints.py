@@ -0,0 +1,250 @@
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+from app.models.enums import FileType, ProcessingStatus, TranscriptionEngine
+from app.models.upload import Upload
+from app.schemas.upload import ProcessRequest
+from app.services import checkpoint_service, processing_queue_service
+from app.services.transcription_service import TranscriptionResult
+from app.services.vad_service import SpeechAudio
+from app.workers import processing_worker
+from tests.conftest import create_test_session
+
+
+def _create_upload(session, tmp_path) -> Upload:
+    source = tmp_path / "aula.mp4"
+    source.write_bytes(b"video")
+    upload = Upload(
+        original_filename="aula.mp4",
+        stored_filename="aula.mp4",
+        file_type=FileType.VIDEO,
+        mime_type="video/mp4",
+        original_path=str(source),
+        upload_size_bytes=5,
+        transcription_engine=TranscriptionEngine.NONE,
+        status=ProcessingStatus.UPLOADED,
+    )
+    session.add(upload)
+    session.commit()
+    session.refresh(upload)
+    return upload
+
+
+def test_checkpoint_is_invalid_when_fingerprint_or_artifact_changes(tmp_path) -> None:
+    session, engine = create_test_session(tmp_path)
+    upload = _create_upload(session, tmp_path)
+    artifact = tmp_path / "convertido.mp3"
+    artifact.write_bytes(b"mp3")
+    source_fingerprint = checkpoint_service.media_fingerprint(upload.original_path, "receita-a")
+
+    checkpoint_service.save_checkpoint(session, upload.id, checkpoint_service.STAGE_CONVERT, source_fingerprint, artifact_path=artifact)
+
+    assert checkpoint_service.load_checkpoint(session, upload.id, checkpoint_service.STAGE_CONVERT, source_fingerprint) is not None
+    other_recipe = checkpoint_service.media_fingerprint(upload.original_path, "receita-b")
+    assert checkpoint_service.load_checkpoint(session, upload.id, checkpoint_service.STAGE_CONVERT, other_recipe) is None
+
+    artifact.unlink()
+    assert checkpoint_service.load_checkpoint(session, upload.id, checkpoint_service.STAGE_CONVERT, source_fingerprint) is None
+
+    session.close()
+    engine.dispose()
+
+
+def test_reprocess_with_other_provider_reuses_conversion_and_duration(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    upload = _create_upload(session, tmp_path)
+    calls: list[str] = []
+
+    def fake_extract(source_path, profile):
+        calls.append("extract")
+        output = tmp_path / f"convertido-{len(calls)}.mp3"
+        output.write_bytes(b"mp3")
+        return output
+
+    def fake_probe(path):
+        calls.append("probe")
+        return 7200.0
+
+    def fake_transcribe(db, audio_path, language, **kwargs):
+        calls.append(f"transcribe:{kwargs['transcription_provider_preference']}")
+        return TranscriptionResult(text="texto", engine=TranscriptionEngine.WHISPER, language_detected="pt", metadata={})
+
+    monkeypatch.setattr(processing_worker, "SessionLocal", lambda: session)
+    monkeypatch.setattr(session, "close", lambda: None)
+    monkeypatch.setattr(processing_worker, "convert_audio", fake_extract)
+    monkeypatch.setattr(processing_worker, "probe_duration_seconds", fake_probe)
+    monkeypatch.setattr(processing_worker, "transcribe_audio", fake_transcribe)
+    monkeypatch.setattr(processing_worker, "consume_credits", lambda *args, **kwargs: None)
+    monkeypatch.setattr(
+        processing_worker,
+        "get_effective_provider_settings",
+        lambda db: {"auto_cleanup_temp_files": True, "openai_api_key": "sk-test"},
+    )
+    monkeypatch.setattr(processing_worker, "get_settings", lambda: SimpleNamespace(processing_checkpoint_retention_hours=24, vad_enabled=False))
+
+    processing_worker.process_upload(upload.id, "pt-BR", transcription_provider="openai")
+    processing_worker.process_upload(upload.id, "pt-BR", force_reprocess=True, use_api=False, transcription_provider="whisper")
+
+    assert calls == ["extract", "probe", "transcribe:openai", "transcribe:whisper"]
+    reprocessed = session.get(Upload, upload.id)
+    assert reprocessed.status == ProcessingStatus.COMPLETED
+    assert reprocessed.duration_seconds == 7200.0
+    assert Path(reprocessed.converted_path).exists()
+
+    engine.dispose()
+
+
+def test_local_only_transcription_reads_the_original_media_without_converting(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    upload = _create_upload(session, tmp_path)
+    transcribed: list[Path] = []
+
+    def fail_extract(source_path, profile):
+        raise AssertionError("motor local nao precisa do MP3")
+
+    def fake_transcribe(db, audio_path, language, **kwargs):
+        transcribed.append(Path(audio_path))
+        return TranscriptionResult(text="texto", engine=TranscriptionEngine.WHISPER, language_detected="pt", metadata={})
+
+    monkeypatch.setattr(processing_worker, "SessionLocal", lambda: session)
+    monkeypatch.setattr(session, "close", lambda: None)
+    monkeypatch.setattr(processing_worker, "convert_audio", fail_extract)
+    monkeypatch.setattr(processing_worker, "probe_duration_seconds", lambda path: 60.0)
+    monkeypatch.setattr(processing_worker, "transcribe_audio", fake_transcribe)
+    monkeypatch.setattr(processing_worker, "consume_credits", lambda *args, **kwargs: None)
+    monkeypatch.setattr(
+        processing_worker,
+        "get_effective_provider_settings",
+        lambda db: {"auto_cleanup_temp_files": True, "openai_api_key": "sk-test"},
+    )
+    monkeypatch.setattr(processing_worker, "get_settings", lambda: SimpleNamespace(processing_checkpoint_retention_hours=24, vad_enabled=False))
+
+    processing_worker.process_upload(upload.id, "pt-BR", use_api=False)
+
+    assert transcribed == [Path(upload.original_path)]
+    completed = session.get(Upload, upload.id)
+    assert completed.status == ProcessingStatus.COMPLETED
+    assert completed.converted_path is None
+
+    engine.dispose()
+
+
+def test_vad_speech_audio_is_transcribed_and_segments_mapped_back(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    upload = _create_upload(session, tmp_path)
+    converted = tmp_path / "convertido.mp3"
+    converted.write_bytes(b"mp3")
+    speech = tmp_path / "fala.mp3"
+    speech.write_bytes(b"mp3")
+    transcribed: list[Path] = []
+
+    def fake_transcribe(db, audio_path, language, **kwargs):
+        transcribed.append(Path(audio_path))
+        return TranscriptionResult(
+            text="bom dia pauta",
+            engine=TranscriptionEngine.WHISPER,
+            language_detected="pt",
+            metadata={},
+            segments=[{"start": 0.0, "end": 2.0, "text": "bom dia"}, {"start": 10.0, "end": 12.0, "text": "pauta"}],
+        )
+
+    saved: dict = {}
+    real_save = processing_worker.save_checkpoint
+
+    def spy_save(db, upload_id, stage, checkpoint_fingerprint, **kwargs):
+        if stage == checkpoint_service.STAGE_TRANSCRIBE:
+            saved.update(kwargs["payload"])
+        return real_save(db, upload_id, stage, checkpoint_fingerprint, **kwargs)
+
+    monkeypatch.setattr(processing_worker, "SessionLocal", lambda: session)
+    monkeypatch.setattr(session, "close", lambda: None)
+    monkeypatch.setattr(processing_worker, "convert_audio", lambda source_path, profile: converted)
+    monkeypatch.setattr(processing_worker, "probe_duration_seconds", lambda path: 600.0)
+    monkeypatch.setattr(
+        processing_worker,
+        "prepare_speech_audio",
+        lambda path, duration, profile: SpeechAudio(speech, [(0.0, 30.0, 8.0), (8.0, 300.0, 20.0)], 28.0, duration),
+    )
+    monkeypatch.setattr(processing_worker, "transcribe_audio", fake_transcribe)
+    monkeypatch.setattr(processing_worker, "save_checkpoint", spy_save)
+    monkeypatch.setattr(processing_worker, "consume_credits", lambda *args, **kwargs: None)
+    monkeypatch.setattr(processing_worker, "get_effective_provider_settings", lambda db: {"auto_cleanup_temp_files": False})
+    monkeypatch.setattr(
+        processing_worker,
+        "get_settings",
+        lambda: SimpleNamespace(processing_checkpoint_retention_hours=24, vad_enabled=True, vad_noise_db=-35.0, vad_min_silence_seconds=2.0),
+    )
+
+    processing_worker.process_upload(upload.id, "pt-BR")
+
+    assert transcribed == [speech]
+    assert saved["metadata"]["speech_seconds"] == 28.0
+    assert session.get(Upload, upload.id).status == ProcessingStatus.COMPLETED
+
+    engine.dispose()
+
+
+def test_retry_of_the_same_job_resumes_the_saved_transcript(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    upload = _create_upload(session, tmp_path)
+    converted = tmp_path / "convertido.mp3"
+    converted.write_bytes(b"mp3")
+    calls: list[str] = []
+
+    def fake_transcribe(db, audio_path, language, **kwargs):
+        calls.append("transcribe")
+        return TranscriptionResult(
+            text="texto salvo",
+            engine=TranscriptionEngine.OPENAI,
+            language_detected="pt",
+            metadata={"provider": "openai"},
+            segments=[{"start": 0.0, "end": 1.0, "text": "texto salvo"}],
+        )
+
+    monkeypatch.setattr(processing_worker, "SessionLocal", lambda: session)
+    monkeypatch.setattr(session, "close", lambda: None)
+    monkeypatch.setattr(processing_worker, "transcribe_audio", fake_transcribe)
+    monkeypatch.setattr(processing_worker, "get_effective_provider_settings", lambda db: {"auto_cleanup_temp_files": False})
+    prepared = processing_worker.PreparedUpload(upload.id, "pt-BR", converted, "origem")
+
+    processing_worker.transcribe_prepared_upload(prepared, "job-1")
+    processing_worker.transcribe_prepared_upload(prepared, "job-1")
+    assert calls == ["transcribe"]
+    resumed = session.get(Upload, upload.id)
+    assert resumed.transcription_text == "texto salvo"
+    assert resumed.transcription_engine == TranscriptionEngine.OPENAI
+
+    processing_worker.transcribe_prepared_upload(prepared, "job-2")
+    assert calls == ["transcribe", "transcribe"]
+
+    engine.dispose()
+
+
+def test_purge_keeps_artifacts_in_use_by_active_jobs_or_recent_reuse(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    monkeypatch.setattr(checkpoint_service, "get_effective_provider_settings", lambda db: {"auto_cleanup_temp_files": True})
+    monkeypatch.setattr(checkpoint_service, "get_settings", lambda: SimpleNamespace(processing_checkpoint_retention_hours=1))
+    stale = checkpoint_service._utcnow() - timedelta(hours=2)
+    uploads = []
+    for name in ("ativo", "reusado", "velho"):
+        upload = _create_upload(session, tmp_path)
+        artifact = tmp_path / f"{name}.mp3"
+        artifact.write_bytes(b"mp3")
+        checkpoint = checkpoint_service.save_checkpoint(session, upload.id, checkpoint_service.STAGE_CONVERT, name, artifact_path=artifact)
+        checkpoint.updated_at = stale
+        session.commit()
+        uploads.append(upload)
+    active, reused, old = uploads
+
+    processing_queue_service.enqueue_processing_job(session, active, ProcessRequest())
+    assert checkpoint_service.load_checkpoint(session, reused.id, checkpoint_service.STAGE_CONVERT, "reusado") is not None
+
+    assert checkpoint_service.purge_expired_checkpoints(session) == 1
+    assert (tmp_path / "ativo.mp3").exists()
+    assert (tmp_path / "reusado.mp3").exists()
+    assert not (tmp_path / "velho.mp3").exists()
+    assert checkpoint_service.load_checkpoint(session, old.id, checkpoint_service.STAGE_CONVERT, "velho") is None
+
+    session.close()
+    engine.dispose()
@@ -0,0 +1,547 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.cancellation import CANCELLED_MESSAGE, CancellationToken, raise_if_cancelled, register_job_token, release_job_token
+from app.models.enums import FileType, ProcessingStatus, TranscriptionEngine
+from app.models.upload import Upload
+from app.repositories.processing_job_repository import ProcessingJobRepository
+from app.schemas.upload import ProcessBatchRequest, ProcessRequest
+from app.services import processing_queue_service, usage_service
+from app.workers import processing_worker
+from tests.conftest import create_test_session
+
+
+def _create_upload(session, tmp_path, name: str = "audio.mp3", workspace_id: str = "local-workspace") -> Upload:
+    upload = Upload(
+        workspace_id=workspace_id,
+        original_filename=name,
+        stored_filename=name,
+        file_type=FileType.AUDIO,
+        mime_type="audio/mpeg",
+        original_path=str(tmp_path / name),
+        upload_size_bytes=10,
+        transcription_engine=TranscriptionEngine.NONE,
+        status=ProcessingStatus.UPLOADED,
+    )
+    session.add(upload)
+    session.commit()
+    session.refresh(upload)
+    return upload
+
+
+def test_enqueue_reuses_the_active_job_of_the_upload(tmp_path) -> None:
+    session, engine = create_test_session(tmp_path)
+    upload = _create_upload(session, tmp_path)
+
+    first = processing_queue_service.enqueue_processing_job(session, upload, ProcessRequest(use_api=False, whisper_model="small"))
+    second = processing_queue_service.enqueue_processing_job(session, upload, ProcessRequest())
+
+    assert first.id == second.id
+    assert first.status == "queued"
+    assert first.use_api is False
+    assert first.whisper_model == "small"
+
+    session.close()
+    engine.dispose()
+
+
+def test_claim_is_exclusive_and_follows_queue_order(tmp_path) -> None:
+    session, engine = create_test_session(tmp_path)
+    first_upload = _create_upload(session, tmp_path, "primeiro.mp3")
+    second_upload = _create_upload(session, tmp_path, "segundo.mp3", workspace_id="outro-workspace")
+    first_job = processing_queue_service.enqueue_processing_job(session, first_upload, ProcessRequest())
+    second_job = processing_queue_service.enqueue_processing_job(session, second_upload, ProcessRequest(), "outro-workspace")
+
+    claimed = processing_queue_service.claim_next_job(session, "worker-a")
+    assert claimed is not None
+    assert claimed.id == first_job.id
+    assert claimed.status == "running"
+    assert claimed.worker_id == "worker-a"
+    assert claimed.attempts == 1
+    assert claimed.lease_expires_at is not None
+
+    repository = ProcessingJobRepository(session)
+    assert repository.try_claim(first_job.id, "worker-b", claimed.started_at, claimed.lease_expires_at) is False
+
+    next_claim = processing_queue_service.claim_next_job(session, "worker-b")
+    assert next_claim is not None
+    assert next_claim.id == second_job.id
+    assert processing_queue_service.claim_next_job(session, "worker-c") is None
+
+    session.close()
+    engine.dispose()
+
+
+def test_run_processing_job_marks_failed_when_upload_errors(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    upload = _create_upload(session, tmp_path)
+    job = processing_queue_service.enqueue_processing_job(session, upload, ProcessRequest())
+    processing_queue_service.claim_next_job(session, "worker-a")
+
+    def fake_prepare_upload(upload_id, *args) -> None:
+        target = session.get(Upload, upload_id)
+        target.status = ProcessingStatus.ERROR
+        target.error_message = "ffmpeg falhou"
+        session.commit()
+        return None
+
+    monkeypatch.setattr(processing_worker, "SessionLocal", lambda: session)
+    monkeypatch.setattr(session, "close", lambda: None)
+    monkeypatch.setattr(processing_worker, "prepare_upload", fake_prepare_upload)
+
+    processing_worker.run_processing_job(job.id)
+
+    finished = ProcessingJobRepository(session).get(job.id)
+    assert finished.status == "failed"
+    assert finished.error_message == "ffmpeg falhou"
+    assert finished.completed_at is not None
+
+    engine.dispose()
+
+
+def test_scheduler_runs_short_media_first_with_aging_and_plan_lanes(tmp_path) -> None:
+    session, engine = create_test_session(tmp_path)
+    long_upload = _create_upload(session, tmp_path, "longo.mp3")
+    long_upload.duration_seconds = 3 * 3600
+    short_upload = _create_upload(session, tmp_path, "curto.mp3")
+    short_upload.duration_seconds = 45
+    session.commit()
+    long_job = processing_queue_service.enqueue_processing_job(session, long_upload, ProcessRequest())
+    short_job = processing_queue_service.enqueue_processing_job(session, short_upload, ProcessRequest())
+    assert long_job.estimated_seconds == 3 * 3600
+
+    now = short_job.created_at
+    assert processing_queue_service.schedule_queued_jobs([long_job, short_job], now) == [short_job, long_job]
+
+    # Depois de ~20 minutos na fila o video longo passa a frente de um clipe recem-chegado.
+    later = long_job.created_at + timedelta(minutes=20)
+    short_job.created_at = later
+    assert processing_queue_service.schedule_queued_jobs([short_job, long_job], later) == [long_job, short_job]
+
+    short_job.created_at = now
+    long_job.priority = 20
+    assert processing_queue_service.schedule_queued_jobs([short_job, long_job], now) == [long_job, short_job]
+
+    claimed = processing_queue_service.claim_next_job(session, "worker-a")
+    assert claimed.id == long_job.id
+
+    session.close()
+    engine.dispose()
+
+
+def test_claim_respects_workspace_caps_and_shares_workers_fairly(tmp_path) -> None:
+    session, engine = create_test_session(tmp_path)
+    heavy_jobs = []
+    for index in range(3):
+        upload = _create_upload(session, tmp_path, f"lote-{index}.mp3", workspace_id="tenant-pesado")
+        heavy_jobs.append(processing_queue_service.enqueue_processing_job(session, upload, ProcessRequest(), "tenant-pesado"))
+    light_upload = _create_upload(session, tmp_path, "clipe.mp3", workspace_id="tenant-leve")
+    light_job = processing_queue_service.enqueue_processing_job(session, light_upload, ProcessRequest(), "tenant-leve")
+
+    first = processing_queue_service.claim_next_job(session, "worker-a")
+    second = processing_queue_service.claim_next_job(session, "worker-b")
+
+    assert first.workspace_id == "tenant-pesado"
+    assert second.id == light_job.id
+    # Plano trial: um job por vez, o resto do lote espera mesmo com workers livres.
+    assert processing_queue_service.claim_next_job(session, "worker-c") is None
+
+    processing_queue_service.finish_processing_job(session, first, "done")
+    third = processing_queue_service.claim_next_job(session, "worker-c")
+    assert third.workspace_id == "tenant-pesado"
+    assert third.id != first.id
+
+    session.close()
+    engine.dispose()
+
+
+def test_cancel_drops_queued_jobs_and_signals_running_ones(tmp_path) -> None:
+    session, engine = create_test_session(tmp_path)
+    running_upload = _create_upload(session, tmp_path, "errado.mp3")
+    queued_upload = _create_upload(session, tmp_path, "fila.mp3", workspace_id="outro-workspace")
+    running_job = processing_queue_service.enqueue_processing_job(session, running_upload, ProcessRequest())
+    processing_queue_service.claim_next_job(session, "worker-a")
+    queued_job = processing_queue_service.enqueue_processing_job(session, queued_upload, ProcessRequest(), "outro-workspace")
+    token = CancellationToken()
+    register_job_token(running_job.id, token)
+
+    cancelled = processing_queue_service.cancel_processing_job(session, queued_job.id, "outro-workspace")
+    assert cancelled.status == "cancelled"
+    assert processing_queue_service.claim_next_job(session, "worker-b") is None
+
+    signalled = processing_queue_service.cancel_processing_job(session, running_job.id)
+    assert signalled.status == "running"
+    assert signalled.cancel_requested is True
+    assert token.cancelled is True
+    release_job_token(running_job.id)
+
+    with pytest.raises(HTTPException) as error:
+        processing_queue_service.cancel_processing_job(session, queued_job.id, "outro-workspace")
+    assert error.value.status_code == 409
+
+    session.close()
+    engine.dispose()
+
+
+def test_cancelled_job_finishes_as_cancelled_and_frees_the_upload(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    upload = _create_upload(session, tmp_path)
+    (tmp_path / "audio.mp3").write_bytes(b"mp3")
+    job = processing_queue_service.enqueue_processing_job(session, upload, ProcessRequest())
+    processing_queue_service.claim_next_job(session, "worker-a")
+    token = CancellationToken()
+
+    def fake_extract(source_path, profile):
+        processing_queue_service.cancel_processing_job(session, job.id)
+        token.cancel()
+        raise_if_cancelled()
+
+    monkeypatch.setattr(processing_worker, "SessionLocal", lambda: session)
+    monkeypatch.setattr(session, "close", lambda: None)
+    monkeypatch.setattr(processing_worker, "transcription_audio_profile", lambda *args: "speech_mp3")
+    monkeypatch.setattr(processing_worker, "convert_audio", fake_extract)
+
+    processing_worker.run_processing_job(job.id, "worker-a", token)
+
+    session.expire_all()
+    finished = ProcessingJobRepository(session).get(job.id)
+    assert finished.status == "cancelled"
+    cancelled_upload = session.get(Upload, upload.id)
+    assert cancelled_upload.status == ProcessingStatus.UPLOADED
+    assert cancelled_upload.error_message == CANCELLED_MESSAGE
+
+    engine.dispose()
+
+
+def test_cancel_right_after_prepare_resets_the_upload(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    upload = _create_upload(session, tmp_path)
+    job = processing_queue_service.enqueue_processing_job(session, upload, ProcessRequest())
+    processing_queue_service.claim_next_job(session, "worker-a")
+    token = CancellationToken()
+
+    def fake_prepare(upload_id, *args):
+        prepared_upload = session.get(Upload, upload_id)
+        prepared_upload.status = ProcessingStatus.TRANSCRIBING
+        session.commit()
+        # O cancelamento chega depois que a conversao terminou.
+        processing_queue_service.cancel_processing_job(session, job.id)
+        token.cancel()
+        return SimpleNamespace(upload_id=upload_id)
+
+    monkeypatch.setattr(processing_worker, "SessionLocal", lambda: session)
+    monkeypatch.setattr(session, "close", lambda: None)
+    monkeypatch.setattr(processing_worker, "prepare_upload", fake_prepare)
+
+    assert processing_worker.run_conversion_stage(job.id, "worker-a", token) is None
+
+    session.expire_all()
+    assert ProcessingJobRepository(session).get(job.id).status == "cancelled"
+    released = session.get(Upload, upload.id)
+    assert released.status == ProcessingStatus.UPLOADED
+    assert released.error_message == CANCELLED_MESSAGE
+
+    engine.dispose()
+
+
+def test_batch_enqueues_every_upload_in_one_transaction(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    monkeypatch.setattr(usage_service, "get_settings", lambda: SimpleNamespace(credit_limits_enabled=True, trial_credit_limit=20))
+    uploads = [_create_upload(session, tmp_path, f"aula-{index}.mp3") for index in range(3)]
+    for upload in uploads:
+        upload.duration_seconds = 120
+    session.commit()
+    existing = processing_queue_service.enqueue_processing_job(session, uploads[0], ProcessRequest())
+
+    batch = processing_queue_service.enqueue_processing_batch(
+        session,
+        ProcessBatchRequest(upload_ids=[upload.id for upload in uploads] + [uploads[1].id], use_api=False),
+    )
+
+    assert batch.total == 3
+    assert batch.queued == 3
+    assert batch.progress == 0
+    assert existing.id in {item.id for item in batch.items}
+    assert usage_service.current_month_credits(session, "local-workspace") == 2
+
+    processing_queue_service.finish_processing_job(session, ProcessingJobRepository(session).get(existing.id), "done")
+    assert processing_queue_service.read_processing_batch(session, batch.batch_id).progress == pytest.approx(1 / 3, abs=1e-3)
+
+    session.close()
+    engine.dispose()
+
+
+def test_queued_jobs_get_their_duration_probed_off_the_request_path(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    known = _create_upload(session, tmp_path, "conhecido.mp3")
+    known.duration_seconds = 45
+    unknown = _create_upload(session, tmp_path, "novo.mp3")
+    unreadable = _create_upload(session, tmp_path, "quebrado.mp3")
+    session.commit()
+    probed: list[str] = []
+
+    def fake_probe(path):
+        probed.append(path)
+        if path == unreadable.original_path:
+            raise RuntimeError("ffprobe falhou")
+        return 600.0
+
+    monkeypatch.setattr(processing_queue_service, "probe_duration_seconds", fake_probe)
+    jobs = [processing_queue_service.enqueue_processing_job(session, upload, ProcessRequest()) for upload in (known, unknown, unreadable)]
+    assert probed == []
+    assert [job.estimated_seconds for job in jobs] == [45, None, None]
+
+    assert processing_queue_service.estimate_queued_durations(session) == 2
+    assert [job.estimated_seconds for job in jobs] == [45, 600.0, processing_queue_service.UNKNOWN_DURATION_SECONDS]
+    assert processing_queue_service.estimate_queued_durations(session) == 0
+    assert len(probed) == 2
+
+    session.close()
+    engine.dispose()
+
+
+def test_batch_admission_counts_only_uploads_without_an_active_job(tmp_path) -> None:
+    session, engine = create_test_session(tmp_path)
+    uploads = [_create_upload(session, tmp_path, f"aula-{index}.mp3") for index in range(3)]
+    processing_queue_service.enqueue_processing_job(session, uploads[0], ProcessRequest())
+
+    upload_ids = [upload.id for upload in uploads] + [uploads[1].id]
+    assert processing_queue_service.count_new_batch_jobs(session, upload_ids) == 2
+
+    session.close()
+    engine.dispose()
+
+
+def test_batch_reports_every_requested_upload_even_when_active_in_another_batch(tmp_path) -> None:
+    session, engine = create_test_session(tmp_path)
+    uploads = [_create_upload(session, tmp_path, f"aula-{index}.mp3") for index in range(3)]
+    first = processing_queue_service.enqueue_processing_batch(session, ProcessBatchRequest(upload_ids=[uploads[0].id, uploads[1].id]))
+
+    overlapping = processing_queue_service.enqueue_processing_batch(session, ProcessBatchRequest(upload_ids=[uploads[1].id, uploads[0].id]))
+    assert overlapping.total == 2
+    assert [item.id for item in overlapping.items] == [first.items[1].id, first.items[0].id]
+    assert processing_queue_service.read_processing_batch(session, overlapping.batch_id).total == 2
+
+    partial = processing_queue_service.enqueue_processing_batch(session, ProcessBatchRequest(upload_ids=[upload.id for upload in uploads]))
+    assert partial.total == 3
+    assert [item.upload_id for item in partial.items] == [upload.id for upload in uploads]
+    assert {item.id for item in partial.items[:2]} == {item.id for item in first.items}
+    assert processing_queue_service.read_processing_batch(session, first.batch_id).total == 2
+
+    processing_queue_service.finish_processing_job(session, ProcessingJobRepository(session).get(first.items[0].id), "done")
+    assert processing_queue_service.read_processing_batch(session, partial.batch_id).progress == pytest.approx(1 / 3, abs=1e-3)
+
+    session.close()
+    engine.dispose()
+
+
+def test_batch_over_the_credit_limit_enqueues_nothing(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    monkeypatch.setattr(usage_service, "get_settings", lambda: SimpleNamespace(credit_limits_enabled=True, trial_credit_limit=20))
+    uploads = [_create_upload(session, tmp_path, f"longa-{index}.mp3") for index in range(2)]
+    for upload in uploads:
+        upload.duration_seconds = 15 * 60
+    session.commit()
+
+    with pytest.raises(HTTPException) as error:
+        processing_queue_service.enqueue_processing_batch(session, ProcessBatchRequest(upload_ids=[upload.id for upload in uploads]))
+
+    assert error.value.status_code == 402
+    assert ProcessingJobRepository(session).list_active() == []
+    assert usage_service.current_month_credits(session, "local-workspace") == 0
+
+    session.close()
+    engine.dispose()
+
+
+class _NoopHeartbeat:
+    def __init__(self, *args) -> None:
+        pass
+
+    def start(self) -> "_NoopHeartbeat":
+        return self
+
+    def stop(self) -> None:
+        pass
+
+
+def test_pool_converts_next_upload_while_previous_one_transcribes(monkeypatch) -> None:
+    pending = ["job-1", "job-2"]
+    second_converted = threading.Event()
+    transcribed: list[tuple[str, bool]] = []
+    all_done = threading.Event()
+
+    def fake_conversion_stage(job_id, worker_id, token=None):
+        if job_id == "job-2":
+            second_converted.set()
+        return SimpleNamespace(upload_id=job_id)
+
+    def fake_transcription_stage(job_id, prepared, worker_id, token=None):
+        # O job-1 "espera a API": a conversao do job-2 precisa acontecer nesse meio tempo.
+        overlapped = second_converted.wait(2) if job_id == "job-1" else True
+        transcribed.append((job_id, overlapped))
+        if len(transcribed) == 2:
+            all_done.set()
+
+    pool = processing_worker.ProcessingWorkerPool(1, poll_interval_seconds=0.1, conversion_workers=1, stage_queue_size=1)
+    monkeypatch.setattr(pool, "reap", lambda: None)
+    monkeypatch.setattr(pool, "_claim", lambda worker_id: pending.pop(0) if pending else None)
+    monkeypatch.setattr(processing_worker, "JobHeartbeat", _NoopHeartbeat)
+    monkeypatch.setattr(processing_worker, "run_conversion_stage", fake_conversion_stage)
+    monkeypatch.setattr(processing_worker, "run_transcription_stage", fake_transcription_stage)
+
+    pool.start()
+    try:
+        assert all_done.wait(5)
+    finally:
+        pool.stop()
+
+    assert transcribed == [("job-1", True), ("job-2", True)]
+
+
+def test_pool_claims_only_while_a_pipeline_slot_is_free(monkeypatch) -> None:
+    release = threading.Event()
+    claimed: list[str] = []
+    counter = iter(range(100))
+
+    def fake_claim(worker_id):
+        job_id = f"job-{next(counter)}"
+        claimed.append(job_id)
+        return job_id
+
+    pool = processing_worker.ProcessingWorkerPool(1, poll_interval_seconds=0.05, conversion_workers=8, stage_queue_size=1)
+    monkeypatch.setattr(pool, "reap", lambda: None)
+    monkeypatch.setattr(pool, "_claim", fake_claim)
+    monkeypatch.setattr(processing_worker, "JobHeartbeat", _NoopHeartbeat)
+    monkeypatch.setattr(processing_worker, "run_conversion_stage", lambda job_id, worker_id, token=None: SimpleNamespace(upload_id=job_id))
+    monkeypatch.setattr(processing_worker, "run_transcription_stage", lambda *args, **kwargs: release.wait(5))
+
+    pool.start()
+    try:
+        time.sleep(0.5)
+        # Uma transcricao rodando + uma na fila entre etapas; as outras 6 threads esperam vaga.
+        assert len(claimed) == pool.pipeline_slots == 2
+    finally:
+        release.set()
+        pool.stop()
+
+
+def test_default_conversion_workers_follow_the_pipeline_slots(monkeypatch) -> None:
+    monkeypatch.setattr(processing_worker.os, "cpu_count", lambda: 64)
+    assert processing_worker.ProcessingWorkerPool(2, stage_queue_size=2).conversion_workers == 4
+    monkeypatch.setattr(processing_worker.os, "cpu_count", lambda: 2)
+    assert processing_worker.ProcessingWorkerPool(2, stage_queue_size=2).conversion_workers == 2
+
+
+def test_heartbeat_only_renews_lease_for_the_owner(tmp_path) -> None:
+    session, engine = create_test_session(tmp_path)
+    upload = _create_upload(session, tmp_path)
+    processing_queue_service.enqueue_processing_job(session, upload, ProcessRequest())
+    job = processing_queue_service.claim_next_job(session, "worker-a")
+    first_lease = job.lease_expires_at
+
+    assert processing_queue_service.renew_job_lease(session, job.id, "worker-b") is False
+    assert processing_queue_service.renew_job_lease(session, job.id, "worker-a") is True
+
+    session.expire_all()
+    renewed = ProcessingJobRepository(session).get(job.id)
+    assert renewed.heartbeat_at is not None
+    assert renewed.lease_expires_at >= first_lease
+
+    active = processing_queue_service.list_active_processing_jobs(session)
+    assert active.total == 1
+    assert active.items[0].worker_id == "worker-a"
+
+    session.close()
+    engine.dispose()
+
+
+def _expire_lease(session, job_id: str) -> None:
+    job = ProcessingJobRepository(session).get(job_id)
+    job.lease_expires_at = datetime(2000, 1, 1)
+    session.commit()
+
+
+def test_reaper_requeues_expired_jobs_until_attempts_run_out(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    upload = _create_upload(session, tmp_path)
+    monkeypatch.setattr(
+        processing_queue_service,
+        "get_settings",
+        lambda: SimpleNamespace(
+            processing_lease_seconds=300,
+            processing_max_attempts=2,
+            default_language="pt-BR",
+            processing_scheduler="fifo",
+        ),
+    )
+    job = processing_queue_service.enqueue_processing_job(session, upload, ProcessRequest())
+
+    processing_queue_service.claim_next_job(session, "worker-morto")
+    _expire_lease(session, job.id)
+    assert processing_queue_service.reap_expired_jobs(session)["requeued"] == 1
+
+    session.expire_all()
+    requeued = ProcessingJobRepository(session).get(job.id)
+    assert requeued.status == "queued"
+    assert requeued.worker_id is None
+
+    processing_queue_service.claim_next_job(session, "worker-morto-2")
+    _expire_lease(session, job.id)
+    assert processing_queue_service.reap_expired_jobs(session)["failed"] == 1
+
+    session.expire_all()
+    failed = ProcessingJobRepository(session).get(job.id)
+    assert failed.status == "failed"
+    assert session.get(Upload, upload.id).status == ProcessingStatus.ERROR
+
+    session.close()
+    engine.dispose()
+
+
+def test_reaper_enqueues_uploads_stuck_without_job(tmp_path) -> None:
+    session, engine = create_test_session(tmp_path)
+    upload = _create_upload(session, tmp_path)
+    upload.status = ProcessingStatus.TRANSCRIBING
+    session.commit()
+
+    summary = processing_queue_service.reap_expired_jobs(session)
+
+    assert summary["orphans_requeued"] == 1
+    job = ProcessingJobRepository(session).get_active_for_upload(upload.id)
+    assert job is not None
+    assert job.force_reprocess is True
+    assert session.get(Upload, upload.id).status == ProcessingStatus.UPLOADED
+
+    session.close()
+    engine.dispose()
+
+
+def test_capped_claim_on_postgres_takes_the_workspace_lock_before_counting() -> None:
+    statements: list[str] = []
+
+    def execute(statement):
+        statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return SimpleNamespace(rowcount=1)
+
+    db = SimpleNamespace(
+        get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql")),
+        execute=execute,
+        commit=lambda: None,
+    )
+    now = datetime(2026, 10, 18, 12, 0)
+
+    assert ProcessingJobRepository(db).try_claim("job-1", "worker-a", now, now, "tenant", 1)
+    assert "pg_advisory_xact_lock" in statements[0]
+    assert statements[1].startswith("UPDATE processing_jobs")
+
+    statements.clear()
+    ProcessingJobRepository(db).try_claim("job-1", "worker-a", now, now)
+    assert len(statements) == 1
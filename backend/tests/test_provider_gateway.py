@@ -0,0 +1,238 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.cancellation import CancellationToken, JobCancelled, cancellation_scope
+from app.services import provider_gateway
+
+
+def test_clients_are_reused_per_provider_and_key(monkeypatch) -> None:
+    monkeypatch.setattr(provider_gateway, "_clients", provider_gateway.OrderedDict())
+    built: list[str] = []
+
+    def factory(name: str):
+        def build():
+            built.append(name)
+            return object()
+
+        return build
+
+    first = provider_gateway._cached_client("openai", "sk-a", factory("a"))
+    again = provider_gateway._cached_client("openai", "sk-a", factory("a-de-novo"))
+    other_key = provider_gateway._cached_client("openai", "sk-b", factory("b"))
+    other_provider = provider_gateway._cached_client("gemini", "sk-a", factory("gemini"))
+
+    assert first is again
+    assert other_key is not first and other_provider is not first
+    assert built == ["a", "b", "gemini"]
+    assert all("sk-" not in digest for _, digest in provider_gateway._clients)
+
+
+def test_least_recently_used_clients_leave_the_cache(monkeypatch) -> None:
+    monkeypatch.setattr(provider_gateway, "_clients", provider_gateway.OrderedDict())
+    monkeypatch.setattr(provider_gateway, "MAX_CACHED_CLIENTS", 2)
+
+    oldest = provider_gateway._cached_client("openai", "k1", object)
+    provider_gateway._cached_client("openai", "k2", object)
+    provider_gateway._cached_client("openai", "k3", object)
+
+    assert provider_gateway._cached_client("openai", "k1", object) is not oldest
+
+
+def test_cancelled_job_is_released_without_waiting_for_the_call() -> None:
+    token = CancellationToken()
+    release = threading.Event()
+    threading.Timer(0.2, token.cancel).start()
+
+    with cancellation_scope(token), pytest.raises(JobCancelled):
+        provider_gateway.run_cancellable(lambda: release.wait(30))
+    release.set()
+
+
+def test_calls_slower_than_the_poll_interval_return_their_result(monkeypatch) -> None:
+    monkeypatch.setattr(provider_gateway, "CANCEL_POLL_SECONDS", 0.05)
+
+    with cancellation_scope(CancellationToken()):
+        assert provider_gateway.run_cancellable(lambda: provider_gateway.time.sleep(0.3) or "texto") == "texto"
+
+
+def test_calls_outside_a_job_run_inline() -> None:
+    assert provider_gateway.run_cancellable(lambda: threading.current_thread().name) == threading.current_thread().name
+
+
+def test_breaker_opens_after_consecutive_failures_and_half_opens_after_cooldown(monkeypatch) -> None:
+    clock = [1000.0]
+    monkeypatch.setattr(provider_gateway.time, "monotonic", lambda: clock[0])
+    breaker = provider_gateway.ProviderBreaker("openai", failure_threshold=2, cooldown_seconds=30)
+
+    breaker.acquire()
+    breaker.record_failure()
+    assert breaker.state() == "closed"
+    breaker.acquire()
+    breaker.record_failure()
+    assert breaker.state() == "open"
+    with pytest.raises(provider_gateway.ProviderUnavailableError):
+        breaker.acquire()
+
+    clock[0] += 31
+    assert breaker.state() == "half_open"
+    breaker.acquire()
+    # So a chamada de teste passa enquanto o meio aberto nao se decide.
+    with pytest.raises(provider_gateway.ProviderUnavailableError):
+        breaker.acquire()
+    breaker.record_failure()
+    assert breaker.state() == "open"
+
+    clock[0] += 31
+    breaker.acquire()
+    breaker.record_success(1.5)
+    assert breaker.state() == "closed"
+    assert breaker.snapshot()["consecutive_failures"] == 0
+    assert breaker.latency_percentile(50) == 1.5
+
+
+def test_provider_call_records_failures_but_not_cancellations(monkeypatch) -> None:
+    monkeypatch.setattr(provider_gateway, "_breakers", {})
+    monkeypatch.setattr(
+        provider_gateway,
+        "get_settings",
+        lambda: SimpleNamespace(provider_breaker_failures=1, provider_breaker_cooldown_seconds=60),
+    )
+
+    with pytest.raises(JobCancelled), provider_gateway.provider_call("gemini"):
+        raise JobCancelled()
+    assert provider_gateway.provider_available("gemini")
+
+    with pytest.raises(RuntimeError), provider_gateway.provider_call("gemini"):
+        raise RuntimeError("503")
+    assert not provider_gateway.provider_available("gemini")
+    assert provider_gateway.provider_health()["gemini"]["state"] == "open"
+
+
+def test_rate_limiter_spaces_calls_instead_of_failing(monkeypatch) -> None:
+    clock = [0.0]
+    slept: list[float] = []
+    monkeypatch.setattr(provider_gateway.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(provider_gateway.time, "sleep", lambda seconds: (slept.append(seconds), clock.__setitem__(0, clock[0] + seconds)))
+    # 60 por minuto com rajada de 10 s: 10 chamadas passam, as seguintes saem a 1 por segundo.
+    limiter = provider_gateway.RateLimiter("openai", {"requests": 60, "tokens": 0})
+
+    for _ in range(12):
+        limiter.acquire({"requests": 1, "tokens": 500})
+
+    assert slept == [pytest.approx(1.0), pytest.approx(1.0)]
+
+    limiter.pause(5)
+    limiter.acquire({"requests": 1})
+    assert slept[-1] == pytest.approx(6.0)
+
+
+def test_cancelled_wait_returns_the_reservation(monkeypatch) -> None:
+    clock = [0.0]
+    monkeypatch.setattr(provider_gateway.time, "monotonic", lambda: clock[0])
+    limiter = provider_gateway.RateLimiter("gemini", {"audio_seconds": 60})
+    limiter.acquire({"audio_seconds": 10})
+
+    token = CancellationToken()
+    token.cancel()
+    with cancellation_scope(token), pytest.raises(JobCancelled):
+        limiter.acquire({"audio_seconds": 120})
+
+    # A reserva devolvida nao atrasa quem vem depois.
+    assert limiter._buckets["audio_seconds"].reserve(0, clock[0]) == 0
+
+
+def test_rate_limited_response_pauses_the_key_without_opening_the_circuit(monkeypatch) -> None:
+    monkeypatch.setattr(provider_gateway, "_breakers", {})
+    monkeypatch.setattr(provider_gateway, "_limiters", provider_gateway.OrderedDict())
+    monkeypatch.setattr(
+        provider_gateway,
+        "get_settings",
+        lambda: SimpleNamespace(
+            provider_breaker_failures=1,
+            provider_breaker_cooldown_seconds=60,
+            provider_requests_per_minute="openai:60",
+            provider_tokens_per_minute="",
+            provider_audio_seconds_per_minute="",
+        ),
+    )
+
+    class RateLimited(Exception):
+        status_code = 429
+
+    with pytest.raises(RateLimited), provider_gateway.provider_call("openai", "sk-a"):
+        raise RateLimited("429 Too Many Requests")
+
+    assert provider_gateway.provider_available("openai")
+    limiter = provider_gateway.get_rate_limiter("openai", "sk-a")
+    assert limiter is not provider_gateway.get_rate_limiter("openai", "sk-b")
+    assert limiter._buckets["requests"].reserve(0, provider_gateway.time.monotonic()) > 0
+
+
+def _hedge_settings(**overrides):
+    values = dict(
+        provider_breaker_failures=3,
+        provider_breaker_cooldown_seconds=60,
+        provider_hedge_percentile=95.0,
+        provider_hedge_delay_seconds=0.05,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_hedged_call_takes_the_first_answer_and_cancels_the_slow_provider(monkeypatch) -> None:
+    monkeypatch.setattr(provider_gateway, "_breakers", {})
+    monkeypatch.setattr(provider_gateway, "get_settings", _hedge_settings)
+    monkeypatch.setattr(provider_gateway, "HEDGE_MIN_DELAY_SECONDS", 0.0)
+    slow_cancelled = threading.Event()
+
+    def slow() -> str:
+        token = provider_gateway.current_token()
+        if token.wait(5):
+            slow_cancelled.set()
+        return "openai"
+
+    outcome = provider_gateway.run_hedged([("openai", slow), ("gemini", lambda: "gemini")], operation="report")
+
+    assert outcome.value == "gemini"
+    assert outcome.launched == ["openai", "gemini"]
+    assert outcome.abandoned == ["openai"]
+    assert slow_cancelled.wait(1)
+
+
+def test_hedged_call_waits_for_the_latency_percentile_before_hedging(monkeypatch) -> None:
+    monkeypatch.setattr(provider_gateway, "_breakers", {})
+    monkeypatch.setattr(provider_gateway, "get_settings", lambda: _hedge_settings(provider_hedge_delay_seconds=0.0))
+    monkeypatch.setattr(provider_gateway, "HEDGE_MIN_DELAY_SECONDS", 0.0)
+    breaker = provider_gateway.get_breaker("openai")
+    for _ in range(provider_gateway.HEDGE_MIN_SAMPLES):
+        breaker.record_success(0.5, "report")
+    hedged: list[str] = []
+
+    outcome = provider_gateway.run_hedged(
+        [("openai", lambda: (provider_gateway.time.sleep(0.1), "openai")[1]), ("gemini", lambda: hedged.append("gemini") or "gemini")],
+        operation="report",
+    )
+
+    assert outcome.provider == "openai"
+    assert outcome.launched == ["openai"] and hedged == []
+    assert provider_gateway.hedge_delay("openai", "report") == pytest.approx(0.5)
+    assert provider_gateway.hedge_delay("openai", "transcription") == 0.0
+
+
+def test_hedged_call_falls_through_failures_and_raises_the_last_error(monkeypatch) -> None:
+    monkeypatch.setattr(provider_gateway, "_breakers", {})
+    monkeypatch.setattr(provider_gateway, "get_settings", lambda: _hedge_settings(provider_hedge_delay_seconds=30))
+
+    def fail(message: str):
+        def call():
+            raise RuntimeError(message)
+
+        return call
+
+    outcome = provider_gateway.run_hedged([("openai", fail("openai down")), ("claude", lambda: "claude")], operation="report")
+    assert outcome.provider == "claude" and outcome.abandoned == []
+
+    with pytest.raises(RuntimeError, match="gemini down"):
+        provider_gateway.run_hedged([("openai", fail("openai down")), ("gemini", fail("gemini down"))], operation="report")
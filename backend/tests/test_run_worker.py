@@ -0,0 +1,31 @@
+import run_worker
+
+
+class _FakePool:
+    def __init__(self, concurrency: int, conversion_workers: int) -> None:
+        self.concurrency = concurrency
+        self.conversion_workers = conversion_workers
+        self.ran = False
+
+    def run_forever(self) -> None:
+        self.ran = True
+
+
+def test_run_worker_builds_pool_with_cli_concurrency(monkeypatch) -> None:
+    created: list[_FakePool] = []
+
+    def fake_build(concurrency, conversion_workers):
+        pool = _FakePool(concurrency or 2, conversion_workers or 4)
+        created.append(pool)
+        return pool
+
+    monkeypatch.setattr(run_worker, "build_processing_worker_pool", fake_build)
+    monkeypatch.setattr(run_worker.Base.metadata, "create_all", lambda bind: None)
+    monkeypatch.setattr(run_worker, "run_startup_migrations", lambda: None)
+    monkeypatch.setattr(run_worker, "start_whisper_warmup", lambda: None)
+
+    run_worker.main(["--concurrency", "4", "--conversion-workers", "3"])
+
+    assert created[0].concurrency == 4
+    assert created[0].conversion_workers == 3
+    assert created[0].ran is True
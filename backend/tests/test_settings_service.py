@@ -38,7 +38,7 @@ def test_update_settings_syncs_env_file_and_effective_provider_settings(tmp_path
     assert effective["openai_api_key"] == "sk-test-123456"
     assert effective["gemini_api_key"] == "gm-test-654321"
     assert effective["claude_api_key"] == "cl-test-789012"
-    assert effective["transcription_provider_order"] == ["gemini", "openai", "whisper"]
+    assert effective["transcription_provider_order"] == ["gemini", "openai", "whisper", "faster_whisper"]
     assert effective["report_provider_order"] == ["claude", "openai", "gemini", "local"]
     assert updated.openai_api_key_masked is not None
     assert updated.gemini_api_key_masked is not None
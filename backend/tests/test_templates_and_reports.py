@@ -563,3 +563,30 @@ def test_generate_report_can_prioritize_claude_and_rename(tmp_path, monkeypatch)
 
     session.close()
     engine.dispose()
+
+
+def test_report_chain_skips_providers_with_open_circuit(monkeypatch) -> None:
+    called: list[str] = []
+
+    def fake_generator(name: str, engine: TranscriptionEngine):
+        def generate(prompt: str, api_key: str):
+            called.append(name)
+            return f"# Relatorio via {name}", engine
+
+        return generate
+
+    monkeypatch.setattr(report_service, "_generate_claude", fake_generator("claude", TranscriptionEngine.CLAUDE))
+    monkeypatch.setattr(report_service, "_generate_openai", fake_generator("openai", TranscriptionEngine.OPENAI))
+    monkeypatch.setattr(report_service, "provider_available", lambda provider: provider != "claude")
+
+    result = report_service._generate_with_providers(
+        {
+            "openai_api_key": "sk-test",
+            "claude_api_key": "cl-test",
+            "report_provider_order": ["claude", "openai", "gemini", "local"],
+        },
+        "Gere o relatorio.",
+    )
+
+    assert result == ("# Relatorio via openai", TranscriptionEngine.OPENAI)
+    assert called == ["openai"]
@@ -0,0 +1,52 @@
+from app.models.enums import FileType, ProcessingStatus, TranscriptionEngine
+from app.models.upload import Upload
+from app.schemas.upload import ProcessRequest
+from app.services import processing_queue_service, transcript_stream
+from app.services.transcript_stream import DatabaseTranscriptSink, read_partial_transcript, transcript_scope
+from tests.conftest import create_test_session
+
+
+def _create_upload(session, tmp_path) -> Upload:
+    upload = Upload(
+        original_filename="aula.mp3",
+        stored_filename="aula.mp3",
+        file_type=FileType.AUDIO,
+        mime_type="audio/mpeg",
+        original_path=str(tmp_path / "aula.mp3"),
+        upload_size_bytes=3,
+        transcription_engine=TranscriptionEngine.NONE,
+        status=ProcessingStatus.TRANSCRIBING,
+    )
+    session.add(upload)
+    session.commit()
+    session.refresh(upload)
+    return upload
+
+
+def test_segments_are_persisted_as_decoded_with_original_timestamps(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    upload = _create_upload(session, tmp_path)
+    job = processing_queue_service.enqueue_processing_job(session, upload, ProcessRequest())
+    monkeypatch.setattr(transcript_stream, "SessionLocal", lambda: session)
+    monkeypatch.setattr(session, "close", lambda: None)
+
+    sink = DatabaseTranscriptSink(upload.id, job.id, timestamp_map=[(0.0, 0.0, 30.0), (30.0, 90.0, 60.0)])
+    with transcript_scope(sink):
+        transcript_stream.emit_transcript_segments([{"start": 0.0, "end": 4.0, "text": "tentativa que falhou"}], 0.1)
+        transcript_stream.restart_transcript_stream()
+        transcript_stream.emit_transcript_segments([{"start": 0.0, "end": 4.0, "text": "Bom dia."}], 0.05)
+        transcript_stream.emit_transcript_segments([{"start": 32.0, "end": 35.0, "text": "Primeiro ponto."}], 0.4)
+
+    session.expire_all()
+    partial_text, progress = read_partial_transcript(session, upload.id)
+    assert partial_text == "Bom dia. Primeiro ponto."
+    assert progress == 0.4
+    segments = transcript_stream.TranscriptSegmentRepository(session).list_for_upload(upload.id)
+    assert [(segment.position, segment.start_seconds) for segment in segments] == [(0, 0.0), (1, 92.0)]
+
+    engine.dispose()
+
+
+def test_emit_without_sink_is_a_no_op() -> None:
+    transcript_stream.emit_transcript_segments([{"start": 0.0, "end": 1.0, "text": "sem destino"}], 1.0)
+    assert transcript_stream.streaming_enabled() is False
@@ -17,7 +17,7 @@ def test_transcription_falls_back_to_gemini(tmp_path, monkeypatch) -> None:
         "get_effective_provider_settings",
         lambda db: {"openai_api_key": "sk-test", "gemini_api_key": "gm-test", "whisper_model": "medium"},
     )
-    monkeypatch.setattr(transcription_service, "get_settings", lambda: SimpleNamespace(provider_retries=0, whisper_model="medium"))
+    monkeypatch.setattr(transcription_service, "get_settings", lambda: SimpleNamespace(provider_retries=0, provider_hedging=False, whisper_model="medium"))
     monkeypatch.setattr(transcription_service, "_transcribe_openai", lambda *args, **kwargs: (_ for _ in ()).throw(RuntimeError("openai down")))
     monkeypatch.setattr(
         transcription_service,
@@ -53,14 +53,14 @@ def test_transcription_can_force_whisper_and_override_model(tmp_path, monkeypatc
             "transcription_provider_order": ["openai", "gemini", "whisper"],
         },
     )
-    monkeypatch.setattr(transcription_service, "get_settings", lambda: SimpleNamespace(provider_retries=0, whisper_model="medium"))
+    monkeypatch.setattr(transcription_service, "get_settings", lambda: SimpleNamespace(provider_retries=0, provider_hedging=False, whisper_model="medium"))
 
     called: dict[str, str] = {}
 
     monkeypatch.setattr(
         transcription_service,
         "_transcribe_whisper",
-        lambda audio_path, language, model_name: (
+        lambda audio_path, language, model_name, silences=None: (
             called.setdefault("model", model_name),
             TranscriptionResult(
                 text="texto via whisper",
@@ -101,7 +101,7 @@ def test_transcription_preference_runs_selected_provider_first(tmp_path, monkeyp
             "transcription_provider_order": ["gemini", "openai", "whisper"],
         },
     )
-    monkeypatch.setattr(transcription_service, "get_settings", lambda: SimpleNamespace(provider_retries=0, whisper_model="medium"))
+    monkeypatch.setattr(transcription_service, "get_settings", lambda: SimpleNamespace(provider_retries=0, provider_hedging=False, whisper_model="medium"))
 
     called: list[str] = []
 
@@ -161,7 +161,7 @@ def test_transcription_preference_without_configured_api_key_uses_next_provider_
             "transcription_provider_order": ["openai", "whisper", "gemini"],
         },
     )
-    monkeypatch.setattr(transcription_service, "get_settings", lambda: SimpleNamespace(provider_retries=0, whisper_model="medium"))
+    monkeypatch.setattr(transcription_service, "get_settings", lambda: SimpleNamespace(provider_retries=0, provider_hedging=False, whisper_model="medium"))
 
     called: list[str] = []
 
@@ -204,3 +204,229 @@ def test_transcription_preference_without_configured_api_key_uses_next_provider_
 
     session.close()
     engine.dispose()
+
+
+def test_local_mode_uses_faster_whisper_when_ordered_first(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    audio_path = tmp_path / "audio.mp3"
+    audio_path.write_bytes(b"fake")
+
+    monkeypatch.setattr(
+        transcription_service,
+        "get_effective_provider_settings",
+        lambda db: {
+            "openai_api_key": "sk-test",
+            "whisper_model": "medium",
+            "transcription_provider_order": ["faster_whisper", "openai", "gemini", "whisper"],
+        },
+    )
+    monkeypatch.setattr(transcription_service, "get_settings", lambda: SimpleNamespace(provider_retries=0, provider_hedging=False, whisper_model="medium"))
+
+    called: list[str] = []
+
+    monkeypatch.setattr(
+        transcription_service,
+        "_transcribe_faster_whisper",
+        lambda audio_path, language, model_name: (
+            called.append(f"faster_whisper:{model_name}"),
+            TranscriptionResult(
+                text="texto via faster-whisper",
+                engine=TranscriptionEngine.WHISPER,
+                language_detected="pt",
+                metadata={"model": model_name, "backend": "faster-whisper", "compute_type": "int8"},
+            ),
+        )[1],
+    )
+
+    result = transcription_service.transcribe_audio(session, audio_path, "pt-BR", use_api=False)
+
+    assert result.metadata["backend"] == "faster-whisper"
+    assert called == ["faster_whisper:medium"]
+
+    session.close()
+    engine.dispose()
+
+
+def test_faster_whisper_failure_falls_back_to_whisper(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    audio_path = tmp_path / "audio.mp3"
+    audio_path.write_bytes(b"fake")
+
+    monkeypatch.setattr(
+        transcription_service,
+        "get_effective_provider_settings",
+        lambda db: {"whisper_model": "small", "transcription_provider_order": ["openai", "gemini", "whisper", "faster_whisper"]},
+    )
+    monkeypatch.setattr(transcription_service, "get_settings", lambda: SimpleNamespace(provider_retries=2, provider_hedging=False, whisper_model="medium"))
+
+    def missing_engine(*args, **kwargs):
+        raise ModuleNotFoundError("No module named 'faster_whisper'", name="faster_whisper")
+
+    monkeypatch.setattr(transcription_service, "_transcribe_faster_whisper", missing_engine)
+    monkeypatch.setattr(
+        transcription_service,
+        "_transcribe_whisper",
+        lambda audio_path, language, model_name, silences=None: TranscriptionResult(
+            text="texto via whisper",
+            engine=TranscriptionEngine.WHISPER,
+            language_detected="pt",
+            metadata={"model": model_name},
+        ),
+    )
+
+    result = transcription_service.transcribe_audio(
+        session,
+        audio_path,
+        "pt-BR",
+        transcription_provider_preference="faster_whisper",
+    )
+
+    assert result.text == "texto via whisper"
+    assert "backend" not in result.metadata
+
+    session.close()
+    engine.dispose()
+
+
+def test_faster_whisper_is_opt_in_and_saved_orders_are_kept() -> None:
+    assert transcription_service._transcription_provider_order({}, use_api=False) == ["whisper"]
+    assert transcription_service._transcription_provider_order(
+        {"transcription_provider_order": ["faster_whisper", "openai", "whisper"]}, use_api=False
+    ) == ["faster_whisper", "whisper"]
+
+
+def test_audio_profile_follows_the_keyed_providers_in_the_chain(monkeypatch) -> None:
+    monkeypatch.setattr(transcription_service, "get_settings", lambda: SimpleNamespace(transcription_audio_profile="auto"))
+    config = {"transcription_provider_order": ["openai", "gemini", "whisper", "faster_whisper"]}
+    profile = transcription_service.transcription_audio_profile
+
+    assert profile(config, use_api=True) == "pcm_wav"
+    assert profile({**config, "openai_api_key": "sk"}, use_api=True) == "speech_opus"
+    assert profile({**config, "openai_api_key": "sk", "gemini_api_key": "gm"}, use_api=True) == "speech_mp3"
+    assert profile({**config, "gemini_api_key": "gm"}, use_api=False) == "pcm_wav"
+    assert profile({**config, "openai_api_key": "sk"}, True, "faster_whisper") == "pcm_wav"
+
+    monkeypatch.setattr(transcription_service, "get_settings", lambda: SimpleNamespace(transcription_audio_profile="speech_mp3"))
+    assert profile({**config, "openai_api_key": "sk"}, use_api=True) == "speech_mp3"
+
+
+def test_long_audio_is_sent_to_the_api_in_chunks_and_merged_in_order(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    audio_path = tmp_path / "audio.mp3"
+    audio_path.write_bytes(b"fake")
+    sent: list[Path] = []
+
+    monkeypatch.setattr(transcription_service, "get_effective_provider_settings", lambda db: {"openai_api_key": "sk-test"})
+    monkeypatch.setattr(transcription_service, "get_settings", lambda: SimpleNamespace(provider_retries=0, provider_hedging=False, whisper_model="medium"))
+    monkeypatch.setattr(transcription_service, "plan_api_chunks", lambda path: [(0.0, 602.0), (598.0, 300.0)])
+    monkeypatch.setattr(
+        transcription_service,
+        "transcribe_chunks",
+        lambda provider, path, windows, transcribe: [transcribe(tmp_path / f"chunk-{index}.ogg") for index in range(len(windows))],
+    )
+    chunk_texts = {"chunk-0": "Bom dia, vamos comecar", "chunk-1": "vamos comecar a pauta."}
+
+    def fake_openai(path, language, api_key):
+        sent.append(path)
+        return TranscriptionResult(text=chunk_texts[path.stem], engine=TranscriptionEngine.OPENAI, language_detected="pt", metadata={"model": "m"})
+
+    monkeypatch.setattr(transcription_service, "_transcribe_openai", fake_openai)
+
+    result = transcription_service.transcribe_audio(session, audio_path, "pt-BR")
+
+    assert result.text == "Bom dia, vamos comecar a pauta."
+    assert result.metadata == {"model": "m", "chunks": 2}
+    assert [path.name for path in sent] == ["chunk-0.ogg", "chunk-1.ogg"]
+
+    session.close()
+    engine.dispose()
+
+
+def test_open_circuit_skips_the_provider_without_retrying(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    audio_path = tmp_path / "audio.mp3"
+    audio_path.write_bytes(b"fake")
+    attempts: list[str] = []
+
+    monkeypatch.setattr(transcription_service, "get_effective_provider_settings", lambda db: {"openai_api_key": "sk", "gemini_api_key": "gm"})
+    monkeypatch.setattr(transcription_service, "get_settings", lambda: SimpleNamespace(provider_retries=2, provider_hedging=False, whisper_model="medium"))
+    monkeypatch.setattr(transcription_service, "plan_api_chunks", lambda path: [])
+
+    def open_circuit(*args):
+        attempts.append("openai")
+        raise transcription_service.ProviderUnavailableError("openai indisponivel (circuito aberto)")
+
+    monkeypatch.setattr(transcription_service, "_transcribe_openai", open_circuit)
+    monkeypatch.setattr(
+        transcription_service,
+        "_transcribe_gemini",
+        lambda *args: TranscriptionResult(text="texto via gemini", engine=TranscriptionEngine.GEMINI, language_detected="pt", metadata={}),
+    )
+
+    result = transcription_service.transcribe_audio(session, audio_path, "pt-BR")
+
+    assert result.engine == TranscriptionEngine.GEMINI
+    assert attempts == ["openai"]
+
+    session.close()
+    engine.dispose()
+
+
+def test_open_circuit_is_checked_before_planning_chunks(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    audio_path = tmp_path / "audio.mp3"
+    audio_path.write_bytes(b"fake")
+    planned: list[str] = []
+    called: list[str] = []
+
+    monkeypatch.setattr(transcription_service, "get_effective_provider_settings", lambda db: {"openai_api_key": "sk", "gemini_api_key": "gm"})
+    monkeypatch.setattr(transcription_service, "get_settings", lambda: SimpleNamespace(provider_retries=2, provider_hedging=False, whisper_model="medium"))
+    monkeypatch.setattr(transcription_service, "provider_available", lambda provider: provider != "openai")
+    monkeypatch.setattr(transcription_service, "plan_api_chunks", lambda path: planned.append(str(path)) or [])
+    monkeypatch.setattr(transcription_service, "_transcribe_openai", lambda *args: called.append("openai"))
+    monkeypatch.setattr(
+        transcription_service,
+        "_transcribe_gemini",
+        lambda *args: TranscriptionResult(text="texto via gemini", engine=TranscriptionEngine.GEMINI, language_detected="pt", metadata={}),
+    )
+
+    result = transcription_service.transcribe_audio(session, audio_path, "pt-BR")
+
+    assert result.engine == TranscriptionEngine.GEMINI
+    assert called == []
+    assert planned == [str(audio_path)]
+
+    session.close()
+    engine.dispose()
+
+
+def test_hedging_runs_keyed_apis_together_and_reports_the_extra_call(tmp_path, monkeypatch) -> None:
+    session, engine = create_test_session(tmp_path)
+    audio_path = tmp_path / "audio.mp3"
+    audio_path.write_bytes(b"fake")
+    hedged: list[list[str]] = []
+
+    monkeypatch.setattr(
+        transcription_service,
+        "get_effective_provider_settings",
+        lambda db: {"openai_api_key": "sk", "gemini_api_key": "gm", "transcription_provider_order": ["openai", "gemini", "whisper"]},
+    )
+    monkeypatch.setattr(transcription_service, "get_settings", lambda: SimpleNamespace(provider_retries=0, provider_hedging=True, whisper_model="medium"))
+    monkeypatch.setattr(transcription_service, "_audio_seconds", lambda path: 60.0)
+
+    def fake_run_hedged(attempts, operation, scale):
+        hedged.append([provider for provider, _ in attempts])
+        assert operation == "transcription" and scale == 60.0
+        result = TranscriptionResult(text="texto via gemini", engine=TranscriptionEngine.GEMINI, language_detected="pt", metadata={})
+        return SimpleNamespace(value=result, provider="gemini", launched=["openai", "gemini"], abandoned=["openai"])
+
+    monkeypatch.setattr(transcription_service, "run_hedged", fake_run_hedged)
+
+    result = transcription_service.transcribe_audio(session, audio_path, "pt-BR")
+
+    assert hedged == [["openai", "gemini"]]
+    assert result.engine == TranscriptionEngine.GEMINI
+    assert result.metadata["hedge"] == {"launched": ["openai", "gemini"], "abandoned": ["openai"]}
+
+    session.close()
+    engine.dispose()
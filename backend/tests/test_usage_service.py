@@ -90,3 +90,28 @@ def test_desktop_mode_records_usage_without_blocking(session, monkeypatch: pytes
     usage_service.consume_credits(session, "local-workspace", "transcription", 30)
 
     assert usage_service.current_month_credits(session, "local-workspace") == 55
+
+
+def test_batch_charge_is_all_or_nothing_and_idempotent(session, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(usage_service, "get_settings", _web_settings)
+    charges = [(f"process:upload-{index}:start", 1, {"upload_id": f"upload-{index}"}) for index in range(3)]
+
+    with pytest.raises(usage_service.HTTPException) as exc_info:
+        usage_service.consume_credits_batch(session, "web-workspace", "media_processing_start", charges, reserve=[("process:upload-0:duration", 18)])
+    assert exc_info.value.status_code == 402
+    assert usage_service.current_month_credits(session, "web-workspace") == 0
+
+    assert usage_service.consume_credits_batch(session, "web-workspace", "media_processing_start", charges) == 3
+    assert usage_service.consume_credits_batch(session, "web-workspace", "media_processing_start", charges) == 0
+    assert usage_service.current_month_credits(session, "web-workspace") == 3
+
+
+def test_batch_charge_without_commit_leaves_the_transaction_to_the_caller(session, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(usage_service, "get_settings", _web_settings)
+    charges = [("process:upload-0:start", 1, None)]
+
+    assert usage_service.consume_credits_batch(session, "new-workspace", "media_processing_start", charges, commit=False) == 1
+    session.rollback()
+
+    assert session.get(Workspace, "new-workspace") is None
+    assert usage_service.current_month_credits(session, "new-workspace") == 0
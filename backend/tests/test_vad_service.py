@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+from app.services import vad_service
+from app.services.vad_service import build_timestamp_map, remap_segments, speech_cut_silences, speech_intervals, to_original_time
+
+
+def test_only_long_silences_are_removed_with_padding() -> None:
+    silences = [(10.0, 10.8), (30.0, 90.0), (200.0, 240.0)]
+
+    intervals = speech_intervals(240.0, silences, min_silence_seconds=2.0, padding=0.5)
+
+    assert intervals == [(0.0, 30.5), (89.5, 200.5)]
+
+
+def test_timestamps_are_mapped_back_to_the_original_media() -> None:
+    timestamp_map = build_timestamp_map([(0.0, 30.5), (89.5, 200.5)])
+
+    assert timestamp_map == [(0.0, 0.0, 30.5), (30.5, 89.5, 111.0)]
+    assert to_original_time(timestamp_map, 12.0) == 12.0
+    assert to_original_time(timestamp_map, 40.5) == 99.5
+    assert remap_segments([{"start": 29.0, "end": 32.0, "text": "emenda"}], timestamp_map) == [
+        {"start": 29.0, "end": 91.0, "text": "emenda"}
+    ]
+
+
+def test_speech_audio_is_skipped_when_savings_are_small(monkeypatch) -> None:
+    monkeypatch.setattr(
+        vad_service,
+        "get_settings",
+        lambda: SimpleNamespace(vad_enabled=True, vad_noise_db=-35.0, vad_min_silence_seconds=2.0),
+    )
+    monkeypatch.setattr(vad_service, "detect_silences", lambda *args: [(100.0, 103.0)])
+    monkeypatch.setattr(vad_service, "extract_audio_segments", lambda *args: (_ for _ in ()).throw(AssertionError("nao deveria recodificar")))
+
+    speech = vad_service.prepare_speech_audio("audio.mp3", 600.0)
+
+    assert speech.path is None
+    assert speech.silences == [(100.0, 103.0)]
+
+
+def test_speech_audio_joins_become_cut_points() -> None:
+    timestamp_map = build_timestamp_map([(0.0, 30.5), (89.5, 200.5), (260.0, 300.0)])
+
+    assert speech_cut_silences(timestamp_map) == [(30.2, 30.8), (141.2, 141.8)]
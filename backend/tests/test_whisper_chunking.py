@@ -0,0 +1,131 @@
+from types import SimpleNamespace
+
+from app.services import whisper_chunking, whisper_inference_pool
+from app.services.whisper_chunking import dedupe_boundary_words, plan_chunks, stitch_segments
+
+
+def test_chunks_are_cut_at_the_silence_closest_to_the_target() -> None:
+    silences = [(280.0, 282.0), (590.0, 596.0), (650.0, 651.0), (1190.0, 1192.0)]
+
+    chunks = plan_chunks(1800.0, silences, 600)
+
+    assert [(chunk.start, chunk.end) for chunk in chunks] == [(0.0, 593.0), (593.0, 1191.0), (1191.0, 1800.0)]
+
+
+def test_chunks_fall_back_to_hard_cuts_without_silence() -> None:
+    chunks = plan_chunks(1500.0, [], 600)
+
+    assert [(chunk.start, chunk.end) for chunk in chunks] == [(0.0, 600.0), (600.0, 1500.0)]
+
+
+def test_boundary_words_repeated_by_the_overlap_are_removed() -> None:
+    assert dedupe_boundary_words("e a reuniao comecou agora.", "Comecou agora, vamos ao primeiro ponto") == "vamos ao primeiro ponto"
+    assert dedupe_boundary_words("fim do trecho", "novo assunto") == "novo assunto"
+
+
+def test_stitch_drops_segments_decoded_twice_in_the_overlap() -> None:
+    first = [
+        {"start": 0.0, "end": 300.0, "text": " Bom dia a todos."},
+        {"start": 300.0, "end": 593.5, "text": " Vamos comecar a pauta"},
+    ]
+    second = [
+        {"start": 592.0, "end": 593.2, "text": " a pauta"},
+        {"start": 593.2, "end": 610.0, "text": " comecar a pauta de hoje com o orcamento."},
+    ]
+
+    stitched = stitch_segments([first, second])
+
+    assert [segment["text"] for segment in stitched] == ["Bom dia a todos.", "Vamos comecar a pauta", "de hoje com o orcamento."]
+    assert stitched[-1]["start"] == 593.5
+
+
+def test_only_long_cpu_audio_is_chunked(monkeypatch) -> None:
+    settings = SimpleNamespace(whisper_chunk_seconds=600, whisper_parallel_workers=4, whisper_inference_pool=True)
+    monkeypatch.setattr(whisper_chunking, "get_settings", lambda: settings)
+    monkeypatch.setattr(whisper_inference_pool, "get_settings", lambda: settings)
+
+    assert whisper_chunking.should_chunk(3600.0, "cpu") is True
+    assert whisper_chunking.should_chunk(800.0, "cpu") is False
+    assert whisper_chunking.should_chunk(3600.0, "cuda") is False
+    assert whisper_chunking.should_chunk(None, "cpu") is False
+
+
+def test_chunked_transcription_waits_for_chunks_slower_than_the_poll_interval(tmp_path, monkeypatch) -> None:
+    import threading
+    from concurrent.futures import Future
+
+    from app.core.cancellation import CancellationToken, cancellation_scope
+
+    monkeypatch.setattr(whisper_chunking, "get_settings", lambda: SimpleNamespace(whisper_chunk_seconds=600))
+    monkeypatch.setattr(whisper_chunking, "detect_silences", lambda path, duration: [])
+    monkeypatch.setattr(whisper_chunking, "inference_workers", lambda: 2)
+    monkeypatch.setattr(whisper_chunking, "emit_transcript_segments", lambda segments, progress: None)
+    monkeypatch.setattr(whisper_inference_pool, "RESULT_POLL_SECONDS", 0.05)
+
+    def submit(func, audio_path, start, end, language, model_name, stream):
+        future: Future = Future()
+        result = {"language": "pt", "segments": [{"start": start, "end": end, "text": f"trecho {int(start)}"}]}
+        threading.Timer(0.2, future.set_result, args=(result,)).start()
+        return future
+
+    monkeypatch.setattr(whisper_chunking, "submit_inference", submit)
+
+    with cancellation_scope(CancellationToken()):
+        result = whisper_chunking.transcribe_chunked(tmp_path / "audio.wav", "pt", "medium", 1500.0)
+
+    assert result["chunks"] == 2
+    assert result["text"] == "trecho 0 trecho 599"
+
+
+def test_language_is_detected_once_and_passed_to_every_chunk(tmp_path, monkeypatch) -> None:
+    from concurrent.futures import Future
+
+    from app.core.cancellation import CancellationToken, cancellation_scope
+
+    monkeypatch.setattr(whisper_chunking, "get_settings", lambda: SimpleNamespace(whisper_chunk_seconds=600))
+    monkeypatch.setattr(whisper_chunking, "detect_silences", lambda path, duration: [])
+    monkeypatch.setattr(whisper_chunking, "inference_workers", lambda: 2)
+    monkeypatch.setattr(whisper_chunking, "emit_transcript_segments", lambda segments, progress: None)
+    submitted: list[tuple[str, tuple]] = []
+
+    def submit(func, *args, stream):
+        submitted.append((func.__name__, args))
+        future: Future = Future()
+        if func is whisper_chunking.detect_chunk_language:
+            future.set_result("pt")
+        else:
+            _path, start, end, language, _model = args
+            future.set_result({"language": language, "segments": [{"start": start, "end": end, "text": f"trecho {int(start)}"}]})
+        return future
+
+    monkeypatch.setattr(whisper_chunking, "submit_inference", submit)
+
+    with cancellation_scope(CancellationToken()):
+        result = whisper_chunking.transcribe_chunked(tmp_path / "audio.wav", None, "medium", 1500.0)
+
+    assert [name for name, _ in submitted] == ["detect_chunk_language", "transcribe_chunk", "transcribe_chunk"]
+    assert [args[3] for name, args in submitted if name == "transcribe_chunk"] == ["pt", "pt"]
+    assert result["language"] == "pt"
+
+
+def test_chunks_reuse_the_silences_found_by_the_vad_pass(tmp_path, monkeypatch) -> None:
+    from concurrent.futures import Future
+
+    from app.core.cancellation import CancellationToken, cancellation_scope
+
+    monkeypatch.setattr(whisper_chunking, "get_settings", lambda: SimpleNamespace(whisper_chunk_seconds=600))
+    monkeypatch.setattr(whisper_chunking, "detect_silences", lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError("decodificou de novo")))
+    monkeypatch.setattr(whisper_chunking, "inference_workers", lambda: 2)
+    monkeypatch.setattr(whisper_chunking, "emit_transcript_segments", lambda segments, progress: None)
+
+    def submit(func, audio_path, start, end, language, model_name, stream):
+        future: Future = Future()
+        future.set_result({"language": language, "segments": [{"start": start, "end": end, "text": f"trecho {int(start)}"}]})
+        return future
+
+    monkeypatch.setattr(whisper_chunking, "submit_inference", submit)
+
+    with cancellation_scope(CancellationToken()):
+        result = whisper_chunking.transcribe_chunked(tmp_path / "audio.wav", "pt", "medium", 1500.0, [(640.0, 642.0)])
+
+    assert result["text"] == "trecho 0 trecho 640"
@@ -0,0 +1,176 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.cancellation import JobCancelled, current_token
+from app.services import whisper_inference_pool
+from app.services.transcript_stream import DatabaseTranscriptSink, TranscriptSink, current_sink, transcript_scope
+
+
+def _settings(**overrides):
+    values = {
+        "whisper_parallel_workers": 0,
+        "whisper_threads_per_worker": 0,
+        "whisper_inference_pool": True,
+        "whisper_model_cache_mb": 0,
+        "whisper_model": "medium",
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_cores_are_partitioned_between_pool_processes(monkeypatch) -> None:
+    monkeypatch.setattr(whisper_inference_pool.os, "cpu_count", lambda: 16)
+    monkeypatch.setattr(whisper_inference_pool, "get_settings", lambda: _settings())
+
+    workers = whisper_inference_pool.inference_workers()
+
+    assert workers == 8
+    assert whisper_inference_pool.threads_per_worker(workers) == 2
+
+    monkeypatch.setattr(whisper_inference_pool, "get_settings", lambda: _settings(whisper_parallel_workers=3, whisper_threads_per_worker=4))
+    assert whisper_inference_pool.inference_workers() == 3
+    assert whisper_inference_pool.threads_per_worker(3) == 4
+
+
+def test_default_worker_count_fits_one_model_copy_per_process_in_the_cache_budget(monkeypatch) -> None:
+    monkeypatch.setattr(whisper_inference_pool.os, "cpu_count", lambda: 16)
+    monkeypatch.setattr(whisper_inference_pool, "get_settings", lambda: _settings(whisper_model_cache_mb=8192))
+
+    workers = whisper_inference_pool.inference_workers()
+
+    assert workers == 2
+    assert whisper_inference_pool.worker_cache_budget_mb(workers) == 4096
+
+    monkeypatch.setattr(whisper_inference_pool, "get_settings", lambda: _settings(whisper_model_cache_mb=8192, whisper_model="tiny"))
+    assert whisper_inference_pool.inference_workers() == 8
+    assert whisper_inference_pool.worker_cache_budget_mb(8) == 1024
+
+
+def test_warmup_repeats_until_every_process_has_loaded_the_model(monkeypatch) -> None:
+    pids = iter([101, 101, 102])
+
+    class _Pool:
+        def submit(self, func, *args):
+            future = whisper_inference_pool.Future()
+            future.set_result(next(pids))
+            return future
+
+    monkeypatch.setattr(whisper_inference_pool, "get_inference_pool", lambda: _Pool())
+    monkeypatch.setattr(whisper_inference_pool, "get_settings", lambda: _settings(whisper_parallel_workers=2))
+
+    assert whisper_inference_pool.warm_inference_pool(len, "abc") == 2
+
+
+def test_pool_is_cpu_only_and_can_be_disabled(monkeypatch) -> None:
+    monkeypatch.setattr(whisper_inference_pool, "get_settings", lambda: _settings())
+    assert whisper_inference_pool.inference_pool_enabled("cpu") is True
+    assert whisper_inference_pool.inference_pool_enabled("cuda") is False
+
+    monkeypatch.setattr(whisper_inference_pool, "get_settings", lambda: _settings(whisper_inference_pool=False))
+    assert whisper_inference_pool.inference_pool_enabled("cpu") is False
+
+
+def test_task_runs_with_the_job_sink_and_its_own_cancellation_token() -> None:
+    sink = DatabaseTranscriptSink("upload-1", "job-1")
+
+    def task(value):
+        return value, current_sink(), current_token()
+
+    value, seen_sink, token = whisper_inference_pool._run_task(task, (42,), sink, None)
+
+    assert value == 42
+    assert seen_sink is sink
+    assert token is not None and not token.cancelled
+
+
+class _FakePool:
+    def __init__(self) -> None:
+        self.calls = []
+
+    def submit(self, func, *args):
+        self.calls.append(args)
+        future = whisper_inference_pool.Future()
+        future.set_result(func(*args))
+        return future
+
+
+def test_only_database_sinks_cross_into_the_pool(monkeypatch) -> None:
+    pool = _FakePool()
+    monkeypatch.setattr(whisper_inference_pool, "get_inference_pool", lambda: pool)
+
+    with transcript_scope(DatabaseTranscriptSink("upload-1", "job-1")):
+        whisper_inference_pool.run_inference(len, "abc")
+        whisper_inference_pool.submit_inference(len, "abc", stream=False)
+    with transcript_scope(TranscriptSink()):
+        whisper_inference_pool.run_inference(len, "abc")
+
+    (func_1, args_1, sink_1, job_1), (_, _, sink_2, job_2), (_, _, sink_3, job_3) = pool.calls
+    assert (func_1, args_1) == (len, ("abc",))
+    assert isinstance(sink_1, DatabaseTranscriptSink) and job_1 == "job-1"
+    assert sink_2 is None and job_2 == "job-1"
+    assert sink_3 is None and job_3 is None
+
+
+def test_waiting_for_results_stops_when_the_job_is_cancelled() -> None:
+    from app.core.cancellation import CancellationToken, cancellation_scope
+
+    token = CancellationToken()
+    pending = whisper_inference_pool.Future()
+    token.cancel()
+
+    with cancellation_scope(token), pytest.raises(JobCancelled):
+        next(whisper_inference_pool.iter_inference_results([pending]))
+    assert pending.cancelled()
+
+
+def test_waiting_survives_results_slower_than_the_poll_interval(monkeypatch) -> None:
+    import threading
+
+    from app.core.cancellation import CancellationToken, cancellation_scope
+
+    monkeypatch.setattr(whisper_inference_pool, "RESULT_POLL_SECONDS", 0.05)
+    slow = whisper_inference_pool.Future()
+    threading.Timer(0.3, slow.set_result, args=("texto",)).start()
+
+    with cancellation_scope(CancellationToken()):
+        assert list(whisper_inference_pool.iter_inference_results([slow])) == ["texto"]
+
+
+class _BrokenPool:
+    _broken = "um processo do pool morreu"
+
+    def __init__(self) -> None:
+        self.shutdowns = 0
+
+    def submit(self, func, *args):
+        raise whisper_inference_pool.BrokenProcessPool(self._broken)
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shutdowns += 1
+
+
+def test_broken_pool_is_rebuilt_on_the_next_submit(monkeypatch) -> None:
+    broken = _BrokenPool()
+    rebuilt = _FakePool()
+    monkeypatch.setattr(whisper_inference_pool, "get_settings", lambda: _settings(whisper_parallel_workers=2))
+    monkeypatch.setattr(whisper_inference_pool, "ProcessPoolExecutor", lambda **kwargs: rebuilt)
+    monkeypatch.setattr(whisper_inference_pool, "_pool", broken)
+
+    assert whisper_inference_pool.run_inference(len, "abc") == 3
+    assert broken.shutdowns == 1
+    assert whisper_inference_pool._pool is rebuilt
+    monkeypatch.setattr(whisper_inference_pool, "_pool", None)
+
+
+def test_worker_death_while_waiting_discards_the_pool(monkeypatch) -> None:
+    broken = _BrokenPool()
+    monkeypatch.setattr(whisper_inference_pool, "_pool", broken)
+    dead = whisper_inference_pool.Future()
+    dead.set_exception(whisper_inference_pool.BrokenProcessPool(broken._broken))
+
+    with pytest.raises(whisper_inference_pool.BrokenProcessPool):
+        list(whisper_inference_pool.iter_inference_results([dead]))
+
+    assert whisper_inference_pool._pool is None
+    assert broken.shutdowns == 1
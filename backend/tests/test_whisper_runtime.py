@@ -0,0 +1,189 @@
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import whisper_runtime
+from app.services.whisper_runtime import WhisperModelRegistry
+
+
+def test_concurrent_jobs_share_a_single_model_load() -> None:
+    registry = WhisperModelRegistry(budget_mb=0)
+    loads: list[str] = []
+    models: list[object] = []
+
+    def loader():
+        loads.append("medium")
+        time.sleep(0.1)
+        return object()
+
+    def job() -> None:
+        with registry.acquire(("whisper", "medium", "cpu"), loader, 3000) as model:
+            models.append(model)
+
+    threads = [threading.Thread(target=job) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loads == ["medium"]
+    assert len({id(model) for model in models}) == 1
+
+
+def test_least_recently_used_idle_model_is_evicted_over_budget() -> None:
+    registry = WhisperModelRegistry(budget_mb=4000)
+
+    with registry.acquire("small", object, 1000):
+        pass
+    with registry.acquire("medium", object, 3000):
+        pass
+    with registry.acquire("small", object, 1000):
+        pass
+    with registry.acquire("base", object, 300):
+        pass
+
+    assert registry.loaded_keys() == ["small", "base"]
+
+
+def test_model_in_use_is_never_evicted() -> None:
+    registry = WhisperModelRegistry(budget_mb=3500)
+
+    with registry.acquire("medium", object, 3000):
+        with registry.acquire("small", object, 1000):
+            assert set(registry.loaded_keys()) == {"medium", "small"}
+        assert registry.loaded_keys() == ["medium"]
+
+    assert registry.loaded_keys() == ["medium"]
+
+
+def test_failed_load_is_reported_and_retried_on_next_job() -> None:
+    registry = WhisperModelRegistry(budget_mb=0)
+    attempts: list[int] = []
+
+    def flaky_loader():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("download interrompido")
+        return "modelo"
+
+    with pytest.raises(RuntimeError):
+        with registry.acquire("medium", flaky_loader):
+            pass
+    with registry.acquire("medium", flaky_loader) as model:
+        assert model == "modelo"
+    assert len(attempts) == 2
+
+
+def test_warmup_loads_configured_model_in_background_and_reports_ready(monkeypatch) -> None:
+    decoded: list[int] = []
+
+    class FakeModel:
+        def transcribe(self, audio, **kwargs):
+            decoded.append(len(audio))
+            return {"text": ""}
+
+    @contextmanager
+    def fake_acquire(model_name):
+        assert model_name == "small"
+        yield FakeModel(), "cpu"
+
+    monkeypatch.setattr(whisper_runtime, "get_settings", lambda: SimpleNamespace(whisper_warmup=True, whisper_model="medium"))
+    monkeypatch.setattr(whisper_runtime, "_configured_warmup_target", lambda: ("whisper", "small"))
+    monkeypatch.setattr(whisper_runtime, "acquire_whisper_model", fake_acquire)
+    monkeypatch.setattr(whisper_runtime, "_warmup_state", {"status": "disabled"})
+    monkeypatch.setattr(whisper_runtime, "whisper_device", lambda: "cuda")
+
+    thread = whisper_runtime.start_whisper_warmup()
+    assert thread is not None
+    thread.join(5)
+
+    assert decoded == [16000]
+    status = whisper_runtime.warmup_status()
+    assert status["status"] == "ready"
+    assert status["model"] == "small"
+    assert whisper_runtime.start_whisper_warmup() is None
+
+
+def test_pool_warmup_reports_how_many_processes_loaded_the_model(monkeypatch) -> None:
+    from app.services import whisper_inference_pool
+
+    warmed: list[tuple] = []
+    monkeypatch.setattr(whisper_runtime, "get_settings", lambda: SimpleNamespace(whisper_warmup=True, whisper_model="medium"))
+    monkeypatch.setattr(whisper_runtime, "_configured_warmup_target", lambda: ("whisper", "medium"))
+    monkeypatch.setattr(whisper_runtime, "_warmup_state", {"status": "disabled"})
+    monkeypatch.setattr(whisper_runtime, "whisper_device", lambda: "cpu")
+    monkeypatch.setattr(whisper_inference_pool, "inference_pool_enabled", lambda device: True)
+    monkeypatch.setattr(whisper_inference_pool, "inference_workers", lambda: 3)
+    monkeypatch.setattr(whisper_inference_pool, "warm_inference_pool", lambda func, *args: warmed.append(args) or 3)
+
+    whisper_runtime.start_whisper_warmup().join(5)
+
+    status = whisper_runtime.warmup_status()
+    assert warmed == [("medium",)]
+    assert (status["status"], status["processes"], status["pool_workers"]) == ("ready", 3, 3)
+
+
+def test_warmup_loads_faster_whisper_when_it_leads_the_local_chain(monkeypatch) -> None:
+    from app.services import whisper_inference_pool
+
+    decoded: list[int] = []
+
+    class FakeModel:
+        def transcribe(self, audio, **kwargs):
+            return (decoded.append(len(audio)) for _ in range(1)), None
+
+    @contextmanager
+    def fake_acquire(model_name):
+        assert model_name == "small"
+        yield FakeModel(), "cpu", "int8"
+
+    monkeypatch.setattr(whisper_runtime, "get_settings", lambda: SimpleNamespace(whisper_warmup=True, whisper_model="medium"))
+    monkeypatch.setattr(whisper_runtime, "_configured_warmup_target", lambda: ("faster_whisper", "small"))
+    monkeypatch.setattr(whisper_runtime, "acquire_faster_whisper_model", fake_acquire)
+    monkeypatch.setattr(whisper_runtime, "_warmup_state", {"status": "disabled"})
+    monkeypatch.setattr(whisper_inference_pool, "warm_inference_pool", lambda *args: pytest.fail("openai-whisper nao atende o primeiro job"))
+
+    whisper_runtime.start_whisper_warmup().join(5)
+
+    assert decoded == [16000]
+    status = whisper_runtime.warmup_status()
+    assert (status["status"], status["engine"], status["model"]) == ("ready", "faster_whisper", "small")
+
+
+def test_warmup_is_opt_in(monkeypatch) -> None:
+    monkeypatch.setattr(whisper_runtime, "get_settings", lambda: SimpleNamespace(whisper_warmup=False))
+    monkeypatch.setattr(whisper_runtime, "_warmup_state", {"status": "disabled"})
+
+    assert whisper_runtime.start_whisper_warmup() is None
+    assert whisper_runtime.warmup_status() == {"status": "disabled"}
+
+
+def test_speed_mode_builds_quantized_model_once_per_process(monkeypatch) -> None:
+    loads: list[tuple[str, str, bool]] = []
+
+    def fake_load(model_name, device, quantize=False):
+        loads.append((model_name, device, quantize))
+        return object()
+
+    registry = WhisperModelRegistry(budget_mb=0)
+    monkeypatch.setattr(whisper_runtime, "get_settings", lambda: SimpleNamespace(whisper_cpu_mode="speed"))
+    monkeypatch.setattr(whisper_runtime, "get_model_registry", lambda: registry)
+    monkeypatch.setattr(whisper_runtime, "whisper_device", lambda: "cpu")
+    monkeypatch.setattr(whisper_runtime, "load_whisper_model", fake_load)
+
+    for _ in range(3):
+        with whisper_runtime.acquire_whisper_model("small") as (_, device):
+            assert device == "cpu"
+
+    assert loads == [("small", "cpu", True)]
+    assert registry.loaded_keys() == [("whisper", "small", "cpu", "int8")]
+
+
+def test_quantization_is_cpu_only(monkeypatch) -> None:
+    monkeypatch.setattr(whisper_runtime, "get_settings", lambda: SimpleNamespace(whisper_cpu_mode="speed"))
+
+    assert whisper_runtime.whisper_quantization_enabled("cpu") is True
+    assert whisper_runtime.whisper_quantization_enabled("cuda") is False
@@ -6,20 +6,36 @@ import { useEffect, useState } from "react";
 import { SectionHeader } from "@/components/section-header";
 import { StatusBadge } from "@/components/status-badge";
 import { useWorkspace } from "@/hooks/use-workspace";
+import { getDefaultTranscriptionProvider } from "@/lib/transcription-options";
 import { formatDate, formatDuration } from "@/lib/utils";
 import { getWorkspaceActivity, type WorkspaceActivity } from "@/lib/workspace-store";
-import { deleteUpload, getHistory } from "@/services/api";
+import {
+  cancelProcessingJob,
+  deleteUpload,
+  getActiveProcessingJobs,
+  getHistory,
+  getSettings,
+  startBatchProcessing,
+} from "@/services/api";
 import type { UploadItem } from "@/types/api";
 
 export default function HistoryPage() {
   const [items, setItems] = useState<UploadItem[]>([]);
   const [activity, setActivity] = useState<WorkspaceActivity[]>([]);
+  // Job ativo de cada upload (upload_id -> job_id), para oferecer o cancelamento.
+  const [activeJobs, setActiveJobs] = useState<Record<string, string>>({});
   const [error, setError] = useState<string | null>(null);
+  const [batchBusy, setBatchBusy] = useState(false);
+  const [batchMessage, setBatchMessage] = useState<string | null>(null);
   const { workspace } = useWorkspace();
 
   const load = async () => {
     try {
-      setItems(await getHistory());
+      const [history, jobs] = await Promise.all([getHistory(), getActiveProcessingJobs()]);
+      setItems(history);
+      setActiveJobs(
+        Object.fromEntries(jobs.items.filter((job) => !job.cancel_requested).map((job) => [job.upload_id, job.id])),
+      );
       setActivity(getWorkspaceActivity());
       setError(null);
     } catch (err) {
@@ -31,6 +47,28 @@ export default function HistoryPage() {
     void load();
   }, [workspace.id]);
 
+  const pendingIds = items.filter((item) => item.status === "uploaded" && !activeJobs[item.id]).map((item) => item.id);
+
+  // Envia todos os uploads ainda nao processados num unico lote, com as preferencias salvas.
+  const processPending = async () => {
+    setBatchBusy(true);
+    setBatchMessage(null);
+    try {
+      const settings = await getSettings();
+      const batch = await startBatchProcessing(pendingIds, {
+        language: settings.preferred_language,
+        whisper_model: settings.whisper_model,
+        transcription_provider: getDefaultTranscriptionProvider(settings.transcription_provider_order),
+      });
+      setBatchMessage(`${batch.total} arquivos na fila de processamento.`);
+      await load();
+    } catch (err) {
+      setError(err instanceof Error ? err.message : "Falha ao iniciar o processamento em lote");
+    } finally {
+      setBatchBusy(false);
+    }
+  };
+
   return (
     <div className="space-y-6">
       <SectionHeader
@@ -41,6 +79,19 @@ export default function HistoryPage() {
 
       {error ? <div className="panel p-6 text-sm text-ember">{error}</div> : null}
 
+      {pendingIds.length || batchMessage ? (
+        <div className="panel flex flex-wrap items-center justify-between gap-3 p-5 text-sm">
+          <span className="text-slate">
+            {batchMessage ?? `${pendingIds.length} arquivos enviados ainda nao foram processados.`}
+          </span>
+          {pendingIds.length ? (
+            <button type="button" className="button-secondary" disabled={batchBusy} onClick={() => void processPending()}>
+              {batchBusy ? "Enviando..." : "Processar pendentes"}
+            </button>
+          ) : null}
+        </div>
+      ) : null}
+
       <section className="grid gap-4 md:grid-cols-3">
         <div className="panel p-5">
           <p className="text-xs font-semibold uppercase tracking-[0.2em] text-slate">Workspace</p>
@@ -144,6 +195,17 @@ export default function HistoryPage() {
                     <td className="px-5 py-4">
                       <div className="flex flex-wrap gap-2">
                         <Link href={`/uploads/${item.id}`} className="button-secondary">Abrir</Link>
+                        {activeJobs[item.id] ? (
+                          <button
+                            type="button"
+                            className="button-secondary"
+                            onClick={() => {
+                              void cancelProcessingJob(activeJobs[item.id]).then(load).catch((err: Error) => setError(err.message));
+                            }}
+                          >
+                            Cancelar
+                          </button>
+                        ) : null}
                         <button
                           type="button"
                           className="button-danger"
@@ -89,7 +89,9 @@ export default function DashboardPage() {
     ? "Com APIs desligadas, o upload vai direto para o Whisper local."
     : transcriptionProvider === "whisper"
       ? "A transcrição começa direto no Whisper local selecionado."
-      : `Primeira tentativa com ${TRANSCRIPTION_PROVIDER_LABELS[transcriptionProvider]}. Se essa API não estiver configurada ou falhar, o app continua com a ordem salva nas configurações.`;
+      : transcriptionProvider === "faster_whisper"
+        ? "A transcrição roda no Whisper local rápido (int8); se ele não estiver instalado, o Whisper local assume."
+        : `Primeira tentativa com ${TRANSCRIPTION_PROVIDER_LABELS[transcriptionProvider]}. Se essa API não estiver configurada ou falhar, o app continua com a ordem salva nas configurações.`;
 
   const handleQuickUpload = async () => {
     if (!quickFile) {
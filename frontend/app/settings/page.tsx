@@ -105,7 +105,7 @@ export default function SettingsPage() {
     claude_api_key: "",
     default_report_template_id: "",
     whisper_model: "medium",
-    transcription_provider_order: ["openai", "gemini", "whisper"] as TranscriptionProvider[],
+    transcription_provider_order: ["openai", "gemini", "whisper", "faster_whisper"] as TranscriptionProvider[],
     report_provider_order: ["openai", "claude", "gemini", "local"] as ReportProvider[],
     export_directory: "",
     preferred_language: "pt-BR",
@@ -183,7 +183,9 @@ export default function UploadPage() {
     ? "Com APIs desligadas, o processamento vai direto para o Whisper local selecionado."
     : transcriptionProvider === "whisper"
       ? "A transcricao comeca direto no Whisper local selecionado."
-      : `Primeira tentativa com ${TRANSCRIPTION_PROVIDER_LABELS[transcriptionProvider]}. Se essa API nao estiver configurada ou falhar, o app segue a ordem salva nas configuracoes.`;
+      : transcriptionProvider === "faster_whisper"
+        ? "A transcricao roda no Whisper local rapido (int8); se ele nao estiver instalado, o Whisper local assume."
+        : `Primeira tentativa com ${TRANSCRIPTION_PROVIDER_LABELS[transcriptionProvider]}. Se essa API nao estiver configurada ou falhar, o app segue a ordem salva nas configuracoes.`;
 
   const remoteSource: RemoteMediaSource | null = mode === "youtube" || mode === "instagram" ? mode : null;
   const remoteUrl = mode === "youtube" ? youtubeUrl : instagramUrl;
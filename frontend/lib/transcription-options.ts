@@ -16,6 +16,7 @@ export const TRANSCRIPTION_PROVIDER_LABELS: Record<TranscriptionProvider, string
   openai: "OpenAI",
   gemini: "Gemini",
   whisper: "Whisper local",
+  faster_whisper: "Whisper local rápido (int8)",
 };
 
 export function getDefaultTranscriptionProvider(order?: TranscriptionProvider[]): TranscriptionProvider {
@@ -160,7 +160,7 @@ export function importRemoteMedia(payload: RemoteImportPayload) {
 }
 
 export function startProcessing(uploadId: string, payload: StartProcessingPayload) {
-  return request<{ id: string; status: string; message: string }>(`/process/${uploadId}`, {
+  return request<{ id: string; status: string; message: string; job_id?: string | null }>(`/process/${uploadId}`, {
     method: "POST",
     body: JSON.stringify({
       language: payload.language,
@@ -172,6 +172,33 @@ export function startProcessing(uploadId: string, payload: StartProcessingPayloa
   });
 }
 
+export function startBatchProcessing(uploadIds: string[], payload: StartProcessingPayload) {
+  return request<{ batch_id: string; total: number; progress: number; queued: number; running: number; done: number; failed: number; cancelled: number }>(
+    "/process/batch",
+    {
+      method: "POST",
+      body: JSON.stringify({
+        upload_ids: uploadIds,
+        language: payload.language,
+        force_reprocess: payload.force_reprocess ?? false,
+        use_api: payload.use_api ?? true,
+        whisper_model: payload.whisper_model ?? null,
+        transcription_provider: payload.transcription_provider ?? null,
+      }),
+    },
+  );
+}
+
+export function getActiveProcessingJobs() {
+  return request<{ items: { id: string; upload_id: string; status: string; cancel_requested: boolean }[]; total: number }>("/process/jobs");
+}
+
+export function cancelProcessingJob(jobId: string) {
+  return request<{ id: string; upload_id: string; status: string; cancel_requested: boolean }>(`/process/jobs/${jobId}/cancel`, {
+    method: "POST",
+  });
+}
+
 export function getDashboardStats() {
   return request<DashboardStats>("/dashboard/stats");
 }
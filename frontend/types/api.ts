@@ -2,7 +2,7 @@ export type FileType = "audio" | "video";
 export type ProcessingStatus = "uploaded" | "converting" | "transcribing" | "generating_report" | "completed" | "error";
 export type Engine = "openai" | "gemini" | "claude" | "whisper" | "none";
 export type ReportFormat = "markdown" | "text";
-export type TranscriptionProvider = "openai" | "gemini" | "whisper";
+export type TranscriptionProvider = "openai" | "gemini" | "whisper" | "faster_whisper";
 export type ReportProvider = "openai" | "claude" | "gemini" | "local";
 export type ReportExportExtension = "md" | "txt" | "docx" | "pdf";
 export type RemoteMediaSource = "youtube" | "instagram";
@@ -163,6 +163,8 @@ export interface TranscriptionRead {
   language_detected: string | null;
   duration_seconds: number | null;
   updated_at: string;
+  partial_text?: string | null;
+  progress?: number | null;
 }
 
 export type FormFieldType = "text" | "textarea" | "date" | "number";